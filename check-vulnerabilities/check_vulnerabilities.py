@@ -29,11 +29,19 @@ Script for detecting vulnerabilities on a given repo and creating
 associated security vulnerability advisories.
 """
 
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 import hashlib
 import json
 import os
 from pathlib import Path
+import re
+import statistics
 import sys
+import tempfile
+import threading
+import time
 from typing import Any
 
 import click
@@ -42,7 +50,7 @@ from github.AdvisoryVulnerability import (
     SimpleAdvisoryVulnerability,
     SimpleAdvisoryVulnerabilityPackage,
 )
-from requests.exceptions import SSLError
+from requests.exceptions import RetryError, SSLError
 
 TOKEN = os.environ.get("DEPENDENCY_CHECK_TOKEN", None)
 PACKAGE = os.environ.get("DEPENDENCY_CHECK_PACKAGE_NAME", None)
@@ -50,6 +58,29 @@ REPOSITORY = os.environ.get("DEPENDENCY_CHECK_REPOSITORY", None)
 DRY_RUN = True if os.environ.get("DEPENDENCY_CHECK_DRY_RUN", None) else False
 ERROR_IF_NEW_ADVISORY = True if os.environ.get("DEPENDENCY_CHECK_ERROR_EXIT", None) else False
 CREATE_ISSUES = True if os.environ.get("DEPENDENCY_CHECK_CREATE_ISSUES") else False
+ISSUE_MODE = os.environ.get("DEPENDENCY_CHECK_ISSUE_MODE") or "advisory"
+COALESCE_SAFETY = True if os.environ.get("DEPENDENCY_CHECK_COALESCE_SAFETY") else False
+MAX_WORKERS = int(os.environ.get("DEPENDENCY_CHECK_MAX_WORKERS", "4"))
+MAX_RETRIES = int(os.environ.get("DEPENDENCY_CHECK_MAX_RETRIES", "5"))
+ADVISORY_CACHE = os.environ.get("DEPENDENCY_CHECK_ADVISORY_CACHE", None)
+FINGERPRINT = os.environ.get("DEPENDENCY_CHECK_FINGERPRINT", "blake2")
+# Defaults to run_report_path()
+RUN_REPORT = os.environ.get("DEPENDENCY_CHECK_RUN_REPORT", None)
+STEP_SUMMARY = True if os.environ.get("DEPENDENCY_CHECK_STEP_SUMMARY") else False
+
+DIGEST_ISSUE_TITLE = "Security advisories digest"
+# GitHub rejects issue bodies longer than 65536 characters
+MAX_ISSUE_BODY_LENGTH = 65000
+
+SAFETY_SUMMARY_PATTERN = re.compile(
+    r"^Safety vulnerabilit(?:y|ies) (?P<ids>\S+(?:, \S+)*) for package '.+'$"
+)
+BANDIT_SUMMARY_PATTERN = re.compile(r" - Hash: (?P<hash>[0-9a-f]+)$")
+LINK_NEXT_PATTERN = re.compile(r'<(?P<url>[^>]+)>;\s*rel="next"')
+REPORT_CHUNK_SIZE = 1 << 16
+# Characters a JSON number can be made of
+NUMBER_TOKEN_PATTERN = re.compile(r"-?[0-9][0-9.eE+-]*|-")
+CODE_LINE_PATTERN = re.compile(r"^(?P<number>\d+)\s?(?P<code>.*)$")
 
 _SSL_CORPORATE_NETWORK_HINT = (
     "On corporate networks, an SSL inspection proxy may intercept HTTPS connections "
@@ -80,8 +111,1108 @@ def dict_hash(dictionary: dict[str, Any]) -> str:
     return dhash.hexdigest()
 
 
+def normalize_code(code: str, line_range: list[int] | None = None) -> str:
+    """Normalize a Bandit code snippet.
+
+    Bandit prefixes each line of the snippet with its line number and
+    surrounds the offending lines with context. Only the offending lines are
+    kept, without line numbers nor indentation, so that the result does not
+    change when unrelated code is edited.
+
+    Parameters
+    ----------
+    code : str
+        Code snippet as reported by Bandit.
+    line_range : list[int] | None
+        Line numbers of the offending code. If ``None``, all lines are kept.
+
+    Returns
+    -------
+    str
+        Normalized code snippet.
+    """
+    lines = []
+    for line in code.splitlines():
+        match = CODE_LINE_PATTERN.match(line)
+        if match is None:
+            continue
+        if line_range and int(match["number"]) not in line_range:
+            continue
+        if stripped := match["code"].strip():
+            lines.append(stripped)
+    return "\n".join(lines)
+
+
+def bandit_fingerprint(result: dict[str, Any]) -> str:
+    """BLAKE2 fingerprint of a Bandit result.
+
+    Only fields that identify the finding itself are hashed, so the
+    fingerprint is stable when the offending code moves within its file.
+
+    Parameters
+    ----------
+    result : Dict[str, Any]
+        Bandit result to fingerprint.
+
+    Returns
+    -------
+    str
+        BLAKE2 fingerprint of the result.
+    """
+    fields = (
+        result.get("test_id", ""),
+        result.get("filename", ""),
+        normalize_code(result.get("code", ""), result.get("line_range")),
+        str(result.get("issue_cwe", {}).get("id", "")),
+    )
+    return hashlib.blake2b("\0".join(fields).encode(), digest_size=16).hexdigest()
+
+
+FINGERPRINT_STRATEGIES: dict[str, Callable[[dict[str, Any]], str]] = {
+    "blake2": bandit_fingerprint,
+    "md5": dict_hash,
+}
+
+
+class _JsonStream:
+    """Minimal incremental reader over a JSON document.
+
+    Values are decoded one at a time with :meth:`json.JSONDecoder.raw_decode`
+    from a buffer that only holds the not yet consumed part of the document.
+
+    Parameters
+    ----------
+    file : TextIO
+        Opened JSON document.
+    chunk_size : int
+        Minimum number of characters read from the file at once.
+    """
+
+    _WHITESPACE = " \t\n\r"
+
+    def __init__(self, file, chunk_size: int = REPORT_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: int = 0) -> bool:
+        """Read more data into the buffer, dropping what was already consumed."""
+        if self.eof:
+            return False
+        chunk = self.file.read(max(size, self.chunk_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespaces and return the next character, or ``""`` at the end."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in self._WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos : self.pos + 1]
+
+    def expect(self, *characters: str) -> str:
+        """Consume the next character, which must be one of ``characters``."""
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError(f"Expected one of {characters!r} in JSON report, found {character!r}")
+        self.pos += 1
+        return character
+
+    def decode(self) -> Any:
+        """Decode the next value."""
+        self.peek()
+        while True:
+            # A number reaching the end of the buffer may continue in the next chunk,
+            # for example "1." would otherwise be decoded as 1
+            number = NUMBER_TOKEN_PATTERN.match(self.buffer, self.pos)
+            if (
+                number
+                and number.end() == len(self.buffer)
+                and self._fill(len(self.buffer) - self.pos)
+            ):
+                continue
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # The value may be truncated: grow the buffer geometrically and retry
+                if not self._fill(len(self.buffer) - self.pos):
+                    raise
+                continue
+            self.pos = end
+            return value
+
+    def seek_key(self, key: str):
+        """Move to the value of the ``key`` entry of the top-level object."""
+        self.expect("{")
+        if self.peek() == "}":
+            raise KeyError(key)
+        while True:
+            current_key = self.decode()
+            self.expect(":")
+            if current_key == key:
+                return
+            self.decode()
+            if self.expect(",", "}") == "}":
+                raise KeyError(key)
+
+    def iter_array(self) -> Iterator[Any]:
+        """Iterate over the items of the array at the current position."""
+        try:
+            self.expect("[")
+            if self.peek() == "]":
+                return
+            while True:
+                yield self.decode()
+                if self.expect(",", "]") == "]":
+                    return
+        finally:
+            self.file.close()
+
+
+def iter_report_entries(
+    report: str | Path, key: str, chunk_size: int = REPORT_CHUNK_SIZE
+) -> Iterator[dict]:
+    """Iterate over the entries of a Safety or Bandit JSON report.
+
+    The report is read incrementally so that only one entry at a time is held
+    in memory, whatever the size of the report.
+
+    Parameters
+    ----------
+    report : str | Path
+        Path to the JSON report.
+    key : str
+        Top-level key of the array of entries, for example ``"results"``.
+    chunk_size : int
+        Minimum number of characters read from the report at once.
+
+    Returns
+    -------
+    Iterator[dict]
+        Iterator over the entries.
+
+    Raises
+    ------
+    KeyError
+        If the report has no top-level ``key`` entry.
+    ValueError
+        If the report is not a valid JSON object.
+    """
+    stream = _JsonStream(Path(report).open("r", encoding="utf-8"), chunk_size)
+    try:
+        stream.seek_key(key)
+    except Exception:
+        stream.file.close()
+        raise
+    return stream.iter_array()
+
+
+class RunReport:
+    """Timings and counters collected during a vulnerability check run.
+
+    Phases are measured back to back: ending a phase accounts for the time
+    elapsed since the end of the previous one. A phase ended several times
+    accumulates its durations. Time spent producing the items of an iterator
+    wrapped with :meth:`timed` is accounted to its own phase instead.
+    """
+
+    def __init__(self):
+        self.error: str | None = None
+        self.phases: dict[str, float] = {}
+        self.api_calls: dict[str, int] = {}
+        self.api_seconds: dict[str, float] = {}
+        self.retries = 0
+        self.rate_limit_sleep_seconds = 0.0
+        self.totals: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._start = self._last = time.perf_counter()
+
+    def end_phase(self, name: str):
+        """Account the time elapsed since the previous phase to ``name``.
+
+        Parameters
+        ----------
+        name : str
+            Name of the phase.
+        """
+        now = time.perf_counter()
+        self.phases[name] = self.phases.get(name, 0.0) + now - self._last
+        self._last = now
+
+    def timed(self, iterable, name: str) -> Iterator:
+        """Account the time spent producing the items of ``iterable`` to ``name``.
+
+        This time is excluded from the phase ended next, so that lazily
+        loaded items are not accounted to the phase consuming them.
+
+        Parameters
+        ----------
+        iterable : Iterable
+            Items to produce.
+        name : str
+            Name of the phase.
+
+        Returns
+        -------
+        Iterator
+            Iterator over the items.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed = time.perf_counter() - start
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+                self._last += elapsed
+            yield item
+
+    def record_call(self, endpoint: str, seconds: float, count: int = 1):
+        """Record API calls performed against an endpoint.
+
+        Parameters
+        ----------
+        endpoint : str
+            Name of the endpoint.
+        seconds : float
+            Time spent in the calls.
+        count : int
+            Number of calls.
+        """
+        with self._lock:
+            self.api_calls[endpoint] = self.api_calls.get(endpoint, 0) + count
+            self.api_seconds[endpoint] = self.api_seconds.get(endpoint, 0.0) + seconds
+
+    def record_retry(self, sleep_seconds: float):
+        """Record a rate limited call that is retried after sleeping.
+
+        Parameters
+        ----------
+        sleep_seconds : float
+            Time to sleep before retrying.
+        """
+        with self._lock:
+            self.retries += 1
+            self.rate_limit_sleep_seconds += sleep_seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get the report as a JSON serializable dictionary."""
+        return {
+            "repository": REPOSITORY,
+            "dry_run": DRY_RUN,
+            "error": self.error,
+            "total_seconds": round(time.perf_counter() - self._start, 3),
+            "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+            "api": {
+                endpoint: {"calls": calls, "seconds": round(self.api_seconds[endpoint], 3)}
+                for endpoint, calls in self.api_calls.items()
+            },
+            "retries": self.retries,
+            "rate_limit_sleep_seconds": round(self.rate_limit_sleep_seconds, 3),
+            "totals": self.totals,
+        }
+
+    def to_markdown(self) -> str:
+        """Get the report as a GitHub step summary."""
+        report = self.to_dict()
+        lines = ["### Vulnerability check run report", ""]
+        if self.error:
+            lines += [f"**The run failed:** {self.error}", ""]
+        lines += [
+            "| Phase | Duration (s) |",
+            "| --- | --- |",
+        ]
+        lines += [f"| {name} | {seconds:.2f} |" for name, seconds in report["phases"].items()]
+        lines += [f"| **total** | **{report['total_seconds']:.2f}** |", ""]
+        lines += ["| API endpoint | Calls | Duration (s) |", "| --- | --- | --- |"]
+        lines += [
+            f"| {endpoint} | {stats['calls']} | {stats['seconds']:.2f} |"
+            for endpoint, stats in report["api"].items()
+        ]
+        lines += [
+            "",
+            f"Retries: {report['retries']}, rate limit sleeps: "
+            f"{report['rate_limit_sleep_seconds']:.1f}s",
+            "",
+        ]
+        lines += [f"- {name.replace('_', ' ')}: {value}" for name, value in self.totals.items()]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str | Path):
+        """Write the report as JSON, and as a step summary if requested.
+
+        Parameters
+        ----------
+        path : str | Path
+            Path of the JSON report.
+        """
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        print(f"Run report written to {path}.")
+        step_summary = os.environ.get("GITHUB_STEP_SUMMARY")
+        if STEP_SUMMARY and step_summary:
+            with Path(step_summary).open("a", encoding="utf-8") as file:
+                file.write(self.to_markdown())
+
+
+def run_report_path() -> Path:
+    """Get the path of the JSON run report.
+
+    The report is written to the temporary directory of the runner, out of the
+    checked out repository, so that it is never committed or uploaded with the
+    other reports by mistake. It is displayed through the step summary. The
+    ``DEPENDENCY_CHECK_RUN_REPORT`` environment variable overrides the path.
+
+    Returns
+    -------
+    Path
+        Path of the JSON run report.
+    """
+    if RUN_REPORT:
+        return Path(RUN_REPORT)
+    return Path(
+        os.environ.get("RUNNER_TEMP") or tempfile.gettempdir(), "check_vulnerabilities_run.json"
+    )
+
+
+def advisory_keys(summary: str) -> list[str]:
+    """Get the index keys identifying an advisory from its summary.
+
+    Safety advisories are identified by their vulnerability ids (several of
+    them for coalesced advisories) and Bandit advisories by the hash of the
+    finding. Any other advisory is identified by its whole summary.
+
+    Parameters
+    ----------
+    summary : str
+        Summary of the advisory.
+
+    Returns
+    -------
+    list[str]
+        Keys identifying the advisory.
+    """
+    if match := SAFETY_SUMMARY_PATTERN.match(summary):
+        return [f"safety:{v_id}" for v_id in match["ids"].split(", ")]
+    if match := BANDIT_SUMMARY_PATTERN.search(summary):
+        return [f"bandit:{match['hash']}"]
+    return [f"summary:{summary}"]
+
+
+class AdvisoryIndex:
+    """Index of the security advisories existing in a repository.
+
+    The index can be persisted on disk so that consecutive runs only request
+    the advisories updated since the previous run. Advisories are listed from
+    the most recently updated one and the listing stops as soon as an already
+    indexed advisory is reached. The first page is requested conditionally
+    with the ETag of the previous run, which costs no rate limit when nothing
+    changed. Only hashed keys, and the GHSA identifier of the advisory they
+    belong to, are persisted, never the advisory summaries.
+
+    Withdrawn advisories are not indexed. Deleted advisories are no longer
+    listed, which an incremental refresh cannot notice: the index is rebuilt
+    from a full listing once ``FULL_REFRESH_INTERVAL`` seconds have elapsed
+    since the previous one.
+
+    Parameters
+    ----------
+    path : str | Path | None
+        Path of the on-disk index. If ``None``, the index lives in memory only.
+    """
+
+    FULL_REFRESH_INTERVAL = 24 * 3600
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else None
+        self.etag: str | None = None
+        self.updated_at: str | None = None
+        self.full_refresh_at = 0.0
+        self.keys: set[str] = set()
+        self.ghsa_ids: dict[str, str] = {}
+        if self.path and self.path.is_file():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                data = None
+            if isinstance(data, dict):
+                self.etag = data.get("etag")
+                self.updated_at = data.get("updated_at")
+                self.full_refresh_at = float(data.get("full_refresh_at", 0.0))
+                self.keys = set(data.get("keys", []))
+                self.ghsa_ids = dict(data.get("ghsa_ids", {}))
+            else:
+                print(f"Ignoring invalid advisory cache {self.path}.")
+
+    @staticmethod
+    def _hash(key: str) -> str:
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+    def _keys(self, summary: str) -> list[str]:
+        return [self._hash(key) for key in advisory_keys(summary)]
+
+    @property
+    def full_refresh_due(self) -> bool:
+        """Whether the next refresh should list every advisory again."""
+        return time.time() - self.full_refresh_at >= self.FULL_REFRESH_INTERVAL
+
+    def add(self, summary: str, ghsa_id: str | None = None):
+        """Add an advisory to the index.
+
+        Parameters
+        ----------
+        summary : str
+            Summary of the advisory.
+        ghsa_id : str | None
+            GHSA identifier of the advisory, if known.
+        """
+        keys = self._keys(summary)
+        self.keys.update(keys)
+        if ghsa_id:
+            self.ghsa_ids.update(dict.fromkeys(keys, ghsa_id))
+
+    def ghsa_id(self, summary: str) -> str | None:
+        """Get the GHSA identifier of the advisory indexed for ``summary``, if known.
+
+        Parameters
+        ----------
+        summary : str
+            Summary of the advisory.
+
+        Returns
+        -------
+        str | None
+            GHSA identifier of the advisory.
+        """
+        for key in advisory_keys(summary):
+            if ghsa_id := self.ghsa_ids.get(self._hash(key)):
+                return ghsa_id
+        return None
+
+    def __contains__(self, summary: str) -> bool:
+        """Whether an advisory with the same keys as ``summary`` exists."""
+        return all(self._hash(key) in self.keys for key in advisory_keys(summary))
+
+    def refresh(
+        self,
+        repo,
+        report: RunReport | None = None,
+        call: Callable | None = None,
+        full: bool | None = None,
+    ) -> int:
+        """Index the advisories updated since the last refresh.
+
+        Once every advisory has been listed, either by a full refresh or because
+        all of them were updated since the last refresh, the index is replaced by
+        the listed advisories so that deleted advisories are dropped.
+
+        Parameters
+        ----------
+        repo : github.Repository.Repository
+            Repository whose advisories are indexed.
+        report : RunReport | None
+            Report in which the performed requests are recorded. Ignored if ``call`` is
+            provided, since ``call`` records the requests itself.
+        call : Callable | None
+            Function performing each request, for example :meth:`AdvisorySubmitter.call`
+            so that rate limited requests are retried. If ``None``, requests are
+            performed directly.
+        full : bool | None
+            Whether to list every advisory, ignoring the ETag and the last update
+            of the previous refresh. By default, a full refresh is performed when
+            :attr:`full_refresh_due` is true.
+
+        Returns
+        -------
+        int
+            Number of requests performed.
+        """
+
+        def list_repository_advisories(url, parameters, headers):
+            status, response_headers, output = repo.requester.requestJson(
+                "GET", url, parameters, headers
+            )
+            if status >= 400:
+                raise github.GithubException(status, output, response_headers)
+            return status, response_headers, output
+
+        if full is None:
+            full = self.full_refresh_due
+        url = f"{repo.url}/security-advisories"
+        parameters = {"sort": "updated", "direction": "desc", "per_page": 100}
+        headers = {"If-None-Match": self.etag} if self.etag and self.keys and not full else {}
+        stop_at = None if full else self.updated_at
+        requests_count = 0
+        etag = self.etag
+        latest_update = self.updated_at
+        listed_keys: set[str] = set()
+        listed_ghsa_ids: dict[str, str] = {}
+        withdrawn_keys: set[str] = set()
+        complete = False
+        while url:
+            if call is not None:
+                status, response_headers, output = call(
+                    list_repository_advisories, url=url, parameters=parameters, headers=headers
+                )
+            else:
+                start = time.perf_counter()
+                status, response_headers, output = list_repository_advisories(
+                    url, parameters, headers
+                )
+                if report is not None:
+                    report.record_call("list_repository_advisories", time.perf_counter() - start)
+            requests_count += 1
+            if status == 304:
+                break
+            if requests_count == 1:
+                etag = response_headers.get("etag")
+
+            reached_indexed = False
+            for advisory in json.loads(output):
+                if stop_at and advisory["updated_at"] < stop_at:
+                    reached_indexed = True
+                    break
+                keys = self._keys(advisory["summary"])
+                if advisory.get("state") == "withdrawn":
+                    withdrawn_keys.update(keys)
+                else:
+                    listed_keys.update(keys)
+                    if ghsa_id := advisory.get("ghsa_id"):
+                        # Advisories are listed from the most recently updated one
+                        for key in keys:
+                            listed_ghsa_ids.setdefault(key, ghsa_id)
+                if latest_update is None or advisory["updated_at"] > latest_update:
+                    latest_update = advisory["updated_at"]
+            if reached_indexed:
+                break
+
+            # The next page URL already embeds the query parameters
+            match = LINK_NEXT_PATTERN.search(response_headers.get("link", ""))
+            url = match["url"] if match else None
+            parameters, headers = None, {}
+            complete = url is None
+
+        # Only commit the refresh state once the listing has fully succeeded
+        if complete:
+            self.keys = listed_keys
+            self.ghsa_ids = listed_ghsa_ids
+            self.full_refresh_at = time.time()
+        else:
+            for key in withdrawn_keys - listed_keys:
+                self.keys.discard(key)
+                self.ghsa_ids.pop(key, None)
+            self.keys.update(listed_keys)
+            self.ghsa_ids.update(listed_ghsa_ids)
+        self.etag = etag
+        self.updated_at = latest_update
+        return requests_count
+
+    def save(self):
+        """Persist the index on disk, if a path was provided."""
+        if self.path is None:
+            return
+        data = {
+            "etag": self.etag,
+            "updated_at": self.updated_at,
+            "full_refresh_at": self.full_refresh_at,
+            "keys": sorted(self.keys),
+            "ghsa_ids": self.ghsa_ids,
+        }
+        self.path.write_text(json.dumps(data), encoding="utf-8")
+
+
+@dataclass
+class PendingAdvisory:
+    """New advisory waiting to be submitted to GitHub.
+
+    Parameters
+    ----------
+    summary : str
+        Summary of the advisory, also used as the issue title.
+    description : str
+        Description of the advisory.
+    advisory_kwargs : dict[str, Any]
+        Extra keyword arguments forwarded to ``create_repository_advisory``.
+    package : str
+        Affected package, used to group advisories in digest issues.
+    severity : str
+        Severity of the advisory, used to group advisories in digest issues.
+    cwe : str
+        CWE of the advisory, if any, used to group advisories in digest issues.
+    """
+
+    summary: str
+    description: str
+    advisory_kwargs: dict[str, Any] = field(default_factory=dict)
+    package: str = ""
+    severity: str = "medium"
+    cwe: str = ""
+
+
+def github_client(token: str) -> github.Github:
+    """Create a GitHub client whose rate limited requests are retried by the caller.
+
+    PyGithub retries rate limited requests by default. The client only retries
+    connection errors and server errors of idempotent requests, leaving rate
+    limits to :class:`AdvisorySubmitter`.
+
+    Parameters
+    ----------
+    token : str
+        Token used to authenticate against GitHub.
+
+    Returns
+    -------
+    github.Github
+        GitHub client.
+    """
+    from urllib3.util import Retry
+
+    retry = Retry(total=3, backoff_factor=1, status_forcelist=(500, 502, 503, 504))
+    return github.Github(auth=github.Auth.Token(token), retry=retry)
+
+
+def rename_advisory(repo, ghsa_id: str, summary: str):
+    """Change the summary of an existing advisory.
+
+    Parameters
+    ----------
+    repo : github.Repository.Repository
+        Repository of the advisory.
+    ghsa_id : str
+        GHSA identifier of the advisory.
+    summary : str
+        New summary of the advisory.
+    """
+    repo.requester.requestJsonAndCheck(
+        "PATCH", f"{repo.url}/security-advisories/{ghsa_id}", input={"summary": summary}
+    )
+
+
+def issue_body(advisory_url: str, desc: str) -> str:
+    """Build the body of the issue associated with a new advisory.
+
+    Parameters
+    ----------
+    advisory_url : str
+        URL of the security advisory.
+    desc : str
+        Description of the security advisory.
+
+    Returns
+    -------
+    str
+        Body of the issue.
+    """
+    return f"""
+A new security advisory was open in this repository. See {advisory_url}.
+
+---
+**NOTE**
+
+Please update the security advisory status after evaluating. Publish the advisory
+once it has been verified (since it has been created in draft mode).
+
+---
+
+#### Description
+
+{desc}
+"""
+
+
+class AdvisorySubmitter:
+    """Submit advisories and issues concurrently while honoring GitHub rate limits.
+
+    Requests are performed by a bounded pool of worker threads. Whenever a
+    worker hits a primary or secondary rate limit, every worker pauses until
+    the delay requested by GitHub (or an exponential backoff) has elapsed.
+
+    This is the only layer retrying rate limited requests: the GitHub client
+    must be created with :func:`github_client`, which disables the rate limit
+    handling of PyGithub. PyGithub would otherwise sleep in the worker that hit
+    the limit while the other workers keep sending requests, and its sleeps
+    would not be accounted in the run report.
+
+    Parameters
+    ----------
+    repo : github.Repository.Repository
+        Repository in which advisories and issues are created.
+    create_issues : bool
+        Whether to create an issue for each new advisory.
+    max_workers : int
+        Maximum number of concurrent requests.
+    max_retries : int
+        Maximum number of retries of a rate limited request.
+    report : RunReport | None
+        Report in which requests, retries and rate limit sleeps are recorded.
+    """
+
+    def __init__(
+        self,
+        repo,
+        create_issues: bool = False,
+        max_workers: int = MAX_WORKERS,
+        max_retries: int = MAX_RETRIES,
+        report: RunReport | None = None,
+    ):
+        self.repo = repo
+        self.report = report
+        self.create_issues = create_issues
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.latencies: list[float] = []
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    @staticmethod
+    def _rate_limit_delay(error: github.GithubException) -> float | None:
+        """Return the delay requested by GitHub, or ``None`` if not rate limited."""
+        headers = {key.lower(): value for key, value in (error.headers or {}).items()}
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+        if isinstance(error, github.RateLimitExceededException) or (
+            error.status in (403, 429) and "rate limit" in str(error.data).lower()
+        ):
+            if headers.get("x-ratelimit-remaining") == "0" and "x-ratelimit-reset" in headers:
+                return max(0.0, float(headers["x-ratelimit-reset"]) - time.time())
+            return 0.0
+        return None
+
+    @staticmethod
+    def _server_error(func: Callable, error: RetryError) -> github.GithubException:
+        """Summarize a request whose server error retries of :func:`github_client` ran out."""
+        reason = getattr(error.args[0], "reason", error) if error.args else error
+        match = re.search(r"too many (\d+) error responses", str(reason))
+        return github.GithubException(
+            int(match.group(1)) if match else 500,
+            {"message": f"{func.__name__} still failing after retrying server errors: {reason}"},
+            {},
+        )
+
+    def _wait_if_paused(self):
+        """Block until the shared rate limit pause has elapsed."""
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def call(self, func: Callable, **kwargs) -> Any:
+        """Perform a request, retrying it with adaptive backoff when rate limited.
+
+        Parameters
+        ----------
+        func : Callable
+            PyGithub method performing the request.
+        **kwargs
+            Keyword arguments forwarded to ``func``.
+
+        Returns
+        -------
+        Any
+            Value returned by ``func``.
+
+        Raises
+        ------
+        github.GithubException
+            If the request failed, was rate limited more than ``max_retries``
+            times, or kept failing with server errors.
+        """
+        backoff = 1.0
+        for attempt in range(self.max_retries + 1):
+            self._wait_if_paused()
+            start = time.perf_counter()
+            try:
+                return func(**kwargs)
+            except RetryError as e:
+                # The server errors were already retried by the client
+                raise self._server_error(func, e) from None
+            except github.GithubException as e:
+                delay = self._rate_limit_delay(e)
+                if delay is None or attempt == self.max_retries:
+                    raise
+                delay = max(delay, backoff)
+                backoff = min(backoff * 2, 60.0)
+                if self.report is not None:
+                    self.report.record_retry(delay)
+                print(f"Rate limit hit, retrying in {delay:.1f}s...")
+                with self._lock:
+                    self._resume_at = max(self._resume_at, time.monotonic() + delay)
+            finally:
+                if self.report is not None:
+                    self.report.record_call(func.__name__, time.perf_counter() - start)
+
+    def _create_advisory(self, pending: PendingAdvisory):
+        """Create an advisory."""
+        start = time.perf_counter()
+        advisory = self.call(
+            self.repo.create_repository_advisory,
+            summary=pending.summary,
+            description=pending.description,
+            **pending.advisory_kwargs,
+        )
+        with self._lock:
+            self.latencies.append(time.perf_counter() - start)
+        return advisory
+
+    def _create_issue(self, pending: PendingAdvisory, advisory):
+        """Create the issue associated with an advisory."""
+        return self.call(
+            self.repo.create_issue,
+            title=pending.summary,
+            body=issue_body(advisory.html_url, pending.description),
+            labels=["security"],
+        )
+
+    def create_advisories(self, pending_advisories: list[PendingAdvisory]) -> list:
+        """Create all the pending advisories.
+
+        Parameters
+        ----------
+        pending_advisories : list[PendingAdvisory]
+            Advisories to create.
+
+        Returns
+        -------
+        list
+            Created advisories, in the same order as ``pending_advisories``.
+        """
+        if not pending_advisories:
+            return []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            advisories = list(executor.map(self._create_advisory, pending_advisories))
+        self.print_latency_stats()
+        return advisories
+
+    def submit_issues(self, pending_advisories: list[PendingAdvisory], advisories: list) -> list:
+        """Create an issue for each created advisory.
+
+        Parameters
+        ----------
+        pending_advisories : list[PendingAdvisory]
+            Submitted advisories.
+        advisories : list
+            Created advisories, in the same order as ``pending_advisories``.
+
+        Returns
+        -------
+        list
+            Created issues, in the same order as ``advisories``.
+        """
+        if not advisories:
+            return []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self._create_issue, pending_advisories, advisories))
+
+    def submit(self, pending_advisories: list[PendingAdvisory]) -> list:
+        """Create all the pending advisories, then their issues if requested.
+
+        Parameters
+        ----------
+        pending_advisories : list[PendingAdvisory]
+            Advisories to create.
+
+        Returns
+        -------
+        list
+            Created advisories, in the same order as ``pending_advisories``.
+        """
+        advisories = self.create_advisories(pending_advisories)
+        if self.create_issues:
+            self.submit_issues(pending_advisories, advisories)
+        return advisories
+
+    def print_latency_stats(self):
+        """Print statistics about the time taken to submit each advisory."""
+        if not self.latencies:
+            return
+        latencies = sorted(self.latencies)
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        print(
+            f"Submitted {len(latencies)} advisories with {self.max_workers} workers - "
+            f"latency min: {latencies[0]:.2f}s, median: {statistics.median(latencies):.2f}s, "
+            f"p95: {p95:.2f}s, max: {latencies[-1]:.2f}s"
+        )
+
+
+def coalesce_safety_findings(findings: list[dict[str, Any]]) -> PendingAdvisory:
+    """Coalesce Safety findings affecting the same package and version range.
+
+    A single advisory is built for all the findings, merging their
+    descriptions, CVEs and patched versions. A lone finding results in the
+    same advisory as when findings are not coalesced.
+
+    Parameters
+    ----------
+    findings : list[Dict[str, Any]]
+        Safety findings sharing the same package and vulnerable version range.
+
+    Returns
+    -------
+    PendingAdvisory
+        Advisory covering all the findings.
+    """
+    findings = sorted(findings, key=lambda finding: str(finding.get("vulnerability_id")))
+    v_ids = [str(finding.get("vulnerability_id")) for finding in findings]
+    v_package = findings[0].get("package_name")
+    v_affected_versions = findings[0].get("vulnerable_spec")
+    v_cves = sorted({finding["CVE"] for finding in findings if finding.get("CVE")})
+    v_fixed_versions = []
+    for finding in findings:
+        for fixed_version in finding.get("fixed_versions") or []:
+            if fixed_version not in v_fixed_versions:
+                v_fixed_versions.append(fixed_version)
+
+    if len(findings) == 1:
+        summary = f"Safety vulnerability {v_ids[0]} for package '{v_package}'"
+        desc = f"""
+{findings[0].get("advisory")}
+
+#### More information
+
+Visit {findings[0].get("more_info_url")} to find out more information.
+"""
+    else:
+        summary = f"Safety vulnerabilities {', '.join(v_ids)} for package '{v_package}'"
+        desc = f"\nCVEs: {', '.join(v_cves) if v_cves else 'none'}\n"
+        for finding in findings:
+            desc += f"""
+### Vulnerability {finding.get("vulnerability_id")}
+
+{finding.get("advisory")}
+
+Visit {finding.get("more_info_url")} to find out more information.
+"""
+
+    vuln_adv = SimpleAdvisoryVulnerability(
+        package=SimpleAdvisoryVulnerabilityPackage(name=f"{v_package}", ecosystem="pip"),
+        vulnerable_version_range=f"{v_affected_versions}",
+        patched_versions=f"{v_fixed_versions}",
+        vulnerable_functions=[],
+    )
+    return PendingAdvisory(
+        summary=summary,
+        description=desc,
+        advisory_kwargs={
+            "severity_or_cvss_vector_string": "medium",
+            # Advisories accept a single CVE, the others are listed in the description
+            "cve_id": v_cves[0] if len(v_cves) == 1 else None,
+            "vulnerabilities": [vuln_adv],
+        },
+        package=f"{v_package}",
+    )
+
+
+def digest_section(pending_advisories: list[PendingAdvisory], advisories: list) -> str:
+    """Build the digest issue section listing the advisories created in a run.
+
+    Parameters
+    ----------
+    pending_advisories : list[PendingAdvisory]
+        Advisories submitted during the run.
+    advisories : list
+        Created advisories, in the same order as ``pending_advisories``.
+
+    Returns
+    -------
+    str
+        Markdown section grouping the advisories by package, severity and CWE.
+    """
+    groups: dict[tuple[str, str, str], list[str]] = {}
+    for pending, advisory in zip(pending_advisories, advisories):
+        group = (pending.package, pending.severity, pending.cwe or "No CWE")
+        groups.setdefault(group, []).append(f"- [{pending.summary}]({advisory.html_url})")
+
+    lines = [f"## {len(advisories)} new advisories - {time.strftime('%Y-%m-%d', time.gmtime())}"]
+    for (package, severity, cwe), entries in sorted(groups.items()):
+        lines += ["", f"### {package} - {severity} - {cwe}", "", *entries]
+    return "\n".join(lines) + "\n"
+
+
+def update_digest_issue(submitter: AdvisorySubmitter, section: str):
+    """Add a section to the digest issue, creating the issue if needed.
+
+    The most recent section comes first. Older sections are dropped once the
+    body reaches the maximum length accepted by GitHub.
+
+    Parameters
+    ----------
+    submitter : AdvisorySubmitter
+        Submitter used to perform rate limit aware requests.
+    section : str
+        Section to add to the digest issue.
+    """
+    header = f"""
+New security advisories were open in this repository. They are listed below,
+grouped by package, severity and CWE.
+
+---
+**NOTE**
+
+Please update the security advisories status after evaluating. Publish the advisories
+once they have been verified (since they have been created in draft mode).
+
+---
+
+{section}"""
+
+    def _truncate(body: str) -> str:
+        if len(body) <= MAX_ISSUE_BODY_LENGTH:
+            return body
+        # Drop whole sections when possible, starting from the oldest ones
+        cut = body.rfind("\n## ", len(header), MAX_ISSUE_BODY_LENGTH)
+        body = body[: cut if cut > 0 else MAX_ISSUE_BODY_LENGTH]
+        return body + "\n\n_Older advisories were removed from this digest._\n"
+
+    def get_issues():
+        # The issues are paginated lazily: iterate within the call so that every page
+        # request is retried and accounted
+        for issue in submitter.repo.get_issues(state="open", labels=["security"]):
+            if issue.title == DIGEST_ISSUE_TITLE:
+                return issue
+        return None
+
+    digest_issue = submitter.call(get_issues)
+    if digest_issue is None:
+        submitter.call(
+            submitter.repo.create_issue,
+            title=DIGEST_ISSUE_TITLE,
+            body=_truncate(header),
+            labels=["security"],
+        )
+        return
+
+    # Keep the previous sections, below the new one
+    previous = digest_issue.body or ""
+    previous = previous[previous.find("## ") :] if "## " in previous else ""
+    submitter.call(digest_issue.edit, body=_truncate(f"{header}\n{previous}"))
+
+
 def check_vulnerabilities():
     """Check library and third-party vulnerabilities."""
+    report = RunReport()
+    try:
+        return _check_vulnerabilities(report)
+    except Exception as e:
+        report.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        # Failed runs are reported too, to know where they stopped
+        report.write(run_report_path())
+
+
+def _check_vulnerabilities(report: RunReport) -> bool:
+    """Check library and third-party vulnerabilities, recording the run in ``report``."""
     new_advisory_detected = False
     # Check that the needed environment variables are provided
     if not TOKEN:
@@ -103,20 +1234,19 @@ def check_vulnerabilities():
         print("Information will be presented on screen.\n")
 
     # Load the security checks
-    safety_results = {}
-    with Path("info_safety.json").open("r") as json_file:
-        safety_results = json.loads(json_file.read())
-
-    # If the security checks have not been loaded... problem ahead!
-    if not safety_results:
+    try:
+        safety_results = iter_report_entries("info_safety.json", "vulnerabilities")
+    except (KeyError, ValueError) as e:
+        # If the security checks have not been loaded... problem ahead!
         raise RuntimeError(
             "Safety results have not been generated... Something went wrong during",
             "the execution of 'safety check -o bare --save-json info_safety.json'. ",
             "Verify workflow logs.",
-        )
+        ) from e
+    report.end_phase("load_reports")
 
     # Connect to the repository
-    g = github.Github(auth=github.Auth.Token(TOKEN))
+    g = github_client(TOKEN)
 
     # Get the repository
     try:
@@ -130,26 +1260,42 @@ def check_vulnerabilities():
             + "the proxy to fail as well."
         ) from e
 
+    if ISSUE_MODE not in ("advisory", "digest"):
+        raise RuntimeError(
+            f"Unknown issue mode '{ISSUE_MODE}'. Available modes are: advisory, digest."
+        )
+    digest_mode = CREATE_ISSUES and ISSUE_MODE == "digest"
+
+    # Perform the requests through the submitter so that rate limits are honored
+    submitter = AdvisorySubmitter(
+        repo, create_issues=CREATE_ISSUES and not digest_mode, report=report
+    )
+
     # Get the available security advisories
-    existing_advisories = {}
+    existing_advisories = AdvisoryIndex(ADVISORY_CACHE)
     try:
-        pl_advisories = repo.get_repository_advisories()
-        pl_advisories.totalCount
-    except Exception:
+        requests_count = existing_advisories.refresh(repo, call=submitter.call)
+        print(f"Advisory index refreshed with {requests_count} request(s).")
+    except Exception as e:
         # In case there is trouble accessing the repo
-        pl_advisories = []
-
-    for advisory in pl_advisories:
-        existing_advisories[advisory.summary] = advisory
+        print(f"Could not list the repository advisories: {e}")
+    existing_advisories.save()
+    report.end_phase("list_advisories")
 
     ###############################################################################
     # THIRD PARTY SECURITY ADVISORIES
     ###############################################################################
 
+    # Advisories to be created once all reports are processed
+    pending_advisories: list[PendingAdvisory] = []
+
     # Process the detected advisories by Safety
+    safety_groups: dict[tuple[str, str], list[dict]] = {}
+    safety_entries = 0
     safety_results_reported = 0
     vulnerability: dict
-    for vulnerability in safety_results["vulnerabilities"]:
+    for vulnerability in report.timed(safety_results, "load_reports"):
+        safety_entries += 1
         # Retrieve the needed values
         v_id = vulnerability.get("vulnerability_id")
         v_package = vulnerability.get("package_name")
@@ -176,71 +1322,89 @@ def check_vulnerabilities():
 Visit {v_url} to find out more information.
 """
         # Check if the advisory already exists
-        if existing_advisories.get(summary):
+        if summary in existing_advisories:
             continue
+
+        # New safety advisory detected
+        safety_results_reported += 1
+        new_advisory_detected = True
+        if COALESCE_SAFETY:
+            # Findings are coalesced once all of them are known
+            safety_groups.setdefault((f"{v_package}", f"{v_affected_versions}"), []).append(
+                vulnerability
+            )
         elif not DRY_RUN:
-            # New safety advisory detected
-            safety_results_reported += 1
-            new_advisory_detected = True
-
-            # Create the advisory but do not publish it
-            advisory = repo.create_repository_advisory(
-                summary=summary,
-                description=desc,
-                severity_or_cvss_vector_string="medium",
-                cve_id=v_cve,
-                vulnerabilities=[vuln_adv],
+            # Queue the advisory creation, it is submitted once all reports are processed
+            pending_advisories.append(
+                PendingAdvisory(
+                    summary=summary,
+                    description=desc,
+                    advisory_kwargs={
+                        "severity_or_cvss_vector_string": "medium",
+                        "cve_id": v_cve,
+                        "vulnerabilities": [vuln_adv],
+                    },
+                    package=f"{v_package}",
+                )
             )
-
-            # Create an issue
-            if CREATE_ISSUES:
-                issue_body = f"""
-A new security advisory was open in this repository. See {advisory.html_url}.
-
----
-**NOTE**
-
-Please update the security advisory status after evaluating. Publish the advisory
-once it has been verified (since it has been created in draft mode).
-
----
-
-#### Description
-
-{desc}
-"""
-                repo.create_issue(title=summary, body=issue_body, labels=["security"])
         else:
-            # New safety advisory detected
-            safety_results_reported += 1
-            new_advisory_detected = True
             print("===========================================\n")
             print(f"{summary}")
             print(f"{desc}")
 
+    # Coalesce the new findings per package and vulnerable version range. Findings already
+    # covered by an advisory, either per vulnerability or coalesced, have been skipped above
+    for findings in safety_groups.values():
+        pending = coalesce_safety_findings(findings)
+        if not DRY_RUN:
+            pending_advisories.append(pending)
+        else:
+            print("===========================================\n")
+            print(f"{pending.summary}")
+            print(f"{pending.description}")
+
+    report.totals["safety_advisories_detected"] = safety_entries
+    report.totals["safety_advisories_reported"] = safety_results_reported
+    report.end_phase("diff")
+
     ###############################################################################
     # LIBRARY SECURITY ADVISORIES
     ###############################################################################
 
     # Load the bandit checks
-    bandit_results = {}
-    with Path("info_bandit.json").open("r") as json_file:
-        bandit_results = json.loads(json_file.read())
-
-    # If the bandit results have not been loaded... problem ahead!
-    if not bandit_results:
+    try:
+        bandit_results = iter_report_entries("info_bandit.json", "results")
+    except (KeyError, ValueError) as e:
+        # If the bandit results have not been loaded... problem ahead!
         raise RuntimeError(
             "Bandit results have not been generated... Something went wrong during",
             "the execution of 'bandit -r <source-directory> -o info_bandit.json -f json'. ",
             "Verify workflow logs.",
-        )
+        ) from e
+    report.end_phase("load_reports")
 
     # Process the detected advisories by Bandit
+    if FINGERPRINT not in FINGERPRINT_STRATEGIES:
+        raise RuntimeError(
+            f"Unknown fingerprint strategy '{FINGERPRINT}'. "
+            f"Available strategies are: {', '.join(FINGERPRINT_STRATEGIES)}."
+        )
+    fingerprint = FINGERPRINT_STRATEGIES[FINGERPRINT]
+    fingerprints_seen: dict[str, int] = {}
+    # Summaries to give to the advisories still identified by a legacy hash, by GHSA id
+    legacy_advisories: dict[str, str] = {}
+    bandit_entries = 0
     bandit_results_reported = 0
     vulnerability: dict
-    for vulnerability in bandit_results["results"]:
+    for vulnerability in report.timed(bandit_results, "load_reports"):
+        bandit_entries += 1
         # Retrieve the needed values
-        v_hash = dict_hash(vulnerability)
+        v_hash = fingerprint(vulnerability)
+        # Tell apart identical findings within the same file
+        occurrence = fingerprints_seen.get(v_hash, 0)
+        fingerprints_seen[v_hash] = occurrence + 1
+        if occurrence:
+            v_hash = hashlib.blake2b(f"{v_hash}:{occurrence}".encode(), digest_size=16).hexdigest()
         v_test_id = vulnerability.get("test_id")
         v_test_name = vulnerability.get("test_name")
         v_severity_level = vulnerability.get("issue_severity", "medium").lower()
@@ -278,51 +1442,76 @@ For more information see {v_cwe["link"]}
 
 Visit {v_url} to find out more information.
 """
-        # Check if the advisory already exists
-        if existing_advisories.get(summary):
+        # Check if the advisory already exists, either with the current fingerprint or with
+        # the legacy MD5 hash of the whole result used by previous versions of this action
+        if summary in existing_advisories:
             continue
-        elif not DRY_RUN:
-            # New bandit advisory detected
-            bandit_results_reported += 1
-            new_advisory_detected = True
-
-            # Create the advisory but do not publish it
-            advisory = repo.create_repository_advisory(
-                summary=summary,
-                description=desc,
-                severity_or_cvss_vector_string=v_severity_level,
-                vulnerabilities=[vuln_adv],
-                cwe_ids=[f"CWE-{v_cwe['id']}"],
+        if FINGERPRINT != "md5":
+            legacy_summary = summary.replace(v_hash, dict_hash(vulnerability))
+            if legacy_summary in existing_advisories:
+                # The legacy hash changes with any line shift: migrate the advisory to the
+                # new fingerprint while it can still be matched
+                if not DRY_RUN:
+                    ghsa_id = existing_advisories.ghsa_id(legacy_summary)
+                    existing_advisories.add(summary, ghsa_id)
+                    if ghsa_id:
+                        legacy_advisories[ghsa_id] = summary
+                continue
+
+        # New bandit advisory detected
+        bandit_results_reported += 1
+        new_advisory_detected = True
+        if not DRY_RUN:
+            # Queue the advisory creation, it is submitted once all reports are processed
+            pending_advisories.append(
+                PendingAdvisory(
+                    summary=summary,
+                    description=desc,
+                    advisory_kwargs={
+                        "severity_or_cvss_vector_string": v_severity_level,
+                        "vulnerabilities": [vuln_adv],
+                        "cwe_ids": [f"CWE-{v_cwe['id']}"],
+                    },
+                    package=f"{v_package}",
+                    severity=v_severity_level,
+                    cwe=f"CWE-{v_cwe['id']}" if v_cwe["id"] else "",
+                )
             )
+        else:
+            print("===========================================\n")
+            print(f"{summary}")
+            print(f"{desc}")
 
-            # Create an issue
-            if CREATE_ISSUES:
-                issue_body = f"""
-A new security advisory was open in this repository. See {advisory.html_url}.
+    report.totals["bandit_advisories_detected"] = bandit_entries
+    report.totals["bandit_advisories_reported"] = bandit_results_reported
+    report.end_phase("diff")
 
----
-**NOTE**
+    # Rename the legacy advisories, the index keeps the new fingerprint either way
+    for ghsa_id, summary in legacy_advisories.items():
+        try:
+            submitter.call(rename_advisory, repo=repo, ghsa_id=ghsa_id, summary=summary)
+            print(f"Advisory {ghsa_id} migrated to its new fingerprint.")
+        except github.GithubException as e:
+            print(f"Could not migrate advisory {ghsa_id} to its new fingerprint: {e}")
+    existing_advisories.save()
+    report.end_phase("migrate_advisories")
 
-Please update the security advisory status after evaluating. Publish the advisory
-once it has been verified (since it has been created in draft mode).
+    ###############################################################################
+    # ADVISORIES AND ISSUES SUBMISSION
+    ###############################################################################
 
----
+    # Create the advisories (but do not publish them) concurrently
+    advisories = submitter.create_advisories(pending_advisories)
+    report.end_phase("create_advisories")
 
-#### Description
-{desc}
-"""
-                repo.create_issue(title=summary, body=issue_body, labels=["security"])
-        else:
-            # New bandit advisory detected
-            bandit_results_reported += 1
-            new_advisory_detected = True
-            print("===========================================\n")
-            print(f"{summary}")
-            print(f"{desc}")
+    if digest_mode and advisories:
+        # Gather all the new advisories in a single tracking issue
+        update_digest_issue(submitter, digest_section(pending_advisories, advisories))
+    elif submitter.create_issues:
+        submitter.submit_issues(pending_advisories, advisories)
+    report.end_phase("create_issues")
 
     # Print out information
-    safety_entries = len(safety_results["vulnerabilities"])
-    bandit_entries = len(bandit_results["results"])
     print("\n*******************************************")
     print(f"Total 'safety' advisories detected: {safety_entries}")
     print(f"Total 'safety' advisories reported: {safety_results_reported}")
@@ -337,19 +1526,538 @@ once it has been verified (since it has been created in draft mode).
     return new_advisory_detected
 
 
-def generate_advisory_files():
+def run_tool(name: str, command: list[str]) -> tuple[int, str, float]:
+    """Run a tool, streaming its output to the log as it runs.
+
+    Parameters
+    ----------
+    name : str
+        Name of the tool, used to prefix its output lines.
+    command : list[str]
+        Command to run.
+
+    Returns
+    -------
+    tuple[int, str, float]
+        Return code, combined standard output and error, and wall time in seconds.
+    """
+    import subprocess
+
+    start = time.perf_counter()
+    output = []
+    with subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    ) as process:
+        for line in process.stdout:
+            print(f"[{name}] {line}", end="", flush=True)
+            output.append(line)
+    return process.returncode, "".join(output), time.perf_counter() - start
+
+
+def shard_files(files: list[Path], jobs: int) -> list[list[Path]]:
+    """Split files into shards of similar total size.
+
+    Parameters
+    ----------
+    files : list[Path]
+        Files to split.
+    jobs : int
+        Maximum number of shards.
+
+    Returns
+    -------
+    list[list[Path]]
+        Non-empty shards of files.
+    """
+    shards: list[list[Path]] = [[] for _ in range(max(1, jobs))]
+    sizes = [0] * len(shards)
+    # Greedily assign the largest files first to the least loaded shard
+    for file in sorted(files, key=lambda file: file.stat().st_size, reverse=True):
+        index = sizes.index(min(sizes))
+        shards[index].append(file)
+        sizes[index] += file.stat().st_size
+    return [shard for shard in shards if shard]
+
+
+def merge_bandit_reports(reports: list[dict[str, Any]]) -> dict[str, Any]:
+    """Merge several Bandit JSON reports into a single one.
+
+    Parameters
+    ----------
+    reports : list[Dict[str, Any]]
+        Bandit reports to merge.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Merged Bandit report, with recomputed metrics totals.
+    """
+    merged: dict[str, Any] = {"errors": [], "generated_at": "", "metrics": {}, "results": []}
+    for report in reports:
+        merged["errors"].extend(report.get("errors", []))
+        merged["results"].extend(report.get("results", []))
+        merged["generated_at"] = max(merged["generated_at"], report.get("generated_at", ""))
+        for filename, metrics in report.get("metrics", {}).items():
+            if filename != "_totals":
+                merged["metrics"][filename] = metrics
+
+    totals: dict[str, Any] = {}
+    for metrics in merged["metrics"].values():
+        for key, value in metrics.items():
+            totals[key] = totals.get(key, 0) + value
+    merged["metrics"]["_totals"] = totals
+    merged["results"].sort(key=lambda result: (result["filename"], result["line_number"]))
+    return merged
+
+
+def bandit_config(root: Path) -> tuple[list[str], list[Path]]:
+    """Get the Bandit configuration applying to the scan of a directory.
+
+    ``bandit -r`` picks up the ``.bandit`` file found under the scanned
+    directory. Bandit does not look for it when given files, so it must be
+    passed explicitly to scans of individual files.
+
+    Parameters
+    ----------
+    root : Path
+        Scanned directory.
+
+    Returns
+    -------
+    tuple[list[str], list[Path]]
+        Extra Bandit arguments, and the configuration files they refer to.
+
+    Raises
+    ------
+    RuntimeError
+        If several ``.bandit`` files are found, which Bandit rejects too.
+    """
+    import configparser
+
+    ini_files = sorted(root.rglob(".bandit"))
+    if not ini_files:
+        return [], []
+    if len(ini_files) > 1:
+        raise RuntimeError(
+            f"Multiple .bandit files found: {', '.join(str(file) for file in ini_files)}."
+        )
+
+    config_files = [ini_files[0]]
+    ini = configparser.ConfigParser()
+    ini.read(ini_files[0], encoding="utf-8")
+    if configfile := ini.get("bandit", "configfile", fallback=None):
+        config_files.append(Path(configfile))
+    return ["--ini", str(ini_files[0])], config_files
+
+
+def run_bandit_shards(
+    bandit_exe: str, files: list[Path], jobs: int, args: list[str] | None = None
+) -> list[tuple[list[Path], dict[str, Any] | None]]:
+    """Run Bandit over files, sharded across several processes.
+
+    Parameters
+    ----------
+    bandit_exe : str
+        Path to the Bandit executable.
+    files : list[Path]
+        Files to scan.
+    jobs : int
+        Number of Bandit processes to run concurrently.
+    args : list[str] | None
+        Extra Bandit arguments, for example its configuration.
+
+    Returns
+    -------
+    list[tuple[list[Path], Dict[str, Any] | None]]
+        Files of each shard with their Bandit report, or ``None`` if the Bandit
+        process of the shard failed.
+    """
+    shards = shard_files(files, jobs)
+    shard_outputs = [Path(f"info_bandit.{index}.json") for index in range(len(shards))]
+
+    def _run_shard(index: int):
+        command = [bandit_exe, *(args or []), "-o", str(shard_outputs[index]), "-f", "json"]
+        return run_tool(
+            f"bandit {index + 1}/{len(shards)}", command + [str(f) for f in shards[index]]
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, len(shards))) as executor:
+        return_codes = [code for code, _, _ in executor.map(_run_shard, range(len(shards)))]
+
+    results = []
+    for shard, shard_output, return_code in zip(shards, shard_outputs, return_codes):
+        report = None
+        # Bandit exits with 1 when it finds issues, any other failure is an error
+        if return_code in (0, 1) and shard_output.exists():
+            try:
+                report = json.loads(shard_output.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                pass
+        if shard_output.exists():
+            shard_output.unlink()
+        results.append((shard, report if isinstance(report, dict) else None))
+    return results
+
+
+def _bandit_failure(shards: list[tuple[list[Path], dict[str, Any] | None]]) -> str | None:
+    """Describe the failed Bandit shards, if any."""
+    failed = [files for files, report in shards if report is None]
+    if not failed:
+        return None
+    return (
+        f"{len(failed)} of {len(shards)} Bandit shard(s) failed, covering "
+        f"{sum(len(files) for files in failed)} file(s). See the Bandit output above."
+    )
+
+
+def run_bandit(
+    bandit_exe: str, files: list[Path], jobs: int, args: list[str] | None = None
+) -> dict[str, Any]:
+    """Run Bandit over files, sharded across several processes.
+
+    Parameters
+    ----------
+    bandit_exe : str
+        Path to the Bandit executable.
+    files : list[Path]
+        Files to scan.
+    jobs : int
+        Number of Bandit processes to run concurrently.
+    args : list[str] | None
+        Extra Bandit arguments, for example its configuration.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Merged Bandit report.
+
+    Raises
+    ------
+    RuntimeError
+        If the Bandit process of any shard failed.
+    """
+    shards = run_bandit_shards(bandit_exe, files, jobs, args)
+    if failure := _bandit_failure(shards):
+        raise RuntimeError(failure)
+    return merge_bandit_reports([report for _, report in shards])
+
+
+def run_incremental_bandit(
+    bandit_exe: str,
+    files: list[Path],
+    jobs: int,
+    cache_path: Path,
+    args: list[str] | None = None,
+    config_files: list[Path] | None = None,
+) -> dict[str, Any]:
+    """Run Bandit only over the files that changed since the previous run.
+
+    The cache maps the content hash of each file to its Bandit results, errors
+    and metrics. It is invalidated as a whole when the Bandit version, its
+    arguments or its configuration files change. Files of a failed shard are
+    not cached, so that they are scanned again by the next run.
+
+    Parameters
+    ----------
+    bandit_exe : str
+        Path to the Bandit executable.
+    files : list[Path]
+        Files to scan.
+    jobs : int
+        Number of Bandit processes to run concurrently.
+    cache_path : Path
+        Path of the cache file.
+    args : list[str] | None
+        Extra Bandit arguments, for example its configuration.
+    config_files : list[Path] | None
+        Configuration files read by Bandit.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Bandit report covering all the files.
+
+    Raises
+    ------
+    RuntimeError
+        If the Bandit process of any shard failed.
+    """
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        bandit_version = version("bandit")
+    except PackageNotFoundError:
+        bandit_version = "unknown"
+    config = hashlib.sha256(json.dumps(args or []).encode())
+    for config_file in config_files or []:
+        config.update(b"\0" + (config_file.read_bytes() if config_file.is_file() else b""))
+    config_hash = config.hexdigest()
+
+    cached_files = {}
+    if cache_path.is_file():
+        try:
+            cache = json.loads(cache_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            cache = None
+        if (
+            isinstance(cache, dict)
+            and cache.get("bandit_version") == bandit_version
+            and cache.get("config") == config_hash
+        ):
+            cached_files = cache.get("files", {})
+
+    hashes = {file.as_posix(): hashlib.sha256(file.read_bytes()).hexdigest() for file in files}
+    changed_names = {
+        name for name, digest in hashes.items() if cached_files.get(name, {}).get("hash") != digest
+    }
+    changed = [file for file in files if file.as_posix() in changed_names]
+    print(f"Bandit cache: {len(files) - len(changed)} file(s) unchanged, {len(changed)} to scan.")
+
+    entries = {name: cached_files[name] for name in hashes if name not in changed_names}
+    shards = run_bandit_shards(bandit_exe, changed, jobs, args) if changed else []
+    for shard, shard_report in shards:
+        if shard_report is None:
+            continue
+        scanned = {file.as_posix(): file for file in shard}
+        for name in scanned:
+            entries[name] = {"hash": hashes[name], "errors": [], "metrics": {}, "results": []}
+        for key in ("errors", "results"):
+            for item in shard_report.get(key, []):
+                name = Path(item["filename"]).as_posix()
+                if name in scanned:
+                    entries[name][key].append(item)
+        for filename, metrics in shard_report.get("metrics", {}).items():
+            name = Path(filename).as_posix()
+            if name in scanned:
+                entries[name]["metrics"] = metrics
+
+    cache = {"bandit_version": bandit_version, "config": config_hash, "files": entries}
+    cache_path.write_text(json.dumps(cache), encoding="utf-8")
+    if failure := _bandit_failure(shards):
+        raise RuntimeError(failure)
+
+    report = merge_bandit_reports(
+        [
+            {
+                "errors": entry["errors"],
+                "metrics": {name: entry["metrics"]} if entry["metrics"] else {},
+                "results": entry["results"],
+            }
+            for name, entry in entries.items()
+        ]
+    )
+    report["generated_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    return report
+
+
+class VulnerabilityDatabase:
+    """In-memory index of a locally mirrored Safety vulnerability database.
+
+    Both the legacy ``insecure_full.json`` layout (packages at the top level)
+    and the current one (packages under ``vulnerable_packages``) are
+    supported. Entries are indexed by normalized package name and their
+    specifiers are parsed once, the first time the package is looked up.
+
+    Parameters
+    ----------
+    path : str | Path
+        Path to the ``insecure_full.json`` database snapshot.
+    """
+
+    def __init__(self, path: str | Path):
+        from packaging.utils import canonicalize_name
+
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        packages = data.get("vulnerable_packages", data)
+        self.index: dict[str, list[dict[str, Any]]] = {}
+        for package_name, entries in packages.items():
+            if package_name.startswith("$") or not isinstance(entries, list):
+                continue
+            self.index.setdefault(canonicalize_name(package_name), []).extend(entries)
+        self._specifiers: dict[str, list[tuple[list, dict[str, Any]]]] = {}
+
+    def _package_specifiers(self, name: str) -> list[tuple[list, dict[str, Any]]]:
+        """Get the parsed specifiers of each entry of a package."""
+        from packaging.specifiers import SpecifierSet
+
+        if name not in self._specifiers:
+            self._specifiers[name] = [
+                ([SpecifierSet(spec) for spec in entry.get("specs", [])], entry)
+                for entry in self.index.get(name, [])
+            ]
+        return self._specifiers[name]
+
+    @staticmethod
+    def _entry_ids(entry: dict[str, Any]) -> tuple[str, str | None]:
+        """Get the vulnerability id and CVE of a database entry."""
+        ids = {item.get("type"): item.get("id") for item in entry.get("ids", [])}
+        v_id = ids.get("pyup") or str(entry.get("id", "")).removeprefix("pyup.io-")
+        return v_id, ids.get("cve") or entry.get("cve")
+
+    @staticmethod
+    def _fixed_versions(specifiers: list, version) -> list[str]:
+        """Get the versions fixing a vulnerability, newer than ``version``.
+
+        The database does not list the releases of each package, so the fixed
+        versions are the exclusive upper bounds of the vulnerable specifiers
+        which are not vulnerable themselves.
+        """
+        from packaging.version import InvalidVersion, Version
+
+        fixed = {}
+        for specifier_set in specifiers:
+            for specifier in specifier_set:
+                if specifier.operator != "<":
+                    continue
+                try:
+                    candidate = Version(specifier.version)
+                except InvalidVersion:
+                    continue
+                if candidate > version and not any(
+                    spec.contains(candidate, True) for spec in specifiers
+                ):
+                    fixed[candidate] = specifier.version
+        return [fixed[candidate] for candidate in sorted(fixed)]
+
+    def match(self, package_name: str, version: str) -> list[dict[str, Any]]:
+        """Get the vulnerabilities affecting a pinned package.
+
+        Parameters
+        ----------
+        package_name : str
+            Name of the package.
+        version : str
+            Pinned version of the package.
+
+        Returns
+        -------
+        list[Dict[str, Any]]
+            Vulnerabilities, following the schema of the Safety JSON report.
+        """
+        from packaging.utils import canonicalize_name
+        from packaging.version import InvalidVersion, Version
+
+        try:
+            parsed_version = Version(version)
+        except InvalidVersion:
+            return []
+
+        vulnerabilities = []
+        for specifiers, entry in self._package_specifiers(canonicalize_name(package_name)):
+            affected = [str(spec) for spec in specifiers if spec.contains(parsed_version, True)]
+            if not affected:
+                continue
+            v_id, v_cve = self._entry_ids(entry)
+            more_info_path = entry.get("more_info_path")
+            vulnerabilities.append(
+                {
+                    "vulnerability_id": v_id,
+                    "package_name": package_name,
+                    "analyzed_version": version,
+                    "vulnerable_spec": affected,
+                    "all_vulnerable_specs": [str(spec) for spec in specifiers],
+                    "advisory": entry.get("advisory", ""),
+                    "CVE": v_cve,
+                    "more_info_url": f"https://pyup.io{more_info_path}" if more_info_path else "",
+                    "fixed_versions": self._fixed_versions(specifiers, parsed_version),
+                }
+            )
+        return vulnerabilities
+
+
+def offline_safety_check(
+    database: str | Path,
+    requirements: str | Path = "requirements-for-safety.txt",
+    policy_file: str | Path = ".safety-ignore.yml",
+    output: str | Path = "info_safety.json",
+):
+    """Check pinned requirements against a local vulnerability database.
+
+    The generated report follows the schema of ``safety check --save-json``,
+    restricted to the fields consumed by :func:`check_vulnerabilities`.
+
+    Parameters
+    ----------
+    database : str | Path
+        Path to the ``insecure_full.json`` database snapshot.
+    requirements : str | Path
+        Requirements file containing pinned dependencies.
+    policy_file : str | Path
+        Safety policy file whose ignored vulnerabilities are skipped.
+    output : str | Path
+        Path of the generated report.
+    """
+    from packaging.requirements import InvalidRequirement, Requirement
+
+    start = time.perf_counter()
+    db = VulnerabilityDatabase(database)
+
+    ignored = set()
+    if Path(policy_file).is_file():
+        import yaml
+
+        policy = yaml.safe_load(Path(policy_file).read_text(encoding="utf-8")) or {}
+        ignored_vulnerabilities = policy.get("security", {}).get("ignore-vulnerabilities") or {}
+        ignored = {str(v_id) for v_id in ignored_vulnerabilities}
+
+    vulnerabilities, ignored_vulnerabilities, scanned = [], [], 0
+    for line in Path(requirements).read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].split(" --hash", 1)[0].strip().rstrip("\\").strip()
+        if not line or line.startswith("-"):
+            continue
+        try:
+            requirement = Requirement(line)
+        except InvalidRequirement:
+            print(f"Skipping unsupported requirement: {line}")
+            continue
+        pins = [spec.version for spec in requirement.specifier if spec.operator in ("==", "===")]
+        if not pins:
+            continue
+        scanned += 1
+        for vulnerability in db.match(requirement.name, pins[0]):
+            if vulnerability["vulnerability_id"] in ignored:
+                ignored_vulnerabilities.append(vulnerability)
+            else:
+                vulnerabilities.append(vulnerability)
+
+    report = {
+        "report_meta": {"scan_target": "files", "offline_database": str(database)},
+        "vulnerabilities": vulnerabilities,
+        "ignored_vulnerabilities": ignored_vulnerabilities,
+    }
+    Path(output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(
+        f"Offline safety check of {scanned} pinned requirements performed in "
+        f"{(time.perf_counter() - start) * 1000:.1f}ms."
+    )
+
+
+def generate_advisory_files(
+    bandit_jobs: int = 1, bandit_cache: bool = False, offline_db: str | Path | None = None
+):
     """
     Generate advisory files for local purposes.
 
-    This function runs safety and bandit on the user's behalf at the current location
-    and generates the necessary advisory files for local testing.
+    This function runs safety and bandit concurrently on the user's behalf at the
+    current location and generates the necessary advisory files for local testing.
+
+    Parameters
+    ----------
+    bandit_jobs : int
+        Number of processes across which the bandit scan of ``./src`` is sharded.
+    bandit_cache : bool
+        Whether to only scan with bandit the files of ``./src`` that changed since the
+        previous run, reusing the results cached in ``.bandit-cache.json`` for the others.
+    offline_db : str | Path | None
+        Path to a locally mirrored Safety vulnerability database (``insecure_full.json``).
+        If provided, requirements are checked against it instead of running safety,
+        which requires no network access.
 
     Notes
     -----
     This function should ONLY be used for local purposes.
     """
     import shutil
-    import subprocess
 
     # Delete previous advisory files
     if Path("info_safety.json").exists():
@@ -357,7 +2065,7 @@ def generate_advisory_files():
     if Path("info_bandit.json").exists():
         Path("info_bandit.json").unlink()
     safety_exe = shutil.which("safety")
-    if safety_exe is None:
+    if safety_exe is None and offline_db is None:
         raise FileNotFoundError("safety executable not found")
     bandit_exe = shutil.which("bandit")
     if bandit_exe is None:
@@ -370,48 +2078,75 @@ def generate_advisory_files():
             "contain the list of dependencies to scan."
         )
 
-    # Safety check - invoke the safety executable directly to avoid Safety reading
-    # the parent process argv (a Safety 3.x bug when called via `python -m safety`)
-    try:
-        result = subprocess.run(
-            [
-                safety_exe,
-                "check",
-                "--output",
-                "json",
-                "--save-json",
-                "info_safety.json",
-                "--policy-file",
-                ".safety-ignore.yml",
-                "-r",
-                "requirements-for-safety.txt",
-            ],
-            check=False,
-            capture_output=True,
-            text=True,
-        )
-        if any("unable to reach the server" in msg for msg in [result.stdout, result.stderr]):
+    def _safety_check():
+        if offline_db is not None:
+            offline_safety_check(offline_db)
+            return
+        # Safety check - invoke the safety executable directly to avoid Safety reading
+        # the parent process argv (a Safety 3.x bug when called via `python -m safety`)
+        try:
+            _, output, elapsed = run_tool(
+                "safety",
+                [
+                    safety_exe,
+                    "check",
+                    "--output",
+                    "json",
+                    "--save-json",
+                    "info_safety.json",
+                    "--policy-file",
+                    ".safety-ignore.yml",
+                    "-r",
+                    "requirements-for-safety.txt",
+                ],
+            )
+            print(f"Safety check performed in {elapsed:.1f}s.")
+        except Exception as e:
+            print(f"Safety check warning: {e}")
+            return
+        if "unable to reach the server" in output:
             raise RuntimeError(
                 "Safety could not reach the vulnerability database (pyup.io). "
                 + _SSL_CORPORATE_NETWORK_HINT
             )
-    except RuntimeError:
-        raise
-    except Exception as e:
-        print(f"Safety check warning: {e}")
-    finally:
-        print("Safety check performed.")
 
-    # Bandit check - invoke the bandit executable directly
-    try:
-        subprocess.run(
-            [bandit_exe, "-r", "./src", "-o", "info_bandit.json", "-f", "json"],
-            check=False,
-        )
-    except Exception as e:
-        print(f"Bandit check warning: {e}")
-    finally:
-        print("Bandit check performed.")
+    def _bandit_check():
+        # Bandit check - invoke the bandit executable directly
+        try:
+            start = time.perf_counter()
+            if bandit_cache or bandit_jobs > 1:
+                files = sorted(Path("src").rglob("*.py"))
+                args, config_files = bandit_config(Path("src"))
+                if bandit_cache:
+                    report = run_incremental_bandit(
+                        bandit_exe,
+                        files,
+                        bandit_jobs,
+                        Path(".bandit-cache.json"),
+                        args,
+                        config_files,
+                    )
+                else:
+                    report = run_bandit(bandit_exe, files, bandit_jobs, args)
+                Path("info_bandit.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+            else:
+                run_tool(
+                    "bandit", [bandit_exe, "-r", "./src", "-o", "info_bandit.json", "-f", "json"]
+                )
+            elapsed = time.perf_counter() - start
+            print(f"Bandit check performed in {elapsed:.1f}s.")
+        except RuntimeError:
+            # Failed shards would silently hide findings
+            raise
+        except Exception as e:
+            print(f"Bandit check warning: {e}")
+
+    # Both tools are independent from each other, run them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        safety_future = executor.submit(_safety_check)
+        bandit_future = executor.submit(_bandit_check)
+        bandit_future.result()
+        safety_future.result()
 
     print("Advisory files generated successfully.")
 
@@ -423,10 +2158,31 @@ def generate_advisory_files():
     default=False,
     help="Simulate the behavior of the synchronization without performing it.",
 )
-def main(run_local: bool):
+@click.option(
+    "--bandit-jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes across which the local bandit scan is sharded.",
+)
+@click.option(
+    "--bandit-cache",
+    is_flag=True,
+    default=False,
+    help="Only scan the files changed since the previous local run with bandit.",
+)
+@click.option(
+    "--offline-db",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Local Safety vulnerability database to use instead of reaching pyup.io.",
+)
+def main(run_local: bool, bandit_jobs: int, bandit_cache: bool, offline_db: str | None):
     """Run the main function."""
     if run_local:
-        generate_advisory_files()
+        generate_advisory_files(
+            bandit_jobs=bandit_jobs, bandit_cache=bandit_cache, offline_db=offline_db
+        )
         global DRY_RUN
         DRY_RUN = True
 
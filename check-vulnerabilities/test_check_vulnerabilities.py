@@ -0,0 +1,1060 @@
+# Copyright (C) 2022 - 2026 Synopsys, Inc. and ANSYS, Inc. All rights reserved.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Tests for the check_vulnerabilities module."""
+
+import functools
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import json
+from pathlib import Path
+import shutil
+import sys
+import threading
+import time
+
+import check_vulnerabilities
+from check_vulnerabilities import (
+    AdvisoryIndex,
+    AdvisorySubmitter,
+    PendingAdvisory,
+    _JsonStream,
+    bandit_config,
+    generate_advisory_files,
+    iter_report_entries,
+    merge_bandit_reports,
+    offline_safety_check,
+    run_incremental_bandit,
+    run_tool,
+    shard_files,
+)
+import github
+import pytest
+
+
+def rate_limit_error(status: int = 403) -> github.GithubException:
+    """Build the error raised by PyGithub on a secondary rate limit."""
+    return github.GithubException(
+        status, {"message": "You have exceeded a secondary rate limit."}, {"Retry-After": "0"}
+    )
+
+
+class FakeAdvisory:
+    """Advisory returned by the fake repository."""
+
+    def __init__(self, summary: str):
+        self.summary = summary
+        self.html_url = f"https://github.com/ansys/demo/security/advisories/{summary}"
+
+
+class FakeIssue:
+    """Issue whose edits are recorded."""
+
+    def __init__(self, title: str, body: str):
+        self.title = title
+        self.body = body
+        self.edits: list[str] = []
+
+    def edit(self, body):
+        """Edit the body of the issue."""
+        self.edits.append(body)
+        self.body = body
+
+
+class FakeRequester:
+    """Requester serving pages of advisories, failing first with the given errors."""
+
+    def __init__(self, pages: list[list[dict]], failures: list[int] | None = None):
+        self.pages = pages
+        self.failures = list(failures or [])
+        self.requests: list[str] = []
+        self.edits: list[tuple[str, str, dict]] = []
+
+    def requestJson(self, method, url, parameters=None, headers=None):  # noqa: N802
+        """Serve the page whose index is the URL fragment."""
+        self.requests.append(url)
+        if self.failures:
+            return self.failures.pop(0), {}, '{"message": "API rate limit exceeded"}'
+        etag = f'"{hashlib.md5(json.dumps(self.pages).encode()).hexdigest()}"'
+        if (headers or {}).get("If-None-Match") == etag:
+            return 304, {"etag": etag}, ""
+        index = int(url.rpartition("#")[2]) if "#" in url else 0
+        response_headers = {"etag": etag}
+        if index + 1 < len(self.pages):
+            response_headers["link"] = f'<{url.partition("#")[0]}#{index + 1}>; rel="next"'
+        return 200, response_headers, json.dumps(self.pages[index])
+
+    def requestJsonAndCheck(self, method, url, parameters=None, headers=None, input=None):  # noqa: N802
+        """Record an edit request."""
+        self.edits.append((method, url, input))
+        return {}, {}
+
+
+class FakeRepository:
+    """Repository creating advisories and issues in memory.
+
+    Parameters
+    ----------
+    failures : list[Exception] | None
+        Errors raised by the first advisory creations, in order.
+    barrier : threading.Barrier | None
+        Barrier every advisory creation waits on, to check they run concurrently.
+    """
+
+    url = "https://api.github.com/repos/ansys/demo"
+
+    def __init__(self, failures=None, barrier=None, requester=None):
+        self.failures = list(failures or [])
+        self.barrier = barrier
+        self.requester = requester
+        self.advisories: list[str] = []
+        self.created: dict[str, dict] = {}
+        self.issues: list[str] = []
+        self.open_issues: list[FakeIssue] = []
+        self.issue_failures: list[Exception] = []
+        self.attempts = 0
+        self._lock = threading.Lock()
+
+    def create_repository_advisory(self, summary, description, **kwargs):
+        """Create an advisory, unless an error is scheduled."""
+        with self._lock:
+            self.attempts += 1
+            failure = self.failures.pop(0) if self.failures else None
+        if failure is not None:
+            raise failure
+        if self.barrier is not None:
+            self.barrier.wait()
+        with self._lock:
+            self.advisories.append(summary)
+            self.created[summary] = {"description": description, **kwargs}
+        return FakeAdvisory(summary)
+
+    def create_issue(self, title, body, labels):
+        """Create an issue."""
+        with self._lock:
+            self.issues.append(title)
+
+    def get_issues(self, state, labels):
+        """List the open issues, unless an error is scheduled."""
+        if self.issue_failures:
+            raise self.issue_failures.pop(0)
+        return iter(self.open_issues)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the rate limit sleeps and advance a fake clock instead of sleeping."""
+    recorded = []
+    clock = [0.0]
+
+    def sleep(seconds):
+        recorded.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(check_vulnerabilities.time, "sleep", sleep)
+    monkeypatch.setattr(check_vulnerabilities.time, "monotonic", lambda: clock[0])
+    return recorded
+
+
+def pending(count: int) -> list[PendingAdvisory]:
+    """Build pending advisories."""
+    return [PendingAdvisory(summary=f"advisory-{i}", description="") for i in range(count)]
+
+
+def test_submit_concurrently():
+    """Test advisories and their issues are created concurrently, in order."""
+    repo = FakeRepository(barrier=threading.Barrier(4, timeout=5))
+    submitter = AdvisorySubmitter(repo, create_issues=True, max_workers=4)
+
+    advisories = submitter.submit(pending(8))
+
+    assert [advisory.summary for advisory in advisories] == [f"advisory-{i}" for i in range(8)]
+    assert sorted(repo.issues) == sorted(repo.advisories) == [f"advisory-{i}" for i in range(8)]
+    assert len(submitter.latencies) == 8
+
+
+@pytest.mark.parametrize("status", [403, 429])
+def test_submit_retries_rate_limits(sleeps, status):
+    """Test rate limited requests are retried with exponential backoff."""
+    repo = FakeRepository(failures=[rate_limit_error(status), rate_limit_error(status)])
+    report = check_vulnerabilities.RunReport()
+    submitter = AdvisorySubmitter(repo, max_workers=1, report=report)
+
+    advisories = submitter.submit(pending(1))
+
+    assert [advisory.summary for advisory in advisories] == ["advisory-0"]
+    assert repo.attempts == 3
+    assert report.retries == 2
+    assert report.api_calls == {"create_repository_advisory": 3}
+    # Retry-After is 0, the backoff applies: 1s then 2s
+    assert [round(sleep) for sleep in sleeps] == [1, 2]
+
+
+def test_submit_waits_for_rate_limit_reset(sleeps, monkeypatch):
+    """Test the delay requested by GitHub is honored when longer than the backoff."""
+    monkeypatch.setattr(check_vulnerabilities.time, "time", lambda: 1000.0)
+    error = github.RateLimitExceededException(
+        403,
+        {"message": "API rate limit exceeded"},
+        {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1030"},
+    )
+    submitter = AdvisorySubmitter(FakeRepository(failures=[error]), max_workers=1)
+
+    submitter.submit(pending(1))
+
+    assert len(sleeps) == 1 and 29 < sleeps[0] <= 30
+
+
+def test_submit_gives_up(sleeps):
+    """Test the rate limit error is raised once the retries are exhausted."""
+    repo = FakeRepository(failures=[rate_limit_error(429)] * 10)
+    submitter = AdvisorySubmitter(repo, max_workers=2, max_retries=3)
+
+    with pytest.raises(github.GithubException) as exc_info:
+        submitter.submit(pending(1))
+
+    assert exc_info.value.status == 429
+    assert repo.attempts == 4
+    assert len(sleeps) == 3
+
+
+def test_submit_does_not_retry_other_errors(sleeps):
+    """Test errors which are not rate limits are raised without retrying."""
+    repo = FakeRepository(failures=[github.GithubException(422, {"message": "Invalid"}, {})])
+    submitter = AdvisorySubmitter(repo, max_workers=1)
+
+    with pytest.raises(github.GithubException):
+        submitter.submit(pending(1))
+
+    assert repo.attempts == 1
+    assert sleeps == []
+
+
+def test_refresh_index_retries_rate_limits(sleeps):
+    """Test listing the advisories goes through the submitter retries."""
+    pages = [
+        [{"summary": "advisory-0", "updated_at": "2026-01-02T00:00:00Z"}],
+        [{"summary": "advisory-1", "updated_at": "2026-01-01T00:00:00Z"}],
+    ]
+    requester = FakeRequester(pages, failures=[403])
+    repo = FakeRepository(requester=requester)
+    index = AdvisoryIndex()
+
+    requests_count = index.refresh(repo, call=AdvisorySubmitter(repo).call)
+
+    assert requests_count == 2
+    assert len(requester.requests) == 3
+    assert len(sleeps) == 1
+    assert "advisory-0" in index and "advisory-1" in index
+    assert index.updated_at == "2026-01-02T00:00:00Z"
+
+
+def listed(summary: str, updated_at: str, **fields) -> dict:
+    """Build an advisory as listed by the repository advisories endpoint."""
+    return {"summary": summary, "updated_at": updated_at, "state": "draft", **fields}
+
+
+def test_refresh_index_stops_at_last_update(tmp_path):
+    """Test an incremental refresh stops at the advisories indexed by the previous one."""
+    index = AdvisoryIndex(tmp_path / "advisories.json")
+    old = listed("advisory-0", "2026-01-01T00:00:00Z")
+    assert index.refresh(FakeRepository(requester=FakeRequester([[old]]))) == 1
+    assert not index.full_refresh_due
+
+    requester = FakeRequester(
+        [
+            [listed("advisory-1", "2026-01-02T00:00:00Z")],
+            [old, listed("older", "2025-12-31T00:00:00Z")],
+            [listed("never-read", "2025-12-30T00:00:00Z")],
+        ]
+    )
+    assert index.refresh(FakeRepository(requester=requester)) == 2
+
+    assert "advisory-0" in index and "advisory-1" in index
+    assert "older" not in index and "never-read" not in index
+    assert index.updated_at == "2026-01-02T00:00:00Z"
+
+
+def test_refresh_index_not_modified(tmp_path):
+    """Test an unchanged listing is answered from the saved index with a single 304."""
+    requester = FakeRequester([[listed("advisory-0", "2026-01-01T00:00:00Z", ghsa_id="GHSA-0")]])
+    index = AdvisoryIndex(tmp_path / "advisories.json")
+    index.refresh(FakeRepository(requester=requester))
+    index.save()
+
+    loaded = AdvisoryIndex(tmp_path / "advisories.json")
+    assert (loaded.etag, loaded.updated_at, loaded.full_refresh_at) == (
+        index.etag,
+        index.updated_at,
+        index.full_refresh_at,
+    )
+    assert loaded.keys == index.keys
+    assert loaded.ghsa_id("advisory-0") == "GHSA-0"
+    assert "advisory-0" not in (tmp_path / "advisories.json").read_text()
+
+    assert loaded.refresh(FakeRepository(requester=requester)) == 1
+    assert "advisory-0" in loaded
+    assert loaded.etag == index.etag
+
+
+def test_refresh_index_drops_removed_advisories(tmp_path, monkeypatch):
+    """Test deleted advisories are dropped by a full refresh and withdrawn ones right away."""
+    index = AdvisoryIndex(tmp_path / "advisories.json")
+    index.refresh(
+        FakeRepository(
+            requester=FakeRequester(
+                [
+                    [
+                        listed("withdrawn", "2026-01-03T00:00:00Z"),
+                        listed("deleted", "2026-01-02T00:00:00Z"),
+                        listed("kept", "2026-01-01T00:00:00Z"),
+                    ]
+                ]
+            )
+        )
+    )
+    remaining = [
+        listed("withdrawn", "2026-01-04T00:00:00Z", state="withdrawn"),
+        listed("kept", "2026-01-01T00:00:00Z"),
+    ]
+
+    # An incremental refresh only sees the withdrawn advisory
+    index.refresh(FakeRepository(requester=FakeRequester([remaining[:1], remaining[1:]])))
+    assert "withdrawn" not in index
+    assert "deleted" in index and "kept" in index
+
+    # Once due, a full refresh lists every advisory again, ignoring the ETag
+    monkeypatch.setattr(
+        check_vulnerabilities.time,
+        "time",
+        lambda: index.full_refresh_at + index.FULL_REFRESH_INTERVAL,
+    )
+    requester = FakeRequester([remaining])
+    assert index.refresh(FakeRepository(requester=requester)) == 1
+    assert "deleted" not in index
+    assert "kept" in index
+    assert index.keys == set(index._keys("kept"))
+
+
+def test_github_client_does_not_retry_rate_limits():
+    """Test the GitHub client leaves rate limits to the submitter."""
+    client = check_vulnerabilities.github_client("token")
+    retry = client.requester._Requester__retry
+
+    assert not isinstance(retry, github.GithubRetry)
+    assert 403 not in retry.status_forcelist and 429 not in retry.status_forcelist
+
+
+class ServerErrorHandler(BaseHTTPRequestHandler):
+    """Answer every request with a server error."""
+
+    requests: list[str] = []
+
+    def do_GET(self):  # noqa: N802
+        """Fail the request."""
+        self.requests.append(self.path)
+        self.send_response(502)
+        self.end_headers()
+
+    def log_message(self, *args):
+        """Keep the test output quiet."""
+
+
+def test_submit_gives_up_on_server_errors(monkeypatch, sleeps):
+    """Test requests still failing once the client retried the server errors are summarized."""
+    ServerErrorHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ServerErrorHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(github, "Github", functools.partial(github.Github, base_url=base_url))
+    client = check_vulnerabilities.github_client("token")
+    report = check_vulnerabilities.RunReport()
+    submitter = AdvisorySubmitter(None, report=report)
+
+    try:
+        with pytest.raises(github.GithubException) as exc_info:
+            submitter.call(client.get_repo, full_name_or_id="owner/repo")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert exc_info.value.status == 502
+    assert "get_repo still failing after retrying server errors" in str(exc_info.value)
+    assert exc_info.value.__cause__ is None
+    # The client retried the server errors, the submitter did not retry them again
+    assert len(ServerErrorHandler.requests) == 4
+    assert report.retries == 0
+    assert report.api_calls == {"get_repo": 1}
+
+
+REPORT = {
+    "errors": [],
+    "generated_at": "2026-01-01T00:00:00Z",
+    "metrics": {"_totals": {"loc": 1.5, "nosec": 0, "SEVERITY.HIGH": -2e-3}},
+    "results": [
+        1.5,
+        10,
+        -3,
+        1.0e10,
+        -0.25e-7,
+        True,
+        None,
+        'a \\"quoted\\" string, with ] and }',
+        {"filename": "src/é.py", "line_range": [12, 13], "nested": {"score": 0.125}},
+        [],
+        {},
+    ],
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_report_entries(tmp_path, chunk_size, indent):
+    """Test entries are decoded whatever the chunk boundaries."""
+    report = tmp_path / "info_bandit.json"
+    report.write_text(json.dumps(REPORT, indent=indent), encoding="utf-8")
+
+    assert list(iter_report_entries(report, "results", chunk_size)) == REPORT["results"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3])
+def test_decode_number_split_across_chunks(chunk_size):
+    """Test a number split across chunks is decoded whole."""
+    stream = _JsonStream(io.StringIO("[1.5, -20, 3e+2]"), chunk_size)
+
+    assert list(stream.iter_array()) == [1.5, -20, 300.0]
+
+
+@pytest.mark.parametrize(
+    "document,error",
+    [
+        ('{"errors": []}', KeyError),
+        ("{}", KeyError),
+        ('["results"]', ValueError),
+        ('{"results": [1, 2', ValueError),
+        ('{"results": [1 2]}', ValueError),
+    ],
+)
+def test_iter_report_entries_invalid(tmp_path, document, error):
+    """Test missing keys and invalid reports are reported."""
+    report = tmp_path / "info_bandit.json"
+    report.write_text(document, encoding="utf-8")
+
+    with pytest.raises(error):
+        list(iter_report_entries(report, "results", chunk_size=3))
+
+
+def test_iter_report_entries_memory():
+    """Test the buffer only holds about one entry, whatever the size of the report."""
+    entry = {"filename": "src/module.py", "code": "x = 1\n" * 20, "line_range": [1, 2]}
+    document = json.dumps({"results": [entry] * 2000})
+    entry_size = len(json.dumps(entry))
+    stream = _JsonStream(io.StringIO(document), chunk_size=256)
+
+    stream.seek_key("results")
+    largest_buffer = 0
+    for item in stream.iter_array():
+        assert item == entry
+        largest_buffer = max(largest_buffer, len(stream.buffer))
+
+    assert largest_buffer < 4 * (entry_size + 256) < len(document) / 100
+
+
+BANDIT_RESULT = {
+    "code": "11 def check(value):\n12     assert value\n13 \n",
+    "filename": "src/demo/check.py",
+    "issue_cwe": {"id": 703, "link": "https://cwe.mitre.org/data/definitions/703.html"},
+    "issue_severity": "LOW",
+    "issue_text": "Use of assert detected.",
+    "line_number": 12,
+    "line_range": [12],
+    "more_info": "https://bandit.readthedocs.io/en/latest/plugins/b101_assert_used.html",
+    "test_id": "B101",
+    "test_name": "assert_used",
+}
+
+
+def bandit_summary(result: dict, result_hash: str) -> str:
+    """Build the summary of the advisory of a Bandit result."""
+    return (
+        f"Bandit [{result['test_id']}:{result['test_name']}] on {result['filename']}"
+        f" - Hash: {result_hash}"
+    )
+
+
+@pytest.fixture
+def run_check(tmp_path, monkeypatch):
+    """Run ``check_vulnerabilities`` against a fake repository, from ``tmp_path``."""
+    monkeypatch.chdir(tmp_path)
+    for name, value in {
+        "TOKEN": "token",
+        "REPOSITORY": "ansys/demo",
+        "PACKAGE": "demo",
+        "DRY_RUN": False,
+        "CREATE_ISSUES": False,
+        "COALESCE_SAFETY": False,
+        "ADVISORY_CACHE": str(tmp_path / "advisories.json"),
+        "RUN_REPORT": str(tmp_path / "run_report.json"),
+    }.items():
+        monkeypatch.setattr(check_vulnerabilities, name, value)
+
+    def _run_check(repo, safety=(), bandit=()):
+        (tmp_path / "info_safety.json").write_text(json.dumps({"vulnerabilities": list(safety)}))
+        (tmp_path / "info_bandit.json").write_text(json.dumps({"results": list(bandit)}))
+
+        class FakeGithub:
+            def get_repo(self, name):
+                return repo
+
+        monkeypatch.setattr(check_vulnerabilities, "github_client", lambda token: FakeGithub())
+        return check_vulnerabilities.check_vulnerabilities()
+
+    return _run_check
+
+
+def test_legacy_bandit_advisory_is_migrated(run_check):
+    """Test advisories identified by the legacy MD5 hash keep matching once it changes."""
+    legacy_summary = bandit_summary(BANDIT_RESULT, check_vulnerabilities.dict_hash(BANDIT_RESULT))
+    requester = FakeRequester(
+        [
+            [
+                {
+                    "ghsa_id": "GHSA-xxxx-yyyy-zzzz",
+                    "summary": legacy_summary,
+                    "updated_at": "2026-01-01T00:00:00Z",
+                }
+            ]
+        ]
+    )
+    repo = FakeRepository(requester=requester)
+
+    assert run_check(repo, bandit=[BANDIT_RESULT]) is False
+    new_summary = bandit_summary(
+        BANDIT_RESULT, check_vulnerabilities.bandit_fingerprint(BANDIT_RESULT)
+    )
+    assert requester.edits == [
+        (
+            "PATCH",
+            f"{repo.url}/security-advisories/GHSA-xxxx-yyyy-zzzz",
+            {"summary": new_summary},
+        )
+    ]
+
+    # Unrelated code is added above the finding: the legacy hash changes but the index
+    # already knows the new fingerprint, even though the listing is not modified
+    shifted = {
+        **BANDIT_RESULT,
+        "code": "13 def check(value):\n14     assert value\n15 \n",
+        "line_number": 14,
+        "line_range": [14],
+    }
+    assert run_check(repo, bandit=[shifted]) is False
+    assert repo.advisories == []
+    assert len(requester.edits) == 1
+
+
+BANDIT_EXE = shutil.which("bandit")
+requires_bandit = pytest.mark.skipif(BANDIT_EXE is None, reason="bandit is not installed")
+
+
+@pytest.fixture
+def bandit_tree(tmp_path, monkeypatch):
+    """Create a source tree with Bandit findings and record the scanned files."""
+    monkeypatch.chdir(tmp_path)
+    package = tmp_path / "src" / "demo"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "check.py").write_text("def check(value):\n    assert value\n")
+    (package / "shell.py").write_text(
+        "import subprocess\n\n\ndef run(cmd):\n    return subprocess.call(cmd, shell=True)\n"
+    )
+
+    scanned = []
+    run_tool = check_vulnerabilities.run_tool
+
+    def recording_run_tool(name, command):
+        scanned.extend(sorted(arg for arg in command if arg.endswith(".py")))
+        return run_tool(name, command)
+
+    monkeypatch.setattr(check_vulnerabilities, "run_tool", recording_run_tool)
+    return scanned
+
+
+def scan(jobs: int = 3) -> dict:
+    """Scan the source tree incrementally, as the local mode does."""
+    args, config_files = bandit_config(Path("src"))
+    files = sorted(Path("src").rglob("*.py"))
+    cache_path = Path(".bandit-cache.json")
+    return run_incremental_bandit(BANDIT_EXE, files, jobs, cache_path, args, config_files)
+
+
+def findings(report: dict) -> list[tuple[str, str, int]]:
+    """Get the test id, file and line of each finding of a report."""
+    return [
+        (result["test_id"], Path(result["filename"]).name, result["line_number"])
+        for result in report["results"]
+    ]
+
+
+@requires_bandit
+def test_incremental_bandit(bandit_tree):
+    """Test only the files changed since the previous run are scanned."""
+    first = scan()
+    assert sorted(bandit_tree) == ["src/demo/__init__.py", "src/demo/check.py", "src/demo/shell.py"]
+    assert findings(first) == [
+        ("B101", "check.py", 2),
+        ("B404", "shell.py", 1),
+        ("B602", "shell.py", 5),
+    ]
+
+    bandit_tree.clear()
+    assert findings(scan()) == findings(first)
+    assert bandit_tree == []
+
+    Path("src/demo/check.py").write_text("# Checks\n\n\ndef check(value):\n    assert value\n")
+    third = scan()
+    assert bandit_tree == ["src/demo/check.py"]
+    assert findings(third) == [
+        ("B101", "check.py", 5),
+        ("B404", "shell.py", 1),
+        ("B602", "shell.py", 5),
+    ]
+    # The merged report matches a full scan
+    full = check_vulnerabilities.run_bandit(BANDIT_EXE, sorted(Path("src").rglob("*.py")), 1)
+    assert third["results"] == full["results"]
+    assert third["metrics"]["_totals"] == full["metrics"]["_totals"]
+
+
+@requires_bandit
+def test_incremental_bandit_config_change(bandit_tree):
+    """Test the whole tree is scanned again when the Bandit configuration changes."""
+    scan()
+    Path("src/.bandit").write_text("[bandit]\nskips = B101\n")
+    bandit_tree.clear()
+
+    report = scan()
+
+    assert sorted(bandit_tree) == ["src/demo/__init__.py", "src/demo/check.py", "src/demo/shell.py"]
+    assert findings(report) == [("B404", "shell.py", 1), ("B602", "shell.py", 5)]
+
+
+@requires_bandit
+def test_incremental_bandit_failed_shard(bandit_tree, monkeypatch):
+    """Test the files of a failed shard are reported and not cached."""
+    run_tool = check_vulnerabilities.run_tool
+
+    def failing_run_tool(name, command):
+        if "src/demo/shell.py" in command:
+            return 2, "", 0.0
+        return run_tool(name, command)
+
+    monkeypatch.setattr(check_vulnerabilities, "run_tool", failing_run_tool)
+    with pytest.raises(RuntimeError, match="1 of 3 Bandit shard"):
+        scan()
+    cache = json.loads(Path(".bandit-cache.json").read_text())
+    assert sorted(cache["files"]) == ["src/demo/__init__.py", "src/demo/check.py"]
+
+    monkeypatch.setattr(check_vulnerabilities, "run_tool", run_tool)
+    bandit_tree.clear()
+    report = scan()
+    assert bandit_tree == ["src/demo/shell.py"]
+    assert [test_id for test_id, _, _ in findings(report)] == ["B101", "B404", "B602"]
+
+
+def test_run_tool(capsys):
+    """Test the output of a tool is streamed with a prefix and returned."""
+    code = "import sys; print('out'); print('err', file=sys.stderr, flush=True); sys.exit(3)"
+
+    return_code, output, elapsed = run_tool("tool", [sys.executable, "-c", code])
+
+    assert return_code == 3
+    assert sorted(output.splitlines()) == ["err", "out"]
+    assert sorted(capsys.readouterr().out.splitlines()) == ["[tool] err", "[tool] out"]
+    assert elapsed > 0
+
+
+@pytest.mark.parametrize("jobs", [1, 3, 4, 20])
+def test_shard_files(tmp_path, jobs):
+    """Test files are split into balanced shards without losing any of them."""
+    files = []
+    for index, size in enumerate([900, 700, 500, 400, 300, 300, 200, 100, 100, 0]):
+        files.append(tmp_path / f"module_{index}.py")
+        files[-1].write_text("x" * size)
+
+    shards = shard_files(files, jobs)
+
+    assert len(shards) == min(jobs, len(files))
+    assert all(shards)
+    assert sorted(file for shard in shards for file in shard) == sorted(files)
+    sizes = [sum(file.stat().st_size for file in shard) for shard in shards]
+    # The greedy assignment is never off by more than the largest file
+    assert max(sizes) - min(sizes) <= 900
+
+
+def test_merge_bandit_reports():
+    """Test shard reports are merged with recomputed metric totals."""
+    metrics = {"loc": 10, "nosec": 0, "SEVERITY.HIGH": 1}
+    reports = [
+        {
+            "errors": [{"filename": "src/b.py", "reason": "syntax error"}],
+            "generated_at": "2026-01-01T00:00:02Z",
+            "metrics": {"src/b.py": metrics, "_totals": {"loc": 999}},
+            "results": [
+                {"filename": "src/b.py", "line_number": 3, "test_id": "B101"},
+                {"filename": "src/b.py", "line_number": 1, "test_id": "B404"},
+            ],
+        },
+        {
+            "errors": [],
+            "generated_at": "2026-01-01T00:00:01Z",
+            "metrics": {"src/a.py": {**metrics, "loc": 5}, "_totals": {"loc": 999}},
+            "results": [{"filename": "src/a.py", "line_number": 7, "test_id": "B602"}],
+        },
+    ]
+
+    merged = merge_bandit_reports(reports)
+
+    assert [(result["filename"], result["line_number"]) for result in merged["results"]] == [
+        ("src/a.py", 7),
+        ("src/b.py", 1),
+        ("src/b.py", 3),
+    ]
+    assert merged["errors"] == [{"filename": "src/b.py", "reason": "syntax error"}]
+    assert merged["generated_at"] == "2026-01-01T00:00:02Z"
+    assert merged["metrics"]["src/a.py"]["loc"] == 5
+    assert merged["metrics"]["_totals"] == {"loc": 15, "nosec": 0, "SEVERITY.HIGH": 2}
+
+
+@requires_bandit
+def test_generate_advisory_files_jobs(bandit_tree, tmp_path):
+    """Test the advisory files do not depend on the number of Bandit jobs."""
+    for index in range(5):
+        (tmp_path / "src" / "demo" / f"module_{index}.py").write_text(
+            "import pickle\n\n\ndef load(data):\n"
+            + "    assert data\n" * index
+            + "    return pickle.loads(data)\n"
+        )
+    (tmp_path / "insecure_full.json").write_text(json.dumps(SAFETY_DATABASE))
+    (tmp_path / "requirements-for-safety.txt").write_text("django==4.2.1\n")
+
+    files = {}
+    for jobs in (1, 4):
+        generate_advisory_files(bandit_jobs=jobs, offline_db=tmp_path / "insecure_full.json")
+        files[jobs] = {
+            name: json.loads((tmp_path / name).read_text())
+            for name in ("info_safety.json", "info_bandit.json")
+        }
+        files[jobs]["info_bandit.json"].pop("generated_at")
+
+    assert files[1] == files[4]
+    assert len(files[1]["info_bandit.json"]["results"]) == 23
+    assert files[1]["info_safety.json"]["vulnerabilities"][0]["vulnerability_id"] == "70001"
+
+
+SAFETY_PACKAGES = {
+    "Django": [
+        {
+            "advisory": "Potential SQL injection.",
+            "cve": "CVE-2026-0001",
+            "id": "pyup.io-70001",
+            "more_info_path": "/vulnerabilities/CVE-2026-0001/70001/",
+            "specs": ["<4.2.10", ">=5.0a1,<5.0.2"],
+        },
+        {
+            "advisory": "Fixed long ago.",
+            "ids": [{"type": "cve", "id": "CVE-2020-0002"}, {"type": "pyup", "id": "40002"}],
+            "more_info_path": "/vulnerabilities/CVE-2020-0002/40002/",
+            "specs": ["<3.0"],
+        },
+    ],
+    "zope.interface": [
+        {
+            "advisory": "Not fixed yet.",
+            "id": "pyup.io-50003",
+            "more_info_path": "/vulnerabilities/50003/",
+            "specs": ["<=5.4"],
+        }
+    ],
+}
+
+
+SAFETY_DATABASE = {"$meta": {"schema_version": "2.0.0"}, "vulnerable_packages": SAFETY_PACKAGES}
+
+
+@pytest.mark.parametrize(
+    "database",
+    [
+        SAFETY_DATABASE,
+        {"$meta": {"timestamp": 1767225600}, **SAFETY_PACKAGES},
+    ],
+    ids=["current", "legacy"],
+)
+def test_offline_safety_check(tmp_path, database):
+    """Test pinned requirements are matched against a local database snapshot."""
+    (tmp_path / "insecure_full.json").write_text(json.dumps(database))
+    (tmp_path / "requirements.txt").write_text(
+        "# Pinned requirements\n"
+        "-r other-requirements.txt\n"
+        "django==4.2.1 \\\n"
+        "    --hash=sha256:0123456789abcdef\n"
+        "zope-interface==5.4 ; python_version >= '3.10'\n"
+        "requests>=2\n"
+        "urllib3==2.7.0\n"
+    )
+    (tmp_path / ".safety-ignore.yml").write_text(
+        "security:\n  ignore-vulnerabilities:\n    50003:\n      reason: Not used\n"
+    )
+
+    offline_safety_check(
+        tmp_path / "insecure_full.json",
+        tmp_path / "requirements.txt",
+        tmp_path / ".safety-ignore.yml",
+        tmp_path / "info_safety.json",
+    )
+
+    report = json.loads((tmp_path / "info_safety.json").read_text())
+    assert report["vulnerabilities"] == [
+        {
+            "vulnerability_id": "70001",
+            "package_name": "django",
+            "analyzed_version": "4.2.1",
+            "vulnerable_spec": ["<4.2.10"],
+            "all_vulnerable_specs": ["<4.2.10", "<5.0.2,>=5.0a1"],
+            "advisory": "Potential SQL injection.",
+            "CVE": "CVE-2026-0001",
+            "more_info_url": "https://pyup.io/vulnerabilities/CVE-2026-0001/70001/",
+            "fixed_versions": ["4.2.10", "5.0.2"],
+        }
+    ]
+    assert [
+        (v["vulnerability_id"], v["package_name"], v["fixed_versions"])
+        for v in report["ignored_vulnerabilities"]
+    ] == [("50003", "zope-interface", [])]
+    assert (
+        list(iter_report_entries(tmp_path / "info_safety.json", "vulnerabilities"))
+        == (report["vulnerabilities"])
+    )
+
+
+@pytest.mark.parametrize(
+    "version,fixed_versions",
+    [("2.2", ["3.0", "4.2.10", "5.0.2"]), ("5.0.1", ["5.0.2"]), ("5.0.2", [])],
+)
+def test_vulnerability_database_fixed_versions(tmp_path, version, fixed_versions):
+    """Test the fixed versions are the non-vulnerable upper bounds above the version."""
+    (tmp_path / "insecure_full.json").write_text(json.dumps(SAFETY_PACKAGES))
+    database = check_vulnerabilities.VulnerabilityDatabase(tmp_path / "insecure_full.json")
+
+    matches = database.match("DJANGO", version)
+
+    assert sorted({v for match in matches for v in match["fixed_versions"]}) == fixed_versions
+
+
+SAFETY_FINDING = {
+    "vulnerability_id": "70001",
+    "package_name": "django",
+    "analyzed_version": "4.2.1",
+    "vulnerable_spec": ["<4.2.10"],
+    "advisory": "Potential SQL injection.",
+    "CVE": "CVE-2026-0001",
+    "more_info_url": "https://pyup.io/vulnerabilities/CVE-2026-0001/70001/",
+    "fixed_versions": ["4.2.10"],
+}
+
+
+def safety_finding(v_id: str, package: str, cve: str | None = None) -> dict:
+    """Build a Safety finding affecting versions below 2.0 of a package."""
+    return {
+        **SAFETY_FINDING,
+        "vulnerability_id": v_id,
+        "package_name": package,
+        "vulnerable_spec": ["<2.0"],
+        "advisory": f"Advisory {v_id}.",
+        "CVE": cve,
+        "more_info_url": f"https://pyup.io/vulnerabilities/{v_id}/",
+        "fixed_versions": ["2.0"],
+    }
+
+
+COALESCED_FINDINGS = [
+    safety_finding("70001", "django", "CVE-2026-0001"),
+    safety_finding("70002", "django", "CVE-2026-0002"),
+    safety_finding("70003", "django", "CVE-2026-0003"),
+    safety_finding("80001", "requests"),
+    safety_finding("80002", "requests", "CVE-2026-0004"),
+]
+
+
+def advisory_listing(*summaries: str) -> FakeRequester:
+    """Build a requester listing advisories with the given summaries."""
+    return FakeRequester(
+        [
+            [
+                {"ghsa_id": f"GHSA-{i}", "summary": summary, "updated_at": f"2026-01-0{i + 1}"}
+                for i, summary in enumerate(summaries)
+            ]
+        ]
+    )
+
+
+def test_coalesce_safety_findings(run_check, monkeypatch):
+    """Test new findings are coalesced per package and version range only."""
+    monkeypatch.setattr(check_vulnerabilities, "COALESCE_SAFETY", True)
+    existing = "Safety vulnerability 70002 for package 'django'"
+    repo = FakeRepository(requester=advisory_listing(existing))
+
+    assert run_check(repo, safety=COALESCED_FINDINGS) is True
+
+    django = "Safety vulnerabilities 70001, 70003 for package 'django'"
+    requests = "Safety vulnerabilities 80001, 80002 for package 'requests'"
+    assert sorted(repo.advisories) == [django, requests]
+    # The finding with a per-id advisory is neither reported again nor merged
+    assert "70002" not in repo.created[django]["description"]
+    assert repo.requester.edits == []
+    description = repo.created[django]["description"]
+    assert "CVEs: CVE-2026-0001, CVE-2026-0003" in description
+    assert description.index("Advisory 70001.") < description.index("Advisory 70003.")
+    assert repo.created[django]["cve_id"] is None
+    assert repo.created[requests]["cve_id"] == "CVE-2026-0004"
+    vulnerability = repo.created[requests]["vulnerabilities"][0]
+    assert vulnerability["vulnerable_version_range"] == "['<2.0']"
+    assert vulnerability["patched_versions"] == "['2.0']"
+
+    # The coalesced advisories cover their findings in the next runs, in both modes
+    rerun = FakeRepository(requester=advisory_listing(existing, django, requests))
+    assert run_check(rerun, safety=COALESCED_FINDINGS) is False
+    monkeypatch.setattr(check_vulnerabilities, "COALESCE_SAFETY", False)
+    assert run_check(rerun, safety=COALESCED_FINDINGS) is False
+    assert rerun.advisories == []
+
+
+def test_coalesce_safety_findings_lone_finding(run_check, monkeypatch):
+    """Test a lone new finding keeps the per-id advisory."""
+    monkeypatch.setattr(check_vulnerabilities, "COALESCE_SAFETY", True)
+    repo = FakeRepository(requester=advisory_listing())
+
+    assert run_check(repo, safety=COALESCED_FINDINGS[:1]) is True
+
+    summary = "Safety vulnerability 70001 for package 'django'"
+    assert repo.advisories == [summary]
+    assert repo.created[summary]["cve_id"] == "CVE-2026-0001"
+    assert "#### More information" in repo.created[summary]["description"]
+
+
+def test_safety_findings_not_coalesced(run_check):
+    """Test an advisory is created for every new finding when coalescing is off."""
+    existing = "Safety vulnerabilities 70001, 70002 for package 'django'"
+    repo = FakeRepository(requester=advisory_listing(existing))
+
+    assert run_check(repo, safety=COALESCED_FINDINGS) is True
+
+    assert sorted(repo.advisories) == [
+        "Safety vulnerability 70003 for package 'django'",
+        "Safety vulnerability 80001 for package 'requests'",
+        "Safety vulnerability 80002 for package 'requests'",
+    ]
+
+
+def test_run_report_phases(tmp_path, run_check, monkeypatch):
+    """Test each phase of a run, including issue creation, is reported."""
+    monkeypatch.setattr(check_vulnerabilities, "CREATE_ISSUES", True)
+    repo = FakeRepository(requester=FakeRequester([[]]))
+
+    assert run_check(repo, safety=[SAFETY_FINDING], bandit=[BANDIT_RESULT]) is True
+
+    report = json.loads((tmp_path / "run_report.json").read_text())
+    assert report["error"] is None
+    assert list(report["phases"]) == [
+        "load_reports",
+        "list_advisories",
+        "diff",
+        "migrate_advisories",
+        "create_advisories",
+        "create_issues",
+    ]
+    assert report["api"]["create_repository_advisory"]["calls"] == 2
+    assert report["api"]["create_issue"]["calls"] == 2
+    assert report["totals"] == {
+        "safety_advisories_detected": 1,
+        "safety_advisories_reported": 1,
+        "bandit_advisories_detected": 1,
+        "bandit_advisories_reported": 1,
+    }
+
+
+def test_run_report_on_failure(tmp_path, run_check):
+    """Test the run report is written when the run fails."""
+    error = github.GithubException(422, {"message": "Validation failed"}, {})
+    repo = FakeRepository(failures=[error], requester=FakeRequester([[]]))
+
+    with pytest.raises(github.GithubException):
+        run_check(repo, safety=[SAFETY_FINDING])
+
+    report = json.loads((tmp_path / "run_report.json").read_text())
+    assert report["error"].startswith("GithubException: 422")
+    assert "create_advisories" not in report["phases"]
+    assert report["totals"]["safety_advisories_reported"] == 1
+
+
+def test_run_report_path(monkeypatch, tmp_path):
+    """Test the run report is written to the runner temporary directory by default."""
+    monkeypatch.setattr(check_vulnerabilities, "RUN_REPORT", None)
+    monkeypatch.setenv("RUNNER_TEMP", str(tmp_path))
+    assert check_vulnerabilities.run_report_path() == tmp_path / "check_vulnerabilities_run.json"
+
+    monkeypatch.setattr(check_vulnerabilities, "RUN_REPORT", str(tmp_path / "report.json"))
+    assert check_vulnerabilities.run_report_path() == tmp_path / "report.json"
+
+
+def test_run_report_timed():
+    """Test the time spent producing lazy items is not accounted to their consumer."""
+    report = check_vulnerabilities.RunReport()
+
+    def slow_items():
+        for item in range(3):
+            time.sleep(0.02)
+            yield item
+
+    assert list(report.timed(slow_items(), "load_reports")) == [0, 1, 2]
+    report.end_phase("diff")
+
+    assert report.phases["load_reports"] >= 0.06
+    assert report.phases["diff"] < 0.02
+
+
+def test_update_digest_issue(sleeps):
+    """Test the digest issue is listed and edited through the submitter."""
+    repo = FakeRepository()
+    digest = FakeIssue(check_vulnerabilities.DIGEST_ISSUE_TITLE, "Header\n\n## Old section\n")
+    repo.open_issues = [FakeIssue("Another issue", ""), digest]
+    repo.issue_failures = [rate_limit_error()]
+    report = check_vulnerabilities.RunReport()
+    submitter = AdvisorySubmitter(repo, report=report)
+
+    check_vulnerabilities.update_digest_issue(submitter, "## New section\n")
+
+    assert len(digest.edits) == 1
+    assert digest.body.index("## New section") < digest.body.index("## Old section")
+    assert report.api_calls == {"get_issues": 2, "edit": 1}
+    assert report.retries == 1
+    assert repo.issues == []
@@ -0,0 +1,221 @@
+# Copyright (C) 2022 - 2026 Synopsys, Inc. and ANSYS, Inc. All rights reserved.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Add the canonical link tags to the HTML pages of a documentation website.
+
+Every page of every version declares the page of the stable version as its canonical URL, and
+the index page of the stable (or development) version declares the landing page. Each file is
+read and written at most once, and files whose tags are already correct are not rewritten.
+"""
+
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+import os
+from pathlib import Path
+
+CANONICAL_MARKER = b'<link rel="canonical"'
+HEAD_END_MARKER = b"</head>"
+EXCLUDED_PAGES = ("announcement.html", "webpack-macros.html")
+
+
+def iter_html_files(version_dir: Path) -> Iterator[Path]:
+    """Walk the version directory and yield its HTML files.
+
+    Parameters
+    ----------
+    version_dir: Path
+        Directory containing the version pages of the website.
+
+    Yields
+    ------
+    Path
+        The path of each HTML file.
+    """
+    pending = [str(version_dir)]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.endswith(".html"):
+                    yield Path(entry.path)
+
+
+def canonical_tag(cname: str, version_dir: Path, landing_index: Path, file: Path) -> bytes | None:
+    """Get the canonical link tag of an HTML file.
+
+    Parameters
+    ----------
+    cname: str
+        The canonical name (CNAME) containing the documentation.
+    version_dir: Path
+        Directory containing the version pages of the website.
+    landing_index: Path
+        The index page whose canonical URL is the landing page.
+    file: Path
+        The HTML file.
+
+    Returns
+    -------
+    bytes | None
+        The tag line to insert, or ``None`` if the file must not have a canonical tag.
+    """
+    if file == landing_index:
+        return f'  <link rel="canonical" href="https://{cname}/">\n'.encode()
+    relative_parts = file.relative_to(version_dir).parts
+    if file.name in EXCLUDED_PAGES or len(relative_parts) < 2:
+        return None
+    relative_path = "/".join(relative_parts[1:])
+    url = f"https://{cname}/version/stable/{relative_path}"
+    return f'  <link rel="canonical" href="{url}" />\n'.encode()
+
+
+def _line_bounds(content: bytes, position: int) -> tuple[int, int]:
+    """Get the start and end (including the line break) of the line containing a position."""
+    start = content.rfind(b"\n", 0, position) + 1
+    end = content.find(b"\n", position)
+    return start, len(content) if end == -1 else end + 1
+
+
+def replace_canonical_tags(content: bytes, tag: bytes | None) -> bytes:
+    """Replace the canonical link tags of an HTML document.
+
+    Lines containing a canonical link are removed and, if provided, the tag line is inserted
+    before every line starting with the closing ``</head>`` tag. The content is only scanned
+    with ``bytes.find``, which is much faster than a multiline regular expression on the long
+    lines of minified pages.
+
+    Parameters
+    ----------
+    content: bytes
+        The HTML document.
+    tag: bytes | None
+        The tag line to insert, if any.
+
+    Returns
+    -------
+    bytes
+        The updated HTML document.
+    """
+    parts = []
+    start = 0
+    position = content.find(CANONICAL_MARKER)
+    while position != -1:
+        line_start, line_end = _line_bounds(content, position)
+        parts.append(content[start:line_start])
+        start = line_end
+        position = content.find(CANONICAL_MARKER, line_end)
+    parts.append(content[start:])
+    content = b"".join(parts)
+
+    if tag is None:
+        return content
+    parts = []
+    start = 0
+    position = content.find(HEAD_END_MARKER)
+    while position != -1:
+        line_start = content.rfind(b"\n", 0, position) + 1
+        if not content[line_start:position].strip(b" "):
+            parts += [content[start:line_start], tag]
+            start = line_start
+        position = content.find(HEAD_END_MARKER, position + len(HEAD_END_MARKER))
+    parts.append(content[start:])
+    return b"".join(parts)
+
+
+def rewrite_file(file: Path, tag: bytes | None) -> int | None:
+    """Replace the canonical link tags of an HTML file in a single read and write.
+
+    Parameters
+    ----------
+    file: Path
+        The HTML file.
+    tag: bytes | None
+        The tag line inserted before the closing ``</head>`` tag, if any.
+
+    Returns
+    -------
+    int | None
+        Number of bytes written, or ``None`` if the file was already up to date.
+    """
+    content = file.read_bytes()
+    new_content = replace_canonical_tags(content, tag)
+    if new_content == content:
+        return None
+    file.write_bytes(new_content)
+    return len(new_content)
+
+
+def _rewrite_file(job: tuple[Path, bytes | None]) -> int | None:
+    return rewrite_file(*job)
+
+
+def add_canonical_tags(
+    cname: str, version_dir: str | Path, max_workers: int | None = None
+) -> tuple[int, int, int]:
+    """Add the canonical link tags to every HTML file of the version directory.
+
+    Parameters
+    ----------
+    cname: str
+        The canonical name (CNAME) containing the documentation.
+    version_dir: str | Path
+        Directory containing the version pages of the website.
+    max_workers: int | None
+        Maximum number of processes. Defaults to the ``ProcessPoolExecutor`` default.
+
+    Returns
+    -------
+    tuple[int, int, int]
+        Number of HTML files found, number of files rewritten and number of bytes written.
+
+    Raises
+    ------
+    FileNotFoundError
+        If neither the stable nor the development version has an index page.
+    """
+    version_dir = Path(version_dir)
+    for landing_index in (
+        version_dir / "stable" / "index.html",
+        version_dir / "dev" / "index.html",
+    ):
+        if landing_index.is_file():
+            break
+    else:
+        raise FileNotFoundError("The 'index.html' file does not exist.")
+
+    jobs = [
+        (file, canonical_tag(cname, version_dir, landing_index, file))
+        for file in iter_html_files(version_dir)
+    ]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        written = [
+            size
+            for size in executor.map(_rewrite_file, jobs, chunksize=max(1, len(jobs) // 256))
+            if size is not None
+        ]
+
+    print(
+        f"Canonical links: {len(jobs)} HTML files found, {len(written)} rewritten, "
+        f"{sum(written)} bytes written."
+    )
+    return len(jobs), len(written), sum(written)
@@ -0,0 +1,135 @@
+# Copyright (C) 2022 - 2026 Synopsys, Inc. and ANSYS, Inc. All rights reserved.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Utilities for writing step outputs and environment variables in GitHub Actions."""
+
+import os
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+import uuid
+
+
+class GitHubFileWriter:
+    """Buffered writer for the ``GITHUB_OUTPUT`` and ``GITHUB_ENV`` files.
+
+    Variables are collected while the context is open and flushed to the file in a single
+    append when it exits without error. Multiline values use a random heredoc delimiter which
+    is guaranteed not to appear in the value.
+
+    Parameters
+    ----------
+    file_variable: str
+        The environment variable holding the path of the file to write to, i.e.
+        ``GITHUB_OUTPUT`` or ``GITHUB_ENV``.
+
+    Examples
+    --------
+    >>> with GitHubFileWriter("GITHUB_OUTPUT") as output:
+    ...     output.set("VERSION", "1.2")
+    ...     output.set("PRE_RELEASE", "false")
+    """
+
+    def __init__(self, file_variable: str = "GITHUB_OUTPUT"):
+        self.file_variable = file_variable
+        self._variables: dict[str, str] = {}
+        self._written: set[str] = set()
+
+    def __enter__(self) -> Self:
+        """Start collecting variables."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Flush the collected variables, unless an exception was raised."""
+        if exc_type is None:
+            self.flush()
+
+    def set(self, name: str, value: str) -> None:
+        """Add a variable to be written.
+
+        Parameters
+        ----------
+        name: str
+            The name of the variable.
+        value: str
+            The value of the variable.
+
+        Raises
+        ------
+        ValueError
+            If the name is invalid or the variable was already set.
+        """
+        if not name or "=" in name or "<<" in name or any(char in name for char in "\r\n"):
+            raise ValueError(f"Invalid {self.file_variable} variable name: {name!r}")
+        if name in self._variables or name in self._written:
+            raise ValueError(f"{name} is written more than once to {self.file_variable}.")
+        self._variables[name] = value
+
+    def render(self) -> str:
+        """Render the collected variables in the GitHub Actions file format.
+
+        Returns
+        -------
+        str
+            The content to append to the file.
+        """
+        lines = []
+        for name, value in self._variables.items():
+            if "\n" in value or "\r" in value:
+                delimiter = f"ghadelimiter_{uuid.uuid4().hex}"
+                while delimiter in value:
+                    delimiter = f"ghadelimiter_{uuid.uuid4().hex}"
+                lines.append(f"{name}<<{delimiter}\n{value}\n{delimiter}\n")
+            else:
+                lines.append(f"{name}={value}\n")
+        return "".join(lines)
+
+    def flush(self) -> None:
+        """Append the collected variables to the file in a single write."""
+        if not self._variables:
+            return
+
+        content = self.render()
+        with Path(os.environ[self.file_variable]).open("a", encoding="utf-8") as file:
+            file.write(content)
+        self._written.update(self._variables)
+        self._variables.clear()
+
+
+def write_github_variable(file_variable: str, name: str, value: str) -> None:
+    """Write a single variable to the ``GITHUB_OUTPUT`` or ``GITHUB_ENV`` file.
+
+    Parameters
+    ----------
+    file_variable: str
+        The environment variable holding the path of the file to write to.
+    name: str
+        The name of the variable.
+    value: str
+        The value of the variable.
+    """
+    with GitHubFileWriter(file_variable) as writer:
+        writer.set(name, value)
@@ -21,17 +21,90 @@
 # SOFTWARE.
 """Utilities for parsing pull request metadata and towncrier configuration."""
 
+import argparse
+from collections.abc import Iterator
+from functools import lru_cache
+import json
+from multiprocessing import Pool
 import os
 from pathlib import Path
 import re
+import tomllib
+from typing import Any, NamedTuple
+
+from github_outputs import GitHubFileWriter, write_github_variable
+
+# tomlkit is imported by the functions writing the towncrier configuration only, so that
+# classifying a pull request does not pay for its import. Reads go through tomllib.
+
+# <type>[(<scope>)][!]: <description>
+CONVENTIONAL_COMMIT_PATTERN = re.compile(
+    r"\s*(?P<type>[^\s():!]+)(?:\((?P<scope>[^()]*)\))?(?P<breaking>!)?:\s*(?P<description>.*)",
+    re.DOTALL,
+)
+
+# "BREAKING CHANGE:" footer following a line break (LF, CRLF or CR)
+BREAKING_CHANGE_PATTERN = re.compile(r"[\r\n][^\S\r\n]*breaking[- ]changes?:", re.IGNORECASE)
+# Same footer at the start of the body or right after a line-opening comment
+LEADING_BREAKING_CHANGE_PATTERN = re.compile(r"[^\S\r\n]*breaking[- ]changes?:", re.IGNORECASE)
+
+# Changelog section of each conventional commit type
+CC_TYPE_CHANGELOG_SECTIONS = {
+    "breaking": "breaking",
+    "feat": "added",
+    "fix": "fixed",
+    "docs": "documentation",
+    "build": "dependencies",
+    "revert": "miscellaneous",
+    "style": "miscellaneous",
+    "refactor": "miscellaneous",
+    "perf": "miscellaneous",
+    "test": "test",
+    "chore": "maintenance",
+    "ci": "maintenance",
+}
+
+
+class ConventionalCommit(NamedTuple):
+    """Parsed conventional commit message."""
+
+    type: str
+    scope: str | None
+    breaking: bool
+    description: str
+
+
+def parse_conventional_commit(message: str) -> ConventionalCommit:
+    """Parse a conventional commit message, such as a pull request title.
 
-import tomlkit
-from tomlkit.items import AoT, Array, Null, _ArrayItemGroup
+    Parameters
+    ----------
+    message: str
+        The message, following the ``<type>[(<scope>)][!]: <description>`` format.
+
+    Returns
+    -------
+    ConventionalCommit
+        The type, scope, breaking change flag and description of the message.
+
+    Raises
+    ------
+    ValueError
+        If the message does not follow the conventional commits format.
+    """
+    match = CONVENTIONAL_COMMIT_PATTERN.fullmatch(message)
+    if match is None:
+        raise ValueError(f"{message!r} does not follow the conventional commits format")
+    return ConventionalCommit(
+        match["type"], match["scope"], match["breaking"] is not None, match["description"].strip()
+    )
 
 
 def save_env_variable(env_var_name: str, env_var_value: str):
     """Save environment variable to the GITHUB_ENV file.
 
+    Use a ``GitHubFileWriter`` instead when saving several variables.
+
     Parameters
     ----------
     env_var_name: str
@@ -39,17 +112,33 @@ def save_env_variable(env_var_name: str, env_var_value: str):
     env_var_value: str
         The value of the environment variable.
     """
-    # Get the GITHUB_ENV variable
-    github_env = os.environ["GITHUB_ENV"]
-
-    # Save environment variable with its value
-    with Path(github_env).open("a") as file:
-        if "\n" in env_var_value or "\r" in env_var_value:
-            file.write(f"{env_var_name}<<EOF\n")
-            file.write(env_var_value)
-            file.write("\nEOF\n")
-        else:
-            file.write(f"{env_var_name}={env_var_value}")
+    write_github_variable("GITHUB_ENV", env_var_name, env_var_value)
+
+
+def first_letter_case(pr_title: str) -> str:
+    """Get the case of the first letter of the pull request title.
+
+    Parameters
+    ----------
+    pr_title: str
+        The pull request title.
+
+    Returns
+    -------
+    str
+        Either ``"lowercase"`` or ``"uppercase"``.
+
+    Raises
+    ------
+    ValueError
+        If the pull request title is blank.
+    """
+    # Skip the leading blank spaces of the pull request title
+    stripped_title = pr_title.lstrip(" ")
+    if not stripped_title:
+        raise ValueError("Pull request title is blank")
+
+    return "lowercase" if stripped_title[0].islower() else "uppercase"
 
 
 def get_first_letter_case(pr_title: str):
@@ -60,30 +149,14 @@ def get_first_letter_case(pr_title: str):
     pr_title: str
         The pull request title.
     """
-    index = 0
-
-    # Get the first letter of the pull request title
-    first_letter = pr_title[index]
-
-    # If the pull request title starts with a blank space, move to the next index
-    # until it finds a letter
-    while first_letter == " ":
-        index += 1
-        try:
-            # Set the first letter
-            first_letter = pr_title[index]
-        except IndexError:
-            # If the pull request title never finds a letter, the pull request title
-            # is blank
-            print("Pull request title is blank")
-            exit(1)
-
-    # If the first letter is lowercase, save the FIRST_LETTER environment variable
-    # as lowercase. Otherwise, save it as uppercase
-    if first_letter.islower():
-        save_env_variable("FIRST_LETTER", "lowercase")
-    else:
-        save_env_variable("FIRST_LETTER", "uppercase")
+    try:
+        letter_case = first_letter_case(pr_title)
+    except ValueError as error:
+        print(error)
+        exit(1)
+
+    # Save the FIRST_LETTER environment variable as lowercase or uppercase
+    save_env_variable("FIRST_LETTER", letter_case)
 
 
 def has_title_breaking_changes(pr_title: str) -> bool:
@@ -99,14 +172,7 @@ def has_title_breaking_changes(pr_title: str) -> bool:
     bool
         True if the pull request title indicates a breaking change, False otherwise.
     """
-    colon_count = pr_title.count(":")
-    if colon_count < 1:
-        raise ValueError(f"Expected at least one ':', found {colon_count}")
-
-    colon_index = pr_title.index(":")
-    exclam_index = pr_title.find("!")
-
-    return 0 <= exclam_index < colon_index
+    return parse_conventional_commit(pr_title).breaking
 
 
 def has_body_breaking_changes(pr_body: str) -> bool:
@@ -125,30 +191,42 @@ def has_body_breaking_changes(pr_body: str) -> bool:
     if not pr_body:
         return False
 
-    pattern = r"(?i)^breaking[- ]changes?:"
-    # Ignore lines that are within HTML comments in the pull request body
-    in_html_comment = False
-    for line in pr_body.splitlines():
-        stripped = line.strip()
-        if "<!--" in stripped:
-            in_html_comment = True
-        if "-->" in stripped:
-            in_html_comment = False
-            continue
-        if in_html_comment:
-            continue
-        if re.match(pattern, stripped):
+    # Scan the text between HTML comments without splitting the body into
+    # lines. Comments do not nest: the first "-->" closes the comment and an
+    # unterminated comment hides the rest of the body.
+    position = 0
+    at_line_start = True
+    while True:
+        comment_start = pr_body.find("<!--", position)
+        end = len(pr_body) if comment_start == -1 else comment_start
+        if at_line_start and LEADING_BREAKING_CHANGE_PATTERN.match(pr_body, position, end):
+            return True
+        if BREAKING_CHANGE_PATTERN.search(pr_body, position, end):
             return True
-    return False
+        if comment_start == -1:
+            return False
+        comment_end = pr_body.find("-->", comment_start + 4)
+        if comment_end == -1:
+            return False
+
+        # Text following a comment that opens its line starts that line too
+        line_break = max(
+            pr_body.rfind("\n", position, comment_start),
+            pr_body.rfind("\r", position, comment_start),
+        )
+        if line_break != -1:
+            at_line_start = not pr_body[line_break + 1 : comment_start].strip()
+        else:
+            at_line_start = at_line_start and not pr_body[position:comment_start].strip()
+        position = comment_end + 3
 
 
-def get_conventional_commit_type(pr_title: str, pr_body: str):
-    """Get the conventional commit type from the pull request.
+def conventional_commit_type(pr_title: str, pr_body: str) -> str:
+    """Get the quoted conventional commit type from the pull request.
 
     If the pull request title or body indicates a breaking change,
-    the conventional commit type is set to "breaking". Otherwise,
-    the conventional commit type is extracted from the pull request
-    title.
+    the conventional commit type is "breaking". Otherwise, the
+    conventional commit type is extracted from the pull request title.
 
     Parameters
     ----------
@@ -156,64 +234,82 @@ def get_conventional_commit_type(pr_title: str, pr_body: str):
         The pull request title.
     pr_body: str
         The pull request body.
+
+    Returns
+    -------
+    str
+        The conventional commit type, surrounded by double quotes.
     """
-    if has_title_breaking_changes(pr_title) or has_body_breaking_changes(pr_body):
-        # Save the conventional commit type as an environment variable, CC_TYPE
-        save_env_variable("CC_TYPE", '"breaking"')
-    else:
-        # Get the index where the first colon is found in the pull request title
-        colon_index = pr_title.index(":")
-        # Get the conventional commit type from the pull request title (everything before the colon)
-        cc_type = '"' + pr_title[:colon_index] + '"'
-        # Save the conventional commit type as an environment variable, CC_TYPE
-        save_env_variable("CC_TYPE", cc_type)
+    commit = parse_conventional_commit(pr_title)
+    if commit.breaking or has_body_breaking_changes(pr_body):
+        return '"breaking"'
+    return f'"{commit.type}"'
 
 
-def changelog_category_cc(cc_type: str):
-    """Get the changelog category based on the conventional commit type.
+def get_conventional_commit_type(pr_title: str, pr_body: str):
+    """Get the conventional commit type from the pull request.
+
+    Parameters
+    ----------
+    pr_title: str
+        The pull request title.
+    pr_body: str
+        The pull request body.
+    """
+    # Save the conventional commit type as an environment variable, CC_TYPE
+    save_env_variable("CC_TYPE", conventional_commit_type(pr_title, pr_body))
+
+
+def changelog_section_cc(cc_type: str) -> str:
+    """Get the changelog section based on the conventional commit type.
 
     Parameters
     ----------
     cc_type: str
         The conventional commit type from the pull request title.
+
+    Returns
+    -------
+    str
+        The changelog section.
+
+    Raises
+    ------
+    ValueError
+        If the conventional commit type is not supported.
     """
-    # Get conventional commit type from the environment variable
-    cc_type = cc_type.lower()
+    # Drop the quotes, and the scope and breaking change marker if any
+    cc_type = re.split(r"[(!]", cc_type.strip('"').strip(), maxsplit=1)[0].lower()
+    try:
+        return CC_TYPE_CHANGELOG_SECTIONS[cc_type]
+    except KeyError:
+        raise ValueError(f"Unsupported conventional commit type: {cc_type}") from None
 
-    # Dictionary whose keys are the conventional commit type and values are
-    # the changelog section
-    cc_type_changelog_dict = {
-        "breaking": "breaking",
-        "feat": "added",
-        "fix": "fixed",
-        "docs": "documentation",
-        "build": "dependencies",
-        "revert": "miscellaneous",
-        "style": "miscellaneous",
-        "refactor": "miscellaneous",
-        "perf": "miscellaneous",
-        "test": "test",
-        "chore": "maintenance",
-        "ci": "maintenance",
-    }
 
-    for key, value in cc_type_changelog_dict.items():
-        if key in cc_type:
-            # Get the changelog section based on the conventional commit type
-            changelog_section = value
-            break
+def changelog_category_cc(cc_type: str):
+    """Get the changelog category based on the conventional commit type.
 
+    Parameters
+    ----------
+    cc_type: str
+        The conventional commit type from the pull request title.
+    """
     # Save the changelog section to the CHANGELOG_SECTION environment variable
-    save_env_variable("CHANGELOG_SECTION", changelog_section)
+    save_env_variable("CHANGELOG_SECTION", changelog_section_cc(cc_type))
 
 
-def changelog_categorize_based_on_labels(labels: str):
-    """Get the changelog category based on the labels in the pull request.
+def changelog_section_labels(labels: str) -> str:
+    """Get the changelog section based on the labels in the pull request.
 
     Parameters
     ----------
     labels: str
         String containing the labels in the pull request.
+
+    Returns
+    -------
+    str
+        The changelog section.
     """
     # Make sure the labels string is not surrounded by quotes and remove extra whitespace
     # and finally split the labels into a list.
@@ -234,8 +330,19 @@ def changelog_categorize_based_on_labels(labels: str):
         "maintenance": "maintenance",
     }
 
+    return get_changelog_section(pr_labels, existing_labels)
+
+
+def changelog_categorize_based_on_labels(labels: str):
+    """Get the changelog category based on the labels in the pull request.
+
+    Parameters
+    ----------
+    labels: str
+        String containing the labels in the pull request.
+    """
     # Save the changelog section to the CHANGELOG_SECTION environment variable
-    save_env_variable("CHANGELOG_SECTION", get_changelog_section(pr_labels, existing_labels))
+    save_env_variable("CHANGELOG_SECTION", changelog_section_labels(labels))
 
 
 def get_changelog_section(pr_labels: dict, existing_labels: list) -> str:
@@ -268,6 +375,42 @@ def get_changelog_section(pr_labels: dict, existing_labels: list) -> str:
     return changelog_section
 
 
+def cleaned_pr_title(pr_title: str, use_pr_title: bool) -> str:
+    """Clean the pull request title for the changelog fragment.
+
+    Parameters
+    ----------
+    pr_title: str
+        The pull request title.
+    use_pr_title: bool
+        Whether or not to use pull request title to get the changelog section.
+
+    Returns
+    -------
+    str
+        The clean pull request title.
+
+    Raises
+    ------
+    ValueError
+        If the pull request title, or its description when using the pull request title, is
+        blank.
+    """
+    # If using pull request title, keep its description only
+    if use_pr_title:
+        clean_title = parse_conventional_commit(pr_title).description
+    else:
+        clean_title = pr_title.strip()
+    if not clean_title:
+        raise ValueError(f"{pr_title!r} has no description")
+
+    # Add backslash in front of backtick and double quote
+    clean_title = clean_title.replace("`", "\\`").replace('"', '\\"')
+
+    # Capitalize the first word of the title
+    return clean_title[0].upper() + clean_title[1:]
+
+
 def clean_pr_title(pr_title: str, use_pr_title: str):
     """Clean the pull request title.
 
@@ -278,25 +421,226 @@ def clean_pr_title(pr_title: str, use_pr_title: str):
     use_pr_title: str
         Whether or not to use pull request title to get the changelog section.
     """
-    # Retrieve title
-    clean_title = pr_title
+    # Save the clean pull request title as the CLEAN_TITLE environment variable
+    save_env_variable("CLEAN_TITLE", cleaned_pr_title(pr_title, use_pr_title))
+
+
+def parse_pull_request(
+    pr_title: str, pr_body: str, use_pr_title: bool, labels: str = ""
+) -> dict[str, str]:
+    """Classify a pull request for the changelog.
+
+    This runs the whole pipeline of the ``doc-changelog`` action in a single call.
+
+    Parameters
+    ----------
+    pr_title: str
+        The pull request title.
+    pr_body: str
+        The pull request body.
+    use_pr_title: bool
+        Whether to get the changelog section from the conventional commit type of the pull
+        request title, or from the pull request labels.
+    labels: str
+        String containing the labels in the pull request. Only used if ``use_pr_title`` is
+        ``False``.
 
-    # If using pull request title, remove it
+    Returns
+    -------
+    dict[str, str]
+        The ``FIRST_LETTER`` (only if ``use_pr_title`` is ``True``), ``CC_TYPE`` (idem),
+        ``CHANGELOG_SECTION`` and ``CLEAN_TITLE`` environment variables.
+
+    Raises
+    ------
+    ValueError
+        If the pull request title is blank, does not follow the conventional commits format
+        (only if ``use_pr_title`` is ``True``) or has no description.
+    """
+    variables = {}
     if use_pr_title:
-        colon_index = clean_title.index(":")
-        clean_title = clean_title[colon_index + 1 :]
+        variables["FIRST_LETTER"] = first_letter_case(pr_title)
+        variables["CC_TYPE"] = conventional_commit_type(pr_title, pr_body)
+        variables["CHANGELOG_SECTION"] = changelog_section_cc(variables["CC_TYPE"])
+    else:
+        variables["CHANGELOG_SECTION"] = changelog_section_labels(labels)
+    variables["CLEAN_TITLE"] = cleaned_pr_title(pr_title, use_pr_title)
+    return variables
 
-    # Remove extra whitespace
-    clean_title = clean_title.strip()
 
-    # Add backslash in front of backtick and double quote
-    clean_title = clean_title.replace("`", "\\`").replace('"', '\\"')
+def _pr_labels(labels: list[str | dict] | str | None) -> str:
+    """Convert the labels of a pull request dump into the label string of the action."""
+    if not labels:
+        return ""
+    if isinstance(labels, str):
+        return labels
+    return " ".join(label["name"] if isinstance(label, dict) else label for label in labels)
 
-    # Capitalize the first word of the title
-    clean_title = clean_title[0].upper() + clean_title[1:]
 
-    # Save the clean pull request title as the CLEAN_TITLE environment variable
-    save_env_variable("CLEAN_TITLE", clean_title)
+def _backfill_fragment(job: tuple[str, str, bool]) -> tuple[int | None, str | None, str]:
+    """Classify a pull request from a JSON line and write its changelog fragment.
+
+    Returns the pull request number, the name of the fragment file (``None`` if the pull
+    request could not be classified) and a status message.
+    """
+    line, directory, use_pr_title = job
+    try:
+        pr = json.loads(line)
+        number = int(pr["number"])
+    except (ValueError, KeyError, TypeError) as error:
+        return None, None, f"invalid record: {error}"
+
+    try:
+        variables = parse_pull_request(
+            pr.get("title") or "", pr.get("body") or "", use_pr_title, _pr_labels(pr.get("labels"))
+        )
+    except ValueError as error:
+        return number, None, f"skipped: {error}"
+
+    fragment = f"{number}.{variables['CHANGELOG_SECTION']}.md"
+    content = f"{variables['CLEAN_TITLE']}\n".encode()
+    fragment_path = Path(directory, fragment)
+    if fragment_path.is_file() and fragment_path.read_bytes() == content:
+        return number, fragment, "unchanged"
+    fragment_path.write_bytes(content)
+    return number, fragment, "written"
+
+
+def backfill_changelog_fragments(
+    dump: str | Path,
+    directory: str | Path,
+    use_pr_title: bool = True,
+    processes: int | None = None,
+    chunksize: int = 256,
+) -> dict[str, int]:
+    """Write the changelog fragments of many pull requests from a JSON Lines dump.
+
+    Each line of the dump is a pull request with its ``number``, ``title``, ``body`` and
+    ``labels`` (a list of names or of objects with a ``name``), as produced by
+    ``gh pr list --state merged --json number,title,body,labels --jq '.[]'``. The dump is
+    streamed to a pool of processes, which classify the pull requests like the
+    ``doc-changelog`` action does and write the ``<number>.<section>.md`` fragments. Fragments
+    of the same pull request in another section are removed.
+
+    Parameters
+    ----------
+    dump: str | Path
+        The JSON Lines file.
+    directory: str | Path
+        The towncrier fragments directory.
+    use_pr_title: bool
+        Whether to classify the pull requests from their conventional commit title, or from
+        their labels.
+    processes: int | None
+        Number of worker processes. Defaults to the number of CPUs.
+    chunksize: int
+        Number of pull requests sent to a worker at once.
+
+    Returns
+    -------
+    dict[str, int]
+        Number of fragments ``written`` and ``unchanged``, of pull requests ``skipped``
+        because they could not be classified and of ``removed`` stale fragments.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    existing: dict[int, list[str]] = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            number, _, _ = entry.name.partition(".")
+            if number.isdigit() and entry.name.endswith(".md"):
+                existing.setdefault(int(number), []).append(entry.name)
+
+    def jobs() -> Iterator[tuple[str, str, bool]]:
+        with Path(dump).open(encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield line, str(directory), use_pr_title
+
+    counts = {"written": 0, "unchanged": 0, "skipped": 0, "removed": 0}
+    with Pool(processes) as pool:
+        for number, fragment, status in pool.imap_unordered(
+            _backfill_fragment, jobs(), chunksize=chunksize
+        ):
+            if fragment is None:
+                counts["skipped"] += 1
+                print(f"PR #{number}: {status}" if number is not None else status)
+                continue
+            counts[status] += 1
+            for stale_fragment in existing.get(number, []):
+                if stale_fragment != fragment:
+                    (directory / stale_fragment).unlink(missing_ok=True)
+                    counts["removed"] += 1
+
+    print(
+        f"{counts['written']} fragments written, {counts['unchanged']} unchanged, "
+        f"{counts['removed']} stale fragments removed, {counts['skipped']} pull requests skipped."
+    )
+    return counts
+
+
+def classify_pull_request_from_env() -> None:
+    """Classify the pull request and save all the variables to GITHUB_ENV in a single write.
+
+    The pull request is read from the ``PR_TITLE``, ``PR_BODY``, ``USE_PULL_REQUEST_TITLE`` and
+    ``LABELS`` environment variables.
+    """
+    try:
+        variables = parse_pull_request(
+            pr_title=os.environ.get("PR_TITLE", ""),
+            pr_body=os.environ.get("PR_BODY", ""),
+            use_pr_title=os.environ.get("USE_PULL_REQUEST_TITLE") == "true",
+            labels=os.environ.get("LABELS", ""),
+        )
+    except ValueError as error:
+        print(f"Could not parse the pull request title: {error}")
+        exit(1)
+
+    with GitHubFileWriter("GITHUB_ENV") as env:
+        for name, value in variables.items():
+            print(f"{name}={value}")
+            env.set(name, value)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Classify pull requests for the changelog.
+
+    Without arguments, the pull request of the ``doc-changelog`` action is classified (see
+    ``classify_pull_request_from_env``). The ``backfill`` command writes the changelog fragments
+    of a dump of pull requests (see ``backfill_changelog_fragments``).
+
+    Parameters
+    ----------
+    argv: list[str] | None
+        Command line arguments. By default, ``sys.argv`` is used.
+    """
+    parser = argparse.ArgumentParser(description="Classify pull requests for the changelog.")
+    commands = parser.add_subparsers(dest="command")
+    backfill = commands.add_parser(
+        "backfill", help="Write the changelog fragments of a JSON Lines dump of pull requests."
+    )
+    backfill.add_argument("dump", type=Path, help="JSON Lines file with one pull request per line.")
+    backfill.add_argument(
+        "--directory",
+        type=Path,
+        help="Fragments directory. Defaults to the towncrier directory of pyproject.toml.",
+    )
+    backfill.add_argument(
+        "--use-labels",
+        action="store_true",
+        help="Classify pull requests from their labels instead of their title.",
+    )
+    backfill.add_argument("--processes", type=int, help="Number of worker processes.")
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        classify_pull_request_from_env()
+        return
+
+    directory = args.directory or get_towncrier_config_value("directory") or "doc/changelog.d"
+    backfill_changelog_fragments(
+        args.dump, directory, use_pr_title=not args.use_labels, processes=args.processes
+    )
 
 
 def add_towncrier_config(org_name: str, repo_name: str, default_config: bool):
@@ -311,14 +655,13 @@ def add_towncrier_config(org_name: str, repo_name: str, default_config: bool):
     default_config: bool
         Whether or not to use the default towncrier configuration for the pyproject.toml file.
     """
-    pyproject_file = Path("pyproject.toml")
-    towncrier_file = Path("towncrier.toml")
+    import tomlkit
 
-    if not pyproject_file.exists() and not towncrier_file.exists():
+    towncrier_config = find_towncrier_config_file()
+    if towncrier_config is None:
         print("No pyproject.toml or towncrier.toml file found.")
         exit(1)
 
-    towncrier_config = pyproject_file if pyproject_file.exists() else towncrier_file
     with towncrier_config.open("rb") as file:
         config = tomlkit.load(file)
 
@@ -399,6 +742,8 @@ def add_towncrier_config(org_name: str, repo_name: str, default_config: bool):
     # Normalize runs of 3+ consecutive newlines to exactly 2 (one blank line)
     output = re.sub(r"\n{3,}", "\n\n", output)
     write_file_content(towncrier_config, output)
+    # Do not rely on the modification time alone to notice the rewrite
+    _parse_toml_file.cache_clear()
 
 
 def write_towncrier_config_section(
@@ -460,6 +805,9 @@ def write_missing_types(config: dict, changelog_sections: list):
     changelog_sections: list
         List containing changelog sections under each release.
     """
+    import tomlkit
+    from tomlkit.items import AoT, Array
+
     # Ensure the [tool.towncrier] section exists in the config dict
     config.setdefault("tool", {}).setdefault("towncrier", {})
     towncrier_section = config["tool"]["towncrier"]
@@ -504,6 +852,9 @@ def sort_towncrier_types(config: dict, changelog_sections: list):
     changelog_sections: list
         The full ordered list of canonical changelog section names.
     """
+    import tomlkit
+    from tomlkit.items import AoT, Array, Null, _ArrayItemGroup
+
     towncrier_section = config.get("tool", {}).get("towncrier", {})
     types = towncrier_section.get("type")
 
@@ -571,6 +922,77 @@ def sort_towncrier_types(config: dict, changelog_sections: list):
     towncrier_section["type"] = new_types
 
 
+def find_towncrier_config_file() -> Path | None:
+    """Find the file holding the towncrier configuration.
+
+    Returns
+    -------
+    Path | None
+        The pyproject.toml file if it exists, otherwise the towncrier.toml file if it exists,
+        otherwise None.
+    """
+    for name in ("pyproject.toml", "towncrier.toml"):
+        config_file = Path(name)
+        if config_file.exists():
+            return config_file
+    return None
+
+
+@lru_cache(maxsize=8)
+def _parse_toml_file(path: Path, mtime_ns: int, size: int) -> dict:
+    """Parse a TOML file, cached on its path, modification time and size."""
+    with path.open("rb") as file:
+        return tomllib.load(file)
+
+
+def load_toml_config(config_path: str | Path = "pyproject.toml") -> dict:
+    """Load a TOML configuration file for reading.
+
+    The file is parsed with ``tomllib`` once per path, modification time and size, so repeated
+    lookups do not re-read it. The returned dictionary is shared between callers and must not be
+    modified. Use ``tomlkit`` to edit the file instead.
+
+    Parameters
+    ----------
+    config_path: str | Path
+        The path to the TOML file. By default, this is "pyproject.toml".
+
+    Returns
+    -------
+    dict
+        The parsed configuration. If the file does not exist, the dictionary is empty.
+    """
+    path = Path(config_path).resolve()
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return {}
+    return _parse_toml_file(path, stat.st_mtime_ns, stat.st_size)
+
+
+def get_towncrier_config(
+    *keys: str, pyproject_path: str | Path = "pyproject.toml"
+) -> tuple[Any, ...]:
+    """Get the values of several keys within the [tool.towncrier] section of pyproject.toml.
+
+    Parameters
+    ----------
+    *keys: str
+        The key names within the [tool.towncrier] section you want to obtain information about.
+        For example, "filename" or "directory".
+    pyproject_path: str | Path
+        The path to the pyproject.toml file. By default, this is "pyproject.toml".
+
+    Returns
+    -------
+    tuple[Any, ...]
+        The value of each key, in order. If a key does not exist under [tool.towncrier], its value
+        is an empty string.
+    """
+    towncrier = load_toml_config(pyproject_path).get("tool", {}).get("towncrier", {})
+    return tuple(towncrier.get(key, "") for key in keys)
+
+
 def get_towncrier_config_value(category: str, pyproject_path: str | Path = "pyproject.toml"):
     """Get the value of a category within the [tool.towncrier] section of the pyproject.toml file.
 
@@ -588,25 +1010,7 @@ def get_towncrier_config_value(category: str, pyproject_path: str | Path = "pypr
         The category value. If the category does not exist under [tool.towncrier], the string
         is empty.
     """
-    # Get path to pyproject.toml
-    pyproject_toml = Path(pyproject_path)
-    # Set the category value to an empty string
-    category_value = ""
-
-    if pyproject_toml.is_file():
-        # Load pyproject.toml
-        with pyproject_toml.open("rb") as pyproj:
-            config = tomlkit.load(pyproj)
-            # Get the tool category in pyproject.toml
-            tool = config.get("tool", "")
-            if tool:
-                # Get the [tool.towncrier] section in pyproject.toml
-                towncrier = tool.get("towncrier", "")
-                if towncrier:
-                    # Get the category value under [tool.towncrier]
-                    # For example, "filename" or "directory"
-                    category_value = towncrier.get(category, "")
-
+    (category_value,) = get_towncrier_config(category, pyproject_path=pyproject_path)
     return category_value
 
 
@@ -684,3 +1088,7 @@ def write_file_content(file_path: Path, content: str):
         file_path.write_text(content)
     except Exception as e:
         print(f"An error occurred while writing to the file: {e}")
+
+
+if __name__ == "__main__":
+    main()
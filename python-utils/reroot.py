@@ -0,0 +1,122 @@
+# Copyright (C) 2022 - 2026 Synopsys, Inc. and ANSYS, Inc. All rights reserved.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Re-root HTML pages so that they can be served from another directory.
+
+A page built for ``version/<version>/`` is made servable from the root of the website by
+prefixing its relative links. All the rewrite rules are applied in a single pass, and pages
+which are already re-rooted are left unchanged.
+"""
+
+from collections.abc import Sequence
+from pathlib import Path
+import re
+
+REROOT_PATTERN = re.compile(
+    rb'(?P<attribute>href|src)="(?P<url>[^:"\n]*)"'
+    rb'|(?P<action>action=")search\.html"'
+    rb'|(?P<search_file>const SEARCH_FILE = ")[^\n]*_static/search\.json";'
+    rb'|(?P<advance_search>const ADVANCE_SEARCH_PATH = ")search\.html";'
+    rb'|(?P<content_root><html lang="en" data-content_root=")\./" >'
+)
+
+
+def reroot_html(content: bytes, prefix: str) -> bytes:
+    """Prefix the relative links of an HTML page.
+
+    The following are rewritten:
+
+    - ``href`` and ``src`` attributes without a scheme.
+    - The ``search.html`` form action.
+    - The ``SEARCH_FILE`` and ``ADVANCE_SEARCH_PATH`` constants of the search scripts.
+    - The ``data-content_root`` attribute of the ``html`` element.
+
+    Links already starting with the prefix are kept, so that re-rooting a page twice gives
+    the same result.
+
+    Parameters
+    ----------
+    content: bytes
+        The HTML page.
+    prefix: str
+        Path of the directory the page was built for, relative to the new location of the page,
+        e.g. ``version/stable``.
+
+    Returns
+    -------
+    bytes
+        The re-rooted HTML page.
+    """
+    root = prefix.strip("/").encode() + b"/"
+
+    def rewrite(match: re.Match[bytes]) -> bytes:
+        if match["attribute"]:
+            url = match["url"]
+            if url.startswith(root):
+                return match[0]
+            return match["attribute"] + b'="' + root + url + b'"'
+        if match["search_file"]:
+            return match["search_file"] + root + b'_static/search.json";'
+        if match["action"]:
+            return match["action"] + root + b'search.html"'
+        if match["advance_search"]:
+            return match["advance_search"] + root + b'search.html";'
+        return match["content_root"] + b"./" + root + b'" >'
+
+    return REROOT_PATTERN.sub(rewrite, content)
+
+
+def write_landing_page(
+    versions: Sequence[str],
+    version_dir: str | Path = "version",
+    output: str | Path = "index.html",
+) -> str:
+    """Write the landing page from the index page of the first available version.
+
+    Parameters
+    ----------
+    versions: Sequence[str]
+        Versions whose index page can be used, by order of preference.
+    version_dir: str | Path
+        Directory containing one folder per documentation version.
+    output: str | Path
+        The landing page to write.
+
+    Returns
+    -------
+    str
+        The version used for the landing page.
+
+    Raises
+    ------
+    FileNotFoundError
+        If none of the versions has an index page.
+    """
+    version_dir = Path(version_dir)
+    for version in versions:
+        index_page = version_dir / version / "index.html"
+        if index_page.is_file():
+            prefix = f"{version_dir.as_posix()}/{version}"
+            Path(output).write_bytes(reroot_html(index_page.read_bytes(), prefix))
+            return version
+    raise FileNotFoundError(
+        f"No 'index.html' file found in {', '.join(f'{version_dir}/{v}' for v in versions)}."
+    )
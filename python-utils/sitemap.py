@@ -0,0 +1,242 @@
+# Copyright (C) 2022 - 2026 Synopsys, Inc. and ANSYS, Inc. All rights reserved.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Generate the XML sitemap of a documentation website.
+
+The HTML tree is walked once and the XML is streamed to disk. Sitemaps are split into
+shards of at most ``MAX_URLS_PER_SITEMAP`` URLs, referenced by a sitemap index, as required
+by the sitemap protocol.
+"""
+
+from collections.abc import Iterator
+from datetime import UTC, datetime
+import os
+from pathlib import Path
+import subprocess
+from typing import TextIO, cast
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+MAX_URLS_PER_SITEMAP = 50000
+EXCLUDED_PAGES = ("search.html", "genindex.html")
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def iter_html_files(html_dir: Path) -> Iterator[tuple[str, float]]:
+    """Walk a directory and yield its HTML pages.
+
+    Parameters
+    ----------
+    html_dir: Path
+        Directory containing the HTML files of the website.
+
+    Yields
+    ------
+    tuple[str, float]
+        The path of each HTML page, relative to the current directory and using ``/`` as
+        separator, and its modification time.
+    """
+    pending = [html_dir.as_posix()]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as scanner:
+            entries = sorted(scanner, key=lambda entry: entry.name)
+        subdirectories = []
+        for entry in entries:
+            path = f"{directory}/{entry.name}"
+            if entry.is_dir():
+                subdirectories.append(path)
+            elif entry.name.endswith(".html") and entry.name not in EXCLUDED_PAGES:
+                yield path, entry.stat().st_mtime
+        # Visit the subdirectories in alphabetical order
+        pending.extend(reversed(subdirectories))
+
+
+def get_git_commit_times(html_dir: Path) -> dict[str, float]:
+    """Get the last commit time of every HTML page tracked in a directory.
+
+    The history is streamed from a single ``git log`` call, which is stopped as soon as every
+    tracked page has a commit time. A shallow checkout only contains the latest commit, so no
+    time is returned for it.
+
+    Parameters
+    ----------
+    html_dir: Path
+        Directory containing the HTML files of the website.
+
+    Returns
+    -------
+    dict[str, float]
+        Last commit timestamp of each page, keyed by its path relative to the current
+        directory. Empty if the directory is not in a git repository or if the repository is
+        shallow.
+    """
+    git = ["git", "-c", "core.quotePath=false"]
+    try:
+        shallow = subprocess.run(
+            [*git, "rev-parse", "--is-shallow-repository"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        tracked = subprocess.run(
+            [*git, "ls-files", "--", str(html_dir)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.splitlines()
+    except (OSError, subprocess.CalledProcessError) as error:
+        print(f"Could not read the git history, using file modification times: {error}")
+        return {}
+    if shallow == "true":
+        print("The git history is shallow, using file modification times.")
+        return {}
+
+    pending = {
+        path
+        for path in tracked
+        if path.endswith(".html") and path.rpartition("/")[2] not in EXCLUDED_PAGES
+    }
+    commit_times: dict[str, float] = {}
+    if not pending:
+        return commit_times
+
+    with subprocess.Popen(
+        [*git, "log", "--format=%x00%ct", "--name-only", "--relative", "--", str(html_dir)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    ) as process:
+        timestamp = 0.0
+        for line in cast(TextIO, process.stdout):
+            path = line.rstrip("\n")
+            if path.startswith("\0"):
+                timestamp = float(path[1:])
+            elif path in pending:
+                # The log is sorted from the newest commit, keep the first time found for a path
+                pending.remove(path)
+                commit_times[path] = timestamp
+                if not pending:
+                    process.terminate()
+                    break
+    return commit_times
+
+
+def format_lastmod(timestamp: float) -> str:
+    """Format a timestamp as a W3C datetime."""
+    return datetime.fromtimestamp(timestamp, UTC).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+
+def write_url(file: TextIO, loc: str, lastmod: str, changefreq: str, priority: str) -> None:
+    """Write a sitemap URL entry."""
+    file.write(
+        f"  <url>\n    <loc>{escape(loc)}</loc>\n    <lastmod>{lastmod}</lastmod>\n"
+        f"    <changefreq>{changefreq}</changefreq>\n    <priority>{priority}</priority>\n"
+        "  </url>\n"
+    )
+
+
+def generate_sitemap(
+    cname: str,
+    html_dir: str | Path,
+    output: str | Path = "sitemap.xml",
+    lastmod_source: str = "git",
+    max_urls: int = MAX_URLS_PER_SITEMAP,
+) -> list[Path]:
+    """Generate the sitemap of a documentation website.
+
+    If the website has more than ``max_urls`` URLs, the sitemap is split into
+    ``<output stem>-<N>.xml`` shards and ``output`` becomes a sitemap index.
+
+    Parameters
+    ----------
+    cname: str
+        The canonical name (CNAME) containing the documentation.
+    html_dir: str | Path
+        Directory containing the HTML files of the website.
+    output: str | Path
+        The sitemap file to generate.
+    lastmod_source: str
+        Either ``"git"`` to use the last commit time of each page, falling back to its
+        modification time for uncommitted pages and in shallow checkouts, or ``"mtime"`` to
+        always use the modification time.
+    max_urls: int
+        Maximum number of URLs in a sitemap file.
+
+    Returns
+    -------
+    list[Path]
+        The sitemap files that were written, starting with ``output``.
+    """
+    if lastmod_source not in ("git", "mtime"):
+        raise ValueError(f"Unknown lastmod source: {lastmod_source!r}. Use 'git' or 'mtime'.")
+
+    html_dir, output = Path(html_dir), Path(output)
+    website = f"https://{cname}"
+    commit_times = get_git_commit_times(html_dir) if lastmod_source == "git" else {}
+    for stale_shard in output.parent.glob(f"{output.stem}-*.xml"):
+        stale_shard.unlink()
+
+    shards: list[Path] = []
+    file: TextIO | None = None
+    now = datetime.now(UTC).timestamp()
+
+    def open_shard() -> TextIO:
+        shards.append(output.with_name(f"{output.stem}-{len(shards) + 1}.xml"))
+        shard = shards[-1].open("w", encoding="utf-8")
+        shard.write(
+            f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NAMESPACE}">\n'
+        )
+        return shard
+
+    try:
+        file = open_shard()
+        write_url(file, website, format_lastmod(now), "daily", "1.0")
+        urls_in_shard = 1
+        for path, mtime in iter_html_files(html_dir):
+            if urls_in_shard == max_urls:
+                file.write("</urlset>\n")
+                file.close()
+                file = open_shard()
+                urls_in_shard = 0
+            timestamp = commit_times.get(path, mtime)
+            write_url(file, f"{website}/{quote(path)}", format_lastmod(timestamp), "weekly", "0.5")
+            urls_in_shard += 1
+        file.write("</urlset>\n")
+    finally:
+        if file is not None:
+            file.close()
+
+    if len(shards) == 1:
+        shards[0].replace(output)
+        return [output]
+
+    with output.open("w", encoding="utf-8") as index:
+        index.write(
+            f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NAMESPACE}">\n'
+        )
+        for shard in shards:
+            index.write(
+                f"  <sitemap>\n    <loc>{escape(f'{website}/{quote(shard.name)}')}</loc>\n"
+                f"    <lastmod>{format_lastmod(now)}</lastmod>\n  </sitemap>\n"
+            )
+        index.write("</sitemapindex>\n")
+    return [output, *shards]
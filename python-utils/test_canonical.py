@@ -0,0 +1,75 @@
+# Copyright (C) 2022 - 2026 Synopsys, Inc. and ANSYS, Inc. All rights reserved.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Tests for the canonical module."""
+
+from pathlib import Path
+
+from canonical import add_canonical_tags, replace_canonical_tags
+import pytest
+
+PAGE = b'<html>\n<head>\n  <link rel="canonical" href="old" />\n  </head>\n<body></body>\n</html>\n'
+
+
+@pytest.mark.parametrize(
+    "content,tag,expected",
+    [
+        (PAGE, None, b"<html>\n<head>\n  </head>\n<body></body>\n</html>\n"),
+        (PAGE, b"<new>\n", b"<html>\n<head>\n<new>\n  </head>\n<body></body>\n</html>\n"),
+        (b'<head></head><link rel="canonical">', b"<new>\n", b""),
+        (b"<p>x</head>\n</head>", b"<new>\n", b"<p>x</head>\n<new>\n</head>"),
+    ],
+)
+def test_replace_canonical_tags(content, tag, expected):
+    """Test canonical lines are removed and the tag is inserted before the end of the head."""
+    assert replace_canonical_tags(content, tag) == expected
+
+
+def test_add_canonical_tags(tmp_path):
+    """Test canonical tags are added once to every page of every version."""
+    version_dir = tmp_path / "version"
+    for page in ("stable/index.html", "0.1/api/page.html", "0.1/announcement.html", "index.html"):
+        (version_dir / page).parent.mkdir(parents=True, exist_ok=True)
+        (version_dir / page).write_bytes(PAGE)
+
+    assert add_canonical_tags("docs.pyansys.com", version_dir, max_workers=1)[:2] == (4, 4)
+
+    def canonical_lines(page: str) -> list[str]:
+        content = Path(version_dir, page).read_text()
+        return [line for line in content.splitlines() if "canonical" in line]
+
+    assert canonical_lines("stable/index.html") == [
+        '  <link rel="canonical" href="https://docs.pyansys.com/">'
+    ]
+    assert canonical_lines("0.1/api/page.html") == [
+        '  <link rel="canonical" href="https://docs.pyansys.com/version/stable/api/page.html" />'
+    ]
+    assert canonical_lines("0.1/announcement.html") == []
+    assert canonical_lines("index.html") == []
+
+    assert add_canonical_tags("docs.pyansys.com", version_dir, max_workers=1) == (4, 0, 0)
+
+
+def test_add_canonical_tags_without_index(tmp_path):
+    """Test an error is raised when no version has an index page."""
+    (tmp_path / "version" / "0.1").mkdir(parents=True)
+    with pytest.raises(FileNotFoundError):
+        add_canonical_tags("docs.pyansys.com", tmp_path / "version")
@@ -0,0 +1,76 @@
+# Copyright (C) 2022 - 2026 Synopsys, Inc. and ANSYS, Inc. All rights reserved.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Tests for the github_outputs module."""
+
+import re
+
+from github_outputs import GitHubFileWriter, write_github_variable
+import pytest
+
+
+@pytest.fixture
+def github_output(tmp_path, monkeypatch):
+    """Provide an empty GITHUB_OUTPUT file."""
+    output_path = tmp_path / "gh-output.txt"
+    output_path.touch()
+    monkeypatch.setenv("GITHUB_OUTPUT", str(output_path))
+    return output_path
+
+
+def test_writer_flushes_once_on_exit(github_output):
+    """Test variables are only written when the context exits."""
+    with GitHubFileWriter("GITHUB_OUTPUT") as output:
+        output.set("VERSION", "1.2")
+        output.set("PRE_RELEASE", "false")
+        assert github_output.read_text() == ""
+
+    assert github_output.read_text() == "VERSION=1.2\nPRE_RELEASE=false\n"
+
+
+def test_writer_discards_on_error(github_output):
+    """Test nothing is written when the context exits with an exception."""
+    with pytest.raises(RuntimeError), GitHubFileWriter("GITHUB_OUTPUT") as output:
+        output.set("VERSION", "1.2")
+        raise RuntimeError
+
+    assert github_output.read_text() == ""
+
+
+def test_writer_rejects_duplicate_keys(github_output):
+    """Test emitting the same key twice raises an error."""
+    output = GitHubFileWriter("GITHUB_OUTPUT")
+    output.set("VERSION", "1.2")
+    output.flush()
+    with pytest.raises(ValueError, match="VERSION is written more than once"):
+        output.set("VERSION", "1.3")
+
+
+def test_multiline_value_uses_unique_delimiter(github_output):
+    """Test multiline values cannot be terminated early by their content."""
+    value = "first line\nEOF\nlast line"
+    write_github_variable("GITHUB_OUTPUT", "BODY", value)
+
+    content = github_output.read_text()
+    match = re.fullmatch(r"BODY<<(\S+)\n(.*)\n\1\n", content, re.DOTALL)
+    assert match is not None
+    assert match.group(1) != "EOF"
+    assert match.group(2) == value
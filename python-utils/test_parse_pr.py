@@ -0,0 +1,278 @@
+# Copyright (C) 2022 - 2026 Synopsys, Inc. and ANSYS, Inc. All rights reserved.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Tests for the parse_pr module."""
+
+import json
+import os
+
+from github_outputs import GitHubFileWriter
+import parse_pr
+from parse_pr import (
+    ConventionalCommit,
+    backfill_changelog_fragments,
+    changelog_section_cc,
+    classify_pull_request_from_env,
+    get_towncrier_config,
+    get_towncrier_config_value,
+    has_body_breaking_changes,
+    main,
+    parse_conventional_commit,
+    parse_pull_request,
+)
+import pytest
+
+CONVENTIONAL_COMMITS = [
+    ("feat: add a feature", ConventionalCommit("feat", None, False, "add a feature")),
+    ("fix(docs): fix a typo", ConventionalCommit("fix", "docs", False, "fix a typo")),
+    ("feat!: drop Python 3.9", ConventionalCommit("feat", None, True, "drop Python 3.9")),
+    ("refactor(api)!: rename", ConventionalCommit("refactor", "api", True, "rename")),
+    ("  chore:   bump versions  ", ConventionalCommit("chore", None, False, "bump versions")),
+    ("Docs: use a: colon", ConventionalCommit("Docs", None, False, "use a: colon")),
+    ("ci(): empty scope", ConventionalCommit("ci", "", False, "empty scope")),
+    ("fix: wow!", ConventionalCommit("fix", None, False, "wow!")),
+]
+
+
+@pytest.mark.parametrize("message,expected", CONVENTIONAL_COMMITS)
+def test_parse_conventional_commit(message, expected):
+    """Test conventional commit messages are parsed into their parts."""
+    assert parse_conventional_commit(message) == expected
+
+
+@pytest.mark.parametrize(
+    "message", ["add a feature", "feat add: a feature", "feat : a feature", "(scope): x", ""]
+)
+def test_parse_conventional_commit_invalid(message):
+    """Test messages not following the conventional commits format are rejected."""
+    with pytest.raises(ValueError, match="does not follow the conventional commits format"):
+        parse_conventional_commit(message)
+
+
+@pytest.mark.parametrize(
+    "cc_type,expected",
+    [
+        ('"feat"', "added"),
+        ('"FIX"', "fixed"),
+        ('"docs(fix)"', "documentation"),
+        ('"ci!"', "maintenance"),
+        ('"breaking"', "breaking"),
+        ('"perf"', "miscellaneous"),
+    ],
+)
+def test_changelog_section_cc(cc_type, expected):
+    """Test conventional commit types map to their changelog section."""
+    assert changelog_section_cc(cc_type) == expected
+
+
+@pytest.mark.parametrize("cc_type", ['"feature"', '"prefix"', '"fixup"'])
+def test_changelog_section_cc_unknown(cc_type):
+    """Test unknown types are rejected instead of matching a substring."""
+    with pytest.raises(ValueError, match="Unsupported conventional commit type"):
+        changelog_section_cc(cc_type)
+
+
+@pytest.mark.parametrize(
+    "pr_title,pr_body,use_pr_title,labels,expected",
+    [
+        (
+            "feat(ui): add `dark` mode",
+            "",
+            True,
+            "",
+            {
+                "FIRST_LETTER": "lowercase",
+                "CC_TYPE": '"feat"',
+                "CHANGELOG_SECTION": "added",
+                "CLEAN_TITLE": "Add \\`dark\\` mode",
+            },
+        ),
+        (
+            "Fix: crash",
+            "BREAKING CHANGE: the API changed",
+            True,
+            "",
+            {
+                "FIRST_LETTER": "uppercase",
+                "CC_TYPE": '"breaking"',
+                "CHANGELOG_SECTION": "breaking",
+                "CLEAN_TITLE": "Crash",
+            },
+        ),
+        (
+            'update the "docs"',
+            "",
+            False,
+            '"documentation maintenance"',
+            {"CHANGELOG_SECTION": "documentation", "CLEAN_TITLE": 'Update the \\"docs\\"'},
+        ),
+    ],
+)
+def test_parse_pull_request(pr_title, pr_body, use_pr_title, labels, expected):
+    """Test the whole pull request classification pipeline."""
+    assert parse_pull_request(pr_title, pr_body, use_pr_title, labels) == expected
+
+
+@pytest.mark.parametrize(
+    "pr_title,use_pr_title", [("fix:", True), ("fix: ", True), ("feat(ui)!:  ", True), (" ", False)]
+)
+def test_parse_pull_request_no_description(pr_title, use_pr_title):
+    """Test pull requests without a description are rejected with a ValueError."""
+    with pytest.raises(ValueError, match="has no description"):
+        parse_pull_request(pr_title, "", use_pr_title, '"bug"')
+
+
+@pytest.fixture
+def github_env(tmp_path, monkeypatch):
+    """Set up the pull request environment variables and count the GITHUB_ENV writes."""
+    env_path = tmp_path / "github_env"
+    env_path.write_text("")
+    monkeypatch.setenv("GITHUB_ENV", str(env_path))
+    monkeypatch.setenv("PR_BODY", "")
+    monkeypatch.setenv("USE_PULL_REQUEST_TITLE", "true")
+    monkeypatch.setenv("LABELS", "")
+    flushes = []
+    flush = GitHubFileWriter.flush
+
+    def record_flush(writer):
+        flushes.append(dict(writer._variables))
+        flush(writer)
+
+    monkeypatch.setattr(GitHubFileWriter, "flush", record_flush)
+    return env_path, flushes
+
+
+@pytest.mark.parametrize("classify", [classify_pull_request_from_env, lambda: main([])])
+def test_classify_pull_request_from_env(github_env, monkeypatch, classify):
+    """Test every variable of the pull request is saved to GITHUB_ENV in a single write."""
+    env_path, flushes = github_env
+    monkeypatch.setenv("PR_TITLE", "fix(api): handle `None`")
+
+    classify()
+
+    assert env_path.read_text() == (
+        "FIRST_LETTER=lowercase\n"
+        'CC_TYPE="fix"\n'
+        "CHANGELOG_SECTION=fixed\n"
+        "CLEAN_TITLE=Handle \\`None\\`\n"
+    )
+    assert len(flushes) == 1
+
+
+@pytest.mark.parametrize("classify", [classify_pull_request_from_env, lambda: main([])])
+@pytest.mark.parametrize("pr_title", ["fix:", "fix: "])
+def test_classify_pull_request_from_env_no_description(
+    github_env, monkeypatch, capsys, classify, pr_title
+):
+    """Test a title without description exits with an error and writes nothing."""
+    env_path, flushes = github_env
+    monkeypatch.setenv("PR_TITLE", pr_title)
+
+    with pytest.raises(SystemExit) as error:
+        classify()
+
+    assert error.value.code == 1
+    assert "has no description" in capsys.readouterr().out
+    assert env_path.read_text() == ""
+    assert flushes == []
+
+
+BREAKING_CHANGE_BODIES = [
+    ("", False),
+    ("BREAKING CHANGE: drop Python 3.9", True),
+    ("Some context.\n  breaking-changes: renamed inputs", True),
+    ("Some context.\r\nBreaking change: renamed inputs\r\n", True),
+    ("Some context.\rBREAKING CHANGE: old Mac line endings", True),
+    ("No BREAKING CHANGE: in the middle of a line", False),
+    ("BREAKING CHANGE without a colon", False),
+    ("<!-- BREAKING CHANGE: template hint -->", False),
+    ("<!--\nBREAKING CHANGE: template hint\n-->\nDone.", False),
+    ("<!-- hint -->BREAKING CHANGE: after a comment", True),
+    ("BREAKING CHANGE: before a comment <!-- hint -->", True),
+    ("Text <!-- hint --> BREAKING CHANGE: mid-line", False),
+    ("<!-- <!-- nested --> -->\nBREAKING CHANGE: after", True),
+    ("<!-- a --> x -->BREAKING CHANGE: visible text before", False),
+    ("<!-- unterminated\nBREAKING CHANGE: hidden", False),
+    ("<!-- a --><!-- b -->\r\n<!-- c --> BREAKING CHANGE: x", True),
+]
+
+
+@pytest.mark.parametrize("pr_body,expected", BREAKING_CHANGE_BODIES)
+def test_has_body_breaking_changes(pr_body, expected):
+    """Test breaking change footers are found outside HTML comments only."""
+    assert has_body_breaking_changes(pr_body) is expected
+
+
+def test_backfill_changelog_fragments(tmp_path):
+    """Test fragments are written for every pull request of a dump."""
+    pull_requests = [
+        {"number": 1, "title": "feat: add `dark` mode", "body": None, "labels": []},
+        {"number": 2, "title": "fix(api): crash", "body": "", "labels": [{"name": "bug"}]},
+        {"number": 3, "title": "Merge branch 'main'", "body": "", "labels": []},
+    ]
+    dump = tmp_path / "prs.jsonl"
+    dump.write_text("\n".join(json.dumps(pr) for pr in pull_requests) + "\n")
+    directory = tmp_path / "changelog.d"
+    directory.mkdir()
+    (directory / "2.added.md").write_text("Stale\n")
+
+    counts = backfill_changelog_fragments(dump, directory, processes=1)
+
+    assert counts == {"written": 2, "unchanged": 0, "skipped": 1, "removed": 1}
+    assert sorted(path.name for path in directory.iterdir()) == ["1.added.md", "2.fixed.md"]
+    assert (directory / "1.added.md").read_text() == "Add \\`dark\\` mode\n"
+
+    counts = backfill_changelog_fragments(dump, directory, processes=1)
+    assert counts == {"written": 0, "unchanged": 2, "skipped": 1, "removed": 0}
+
+
+def test_get_towncrier_config(tmp_path, monkeypatch):
+    """Test towncrier values are read in bulk from a cached parse of pyproject.toml."""
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(
+        '[project]\nname = "demo"\n\n'
+        '[tool.towncrier]\ndirectory = "doc/changelog.d"\nfilename = "CHANGELOG.md"\n'
+    )
+    loads = []
+    load = parse_pr.tomllib.load
+
+    def counting_load(file):
+        loads.append(file.name)
+        return load(file)
+
+    monkeypatch.setattr(parse_pr.tomllib, "load", counting_load)
+
+    assert get_towncrier_config("directory", "filename", "template", pyproject_path=pyproject) == (
+        "doc/changelog.d",
+        "CHANGELOG.md",
+        "",
+    )
+    assert get_towncrier_config_value("filename", pyproject) == "CHANGELOG.md"
+    assert len(loads) == 1
+
+    # Rewriting the file invalidates the cached parse
+    pyproject.write_text('[tool.towncrier]\nfilename = "doc/source/changelog.rst"\n')
+    stat = pyproject.stat()
+    os.utime(pyproject, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert get_towncrier_config_value("filename", pyproject) == "doc/source/changelog.rst"
+    assert len(loads) == 2
+
+    assert get_towncrier_config("directory", pyproject_path=tmp_path / "missing.toml") == ("",)
@@ -0,0 +1,84 @@
+# Copyright (C) 2022 - 2026 Synopsys, Inc. and ANSYS, Inc. All rights reserved.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Tests for the reroot module."""
+
+from pathlib import Path
+
+import pytest
+from reroot import reroot_html, write_landing_page
+
+INDEX_PAGE = b"""<html lang="en" data-content_root="./" >
+<head>
+  <link rel="stylesheet" href="_static/theme.css" />
+  <script src="https://cdn.example.com/lib.js"></script>
+  <script>const SEARCH_FILE = "../_static/search.json";</script>
+  <script>const ADVANCE_SEARCH_PATH = "search.html";</script>
+</head>
+<body><form action="search.html">
+<a href="api/index.html">API</a><img src="logo.png" />
+</form></body>
+</html>
+"""
+
+REROOTED_PAGE = b"""<html lang="en" data-content_root="./version/stable/" >
+<head>
+  <link rel="stylesheet" href="version/stable/_static/theme.css" />
+  <script src="https://cdn.example.com/lib.js"></script>
+  <script>const SEARCH_FILE = "version/stable/_static/search.json";</script>
+  <script>const ADVANCE_SEARCH_PATH = "version/stable/search.html";</script>
+</head>
+<body><form action="version/stable/search.html">
+<a href="version/stable/api/index.html">API</a><img src="version/stable/logo.png" />
+</form></body>
+</html>
+"""
+
+
+def test_reroot_html():
+    """Test every rewrite rule is applied."""
+    assert reroot_html(INDEX_PAGE, "version/stable") == REROOTED_PAGE
+
+
+def test_reroot_html_is_idempotent():
+    """Test re-rooting a page twice gives the same result."""
+    assert reroot_html(REROOTED_PAGE, "version/stable") == REROOTED_PAGE
+
+
+@pytest.mark.parametrize(
+    "versions,expected_version", [(["stable", "0.1"], "stable"), (["dev", "0.1"], "0.1")]
+)
+def test_write_landing_page(tmp_path, monkeypatch, versions, expected_version):
+    """Test the landing page is written from the first available version."""
+    monkeypatch.chdir(tmp_path)
+    for version in ("stable", "0.1"):
+        Path("version", version).mkdir(parents=True)
+        Path("version", version, "index.html").write_bytes(INDEX_PAGE)
+
+    assert write_landing_page(versions) == expected_version
+    expected = REROOTED_PAGE.replace(b"version/stable/", f"version/{expected_version}/".encode())
+    assert Path("index.html").read_bytes() == expected
+
+
+def test_write_landing_page_missing(tmp_path):
+    """Test an error is raised when no version has an index page."""
+    with pytest.raises(FileNotFoundError, match=r"version/stable, .*version/dev\."):
+        write_landing_page(["stable", "dev"], version_dir=tmp_path / "version")
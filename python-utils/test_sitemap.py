@@ -0,0 +1,204 @@
+# Copyright (C) 2022 - 2026 Synopsys, Inc. and ANSYS, Inc. All rights reserved.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Tests for the sitemap module."""
+
+import os
+from pathlib import Path
+import subprocess
+import xml.etree.ElementTree as ET
+
+import pytest
+from sitemap import generate_sitemap, get_git_commit_times
+
+NAMESPACE = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+
+
+@pytest.fixture
+def html_tree(tmp_path, monkeypatch):
+    """Create a small documentation tree and run from its parent directory."""
+    monkeypatch.chdir(tmp_path)
+    html_dir = Path("version", "stable")
+    (html_dir / "api" / "a b").mkdir(parents=True)
+    for page in (
+        "index.html",
+        "search.html",
+        "genindex.html",
+        "api/index.html",
+        "api/a b/x&y.html",
+    ):
+        (html_dir / page).write_text("<html></html>")
+    (html_dir / "objects.inv").write_text("")
+    os.utime(html_dir / "index.html", (0, 1700000000))
+    return html_dir
+
+
+def test_generate_sitemap(html_tree):
+    """Test the sitemap lists every page with its modification time."""
+    assert generate_sitemap("docs.pyansys.com", html_tree, lastmod_source="mtime") == [
+        Path("sitemap.xml")
+    ]
+
+    urls = ET.parse("sitemap.xml").getroot().findall("sm:url", NAMESPACE)
+    locs = [url.findtext("sm:loc", namespaces=NAMESPACE) for url in urls]
+    assert locs == [
+        "https://docs.pyansys.com",
+        "https://docs.pyansys.com/version/stable/index.html",
+        "https://docs.pyansys.com/version/stable/api/index.html",
+        "https://docs.pyansys.com/version/stable/api/a%20b/x%26y.html",
+    ]
+    assert urls[1].findtext("sm:lastmod", namespaces=NAMESPACE) == "2023-11-14T22:13:20+00:00"
+
+
+def test_generate_sitemap_shards(html_tree):
+    """Test large sitemaps are split into shards referenced by a sitemap index."""
+    Path("sitemap-9.xml").write_text("stale")
+
+    sitemaps = generate_sitemap("docs.pyansys.com", html_tree, lastmod_source="mtime", max_urls=3)
+
+    assert sitemaps == [Path("sitemap.xml"), Path("sitemap-1.xml"), Path("sitemap-2.xml")]
+    assert not Path("sitemap-9.xml").exists()
+    index = ET.parse("sitemap.xml").getroot()
+    assert [loc.text for loc in index.iterfind("sm:sitemap/sm:loc", NAMESPACE)] == [
+        "https://docs.pyansys.com/sitemap-1.xml",
+        "https://docs.pyansys.com/sitemap-2.xml",
+    ]
+    shard_sizes = [
+        len(ET.parse(shard).getroot().findall("sm:url", NAMESPACE)) for shard in sitemaps[1:]
+    ]
+    assert shard_sizes == [3, 1]
+
+
+def git(*args, date="2024-01-01T00:00:00+00:00"):
+    """Run a git command with a fixed commit date."""
+    env = {**os.environ, "GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date}
+    subprocess.run(
+        ["git", "-c", "user.name=bot", "-c", "user.email=bot@example.com", *args],
+        check=True,
+        capture_output=True,
+        env=env,
+    )
+
+
+@pytest.fixture
+def git_html_tree(html_tree):
+    """Commit the documentation tree, then update one of its pages in a second commit."""
+    git("init", "-q")
+    git("add", ".")
+    git("commit", "-q", "-m", "First")
+    (html_tree / "api" / "index.html").write_text("<html>updated</html>")
+    git("commit", "-q", "-am", "Second", date="2024-06-01T00:00:00+00:00")
+    return html_tree
+
+
+def lastmods(sitemap):
+    """Map the location of every URL of a sitemap to its last modification time."""
+    urls = ET.parse(sitemap).getroot().findall("sm:url", NAMESPACE)
+    return {
+        url.findtext("sm:loc", namespaces=NAMESPACE): url.findtext(
+            "sm:lastmod", namespaces=NAMESPACE
+        )
+        for url in urls
+    }
+
+
+def test_get_git_commit_times(git_html_tree):
+    """Test the last commit time of every tracked page is read from the history."""
+    (git_html_tree / "new.html").write_text("<html></html>")
+
+    assert get_git_commit_times(git_html_tree) == {
+        "version/stable/index.html": 1704067200.0,
+        "version/stable/api/index.html": 1717200000.0,
+        "version/stable/api/a b/x&y.html": 1704067200.0,
+    }
+
+
+def test_get_git_commit_times_stops_early(git_html_tree, monkeypatch):
+    """Test the history is no longer read once every page has a commit time."""
+    for page in ("index.html", "api/a b/x&y.html"):
+        (git_html_tree / page).write_text("<html>updated</html>")
+    git("commit", "-q", "-am", "Third", date="2024-07-01T00:00:00+00:00")
+    popen = subprocess.Popen
+    log_processes = []
+
+    def record_popen(args, **kwargs):
+        process = popen(args, **kwargs)
+        if "log" in args:
+            log_processes.append(process)
+            process.stdout = LineCounter(process.stdout)
+        return process
+
+    monkeypatch.setattr(subprocess, "Popen", record_popen)
+
+    assert get_git_commit_times(git_html_tree) == {
+        "version/stable/index.html": 1719792000.0,
+        "version/stable/api/index.html": 1717200000.0,
+        "version/stable/api/a b/x&y.html": 1719792000.0,
+    }
+    # The first commit, listing every page, is never read
+    assert len(log_processes) == 1
+    assert log_processes[0].stdout.lines == 7
+
+
+class LineCounter:
+    """Count the lines read from a file."""
+
+    def __init__(self, file):
+        self.file = file
+        self.lines = 0
+
+    def __iter__(self):
+        """Iterate over the lines of the file."""
+        for line in self.file:
+            self.lines += 1
+            yield line
+
+    def close(self):
+        """Close the file."""
+        self.file.close()
+
+
+def test_generate_sitemap_git(git_html_tree):
+    """Test the sitemap uses the last commit time of each page."""
+    generate_sitemap("docs.pyansys.com", git_html_tree)
+
+    dates = lastmods("sitemap.xml")
+    assert dates["https://docs.pyansys.com/version/stable/index.html"] == (
+        "2024-01-01T00:00:00+00:00"
+    )
+    assert dates["https://docs.pyansys.com/version/stable/api/index.html"] == (
+        "2024-06-01T00:00:00+00:00"
+    )
+
+
+def test_generate_sitemap_shallow(git_html_tree, tmp_path, monkeypatch):
+    """Test the modification times are used in a shallow checkout."""
+    git("clone", "-q", "--depth", "1", tmp_path.as_uri(), str(tmp_path / "clone"))
+    monkeypatch.chdir(tmp_path / "clone")
+    os.utime(git_html_tree / "index.html", (0, 1700000000))
+
+    assert get_git_commit_times(git_html_tree) == {}
+    generate_sitemap("docs.pyansys.com", git_html_tree)
+
+    dates = lastmods("sitemap.xml")
+    assert dates["https://docs.pyansys.com/version/stable/index.html"] == (
+        "2023-11-14T22:13:20+00:00"
+    )
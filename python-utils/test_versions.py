@@ -25,16 +25,24 @@ from copy import deepcopy
 import json
 import os
 from pathlib import Path
+import re
 import shutil
+import tarfile
 
 from packaging.version import Version
 import pytest
 from versions import (
+    VersionIndex,
     find_stable_release,
     get_version_and_ref_type,
     get_versions_list,
+    place_announcement,
+    remove_version_trees,
+    select_retained_versions,
     set_version_variable,
+    write_archive_index,
     write_versions_file,
+    write_versions_page,
 )
 
 
@@ -395,6 +403,41 @@ def test_find_stable_release(test_environment_setup):
     assert stable_release == expected_result
 
 
+@pytest.mark.parametrize("test_environment_setup", BASE_DATA_FOUR, indirect=True)
+def test_version_index_queries(test_environment_setup):
+    """Test that VersionIndex answers every query from a single sorted scan."""
+    index = VersionIndex()
+
+    test_data = test_environment_setup
+    versions = sorted(Version(version) for version in test_data["versions"])
+    stable_versions = [version for version in versions if not version.is_prerelease]
+
+    assert index.all() == versions
+    assert index.all(exclude_prereleases=True) == stable_versions
+    assert index.latest_stable() == max(stable_versions)
+    assert index.render_window(3) == versions[::-1][:3]
+    assert index.prereleases() == [version for version in versions if version.is_prerelease]
+    for version in versions:
+        assert all(
+            prerel.release == version.release for prerel in index.prereleases(version.release)
+        )
+
+
+def test_version_index_skips_invalid_versions(tmp_path, capsys):
+    """Test that VersionIndex skips the folders whose name is not a version."""
+    version_dir = tmp_path / "version"
+    for name in ("0.2", "dev", "stable", "_static", "0.1", "latest"):
+        (version_dir / name).mkdir(parents=True)
+    (version_dir / "notes.txt").write_text("")
+
+    index = VersionIndex(version_dir)
+
+    assert index.all() == [Version("0.1"), Version("0.2")]
+    output = capsys.readouterr().out
+    assert "_static" in output
+    assert "latest" in output
+
+
 # Test write versions file should be here
 
 
@@ -507,6 +550,54 @@ def test_maximum_three_prerelease(test_environment_setup):
     assert len(prerelease_versions) == 2
 
 
+@pytest.mark.parametrize("test_environment_setup", SPECIAL_TEST_DATA_FOUR, indirect=True)
+def test_configurable_prerelease_retention(test_environment_setup, monkeypatch):
+    """Test that the number of kept pre-release versions can be configured."""
+    monkeypatch.setenv("PRE_RELEASES_TO_KEEP", "2")
+    set_version_variable()
+
+    remaining_versions = get_versions_list()
+    prerelease_versions = [version for version in remaining_versions if version.is_prerelease]
+
+    assert prerelease_versions == [Version("0.4.0rc0")]
+
+
+def test_remove_version_trees(tmp_path):
+    """Test that documentation trees are removed along with their trash directory."""
+    version_path = tmp_path / "version"
+    for name in ("0.1.0a0", "0.1.0a1", "0.1"):
+        nested_path = version_path / name / "_static" / "css"
+        nested_path.mkdir(parents=True)
+        for i in range(10):
+            (version_path / name / f"page_{i}.html").write_text("<html></html>")
+            (nested_path / f"style_{i}.css").write_text("")
+        (version_path / name / "latest").symlink_to(version_path / "0.1")
+
+    remove_version_trees(
+        [version_path / "0.1.0a0", version_path / "0.1.0a1"], max_workers=2, chunk_size=3
+    )
+
+    assert [path.name for path in version_path.iterdir()] == ["0.1"]
+    assert len(list((version_path / "0.1").rglob("*"))) == 23
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["version"]
+
+
+def test_remove_version_trees_error(tmp_path, monkeypatch):
+    """Test that the trash directory is removed when deleting the files fails."""
+    version_path = tmp_path / "version"
+    (version_path / "0.1.0a0").mkdir(parents=True)
+    (version_path / "0.1.0a0" / "index.html").write_text("<html></html>")
+
+    def fail(files):
+        raise PermissionError("denied")
+
+    monkeypatch.setattr("versions._unlink_files", fail)
+    with pytest.raises(PermissionError):
+        remove_version_trees([version_path / "0.1.0a0"])
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["version"]
+
+
 ############################################################################
 # Pre-release as first release tests, requires specific setup and datasets #
 ############################################################################
@@ -603,3 +694,186 @@ def test_write_versions_file_no_stable(test_environment_setup):
     gh_output_path = os.environ["GITHUB_OUTPUT"]
     gh_output_content = Path(gh_output_path).read_text()
     assert "LATEST_STABLE_VERSION=\n" in gh_output_content
+
+
+# Test write_versions_file only rewrites versions.json when its content changes
+WRITE_VERSIONS_UNCHANGED_DATA = [
+    {
+        "ref_type": "tag",
+        "ref_name": "v0.4.0",
+        "independent_patch_release": "false",
+        "versions": ["0.1", "0.2", "0.3", "0.4"],
+        "create_versions_directories": True,
+        "create_github_output_file": True,
+    },
+]
+
+
+@pytest.mark.parametrize("test_environment_setup", WRITE_VERSIONS_UNCHANGED_DATA, indirect=True)
+def test_write_versions_file_unchanged(test_environment_setup):
+    """Test write_versions_file leaves an up-to-date versions.json untouched."""
+    versions_file = Path("versions.json")
+    versions_file.unlink(missing_ok=True)
+    gh_output_path = Path(os.environ["GITHUB_OUTPUT"])
+
+    write_versions_file()
+    assert "VERSIONS_FILE_UPDATED=true\n" in gh_output_path.read_text()
+    first_content = versions_file.read_text(encoding="utf-8")
+    first_mtime = versions_file.stat().st_mtime_ns
+
+    gh_output_path.write_text("")
+    write_versions_file()
+    assert "VERSIONS_FILE_UPDATED=false\n" in gh_output_path.read_text()
+    assert versions_file.read_text(encoding="utf-8") == first_content
+    assert versions_file.stat().st_mtime_ns == first_mtime
+
+    versions_file.unlink()
+
+
+# Test old versions are archived when a retention is configured
+WRITE_VERSIONS_ARCHIVE_DATA = [
+    {
+        "ref_type": "tag",
+        "ref_name": "v2.0.0",
+        "independent_patch_release": "false",
+        "versions": ["0.1", "0.2", "0.3", "1.0", "1.1", "1.2", "2.0", "2.1.0rc0"],
+        "create_versions_directories": True,
+        "create_github_output_file": True,
+    },
+]
+
+
+@pytest.mark.parametrize("test_environment_setup", WRITE_VERSIONS_ARCHIVE_DATA, indirect=True)
+def test_write_versions_file_archives_old_versions(test_environment_setup, monkeypatch):
+    """Test write_versions_file archives versions beyond the retention policy."""
+    monkeypatch.setenv("VERSIONS_TO_KEEP", "2")
+    version_path = Path("version")
+    (version_path / "1.0" / "index.html").write_text("<html></html>")
+
+    write_versions_file()
+
+    remaining = [version.name for version in sorted(version_path.iterdir())]
+    assert remaining == ["0.3", "1.2", "2.0", "2.1.0rc0", "archive"]
+
+    archive_path = version_path / "archive"
+    assert sorted(path.name for path in archive_path.glob("*.tar.gz")) == [
+        "0.1.tar.gz",
+        "0.2.tar.gz",
+        "1.0.tar.gz",
+        "1.1.tar.gz",
+    ]
+    with tarfile.open(archive_path / "1.0.tar.gz") as archive:
+        assert "1.0/index.html" in archive.getnames()
+    archive_index = (archive_path / "index.html").read_text(encoding="utf-8")
+    assert '<a href="../2.0/">2.0</a>' in archive_index
+    assert '<a href="0.1.tar.gz">0.1</a>' in archive_index
+
+    versions_file = Path("versions.json")
+    content = json.loads(versions_file.read_text(encoding="utf-8"))
+    assert content[-1]["url"] == "https://docs.pyansys.com/version/archive/"
+
+    versions_file.unlink()
+
+
+@pytest.mark.parametrize(
+    "versions,keep_last,expected",
+    [
+        (["0.1", "0.2", "1.0", "1.1", "2.0"], 2, ["0.2", "1.1", "2.0"]),
+        (["0.1", "0.2", "1.0", "1.1", "2.0"], 0, ["0.2", "1.1", "2.0"]),
+        (
+            ["0.1.0", "1.0.0", "1.0.1", "1.1.0", "1.1.1", "1.2.0", "1.2.1", "1.2.2"],
+            2,
+            ["0.1.0", "1.1.0", "1.1.1", "1.2.0", "1.2.1", "1.2.2"],
+        ),
+    ],
+)
+def test_select_retained_versions(versions, keep_last, expected):
+    """Test the last minors, with all their patches, and the latest of each major are kept."""
+    retained = select_retained_versions([Version(version) for version in versions], keep_last)
+
+    assert sorted(retained) == [Version(version) for version in expected]
+
+
+def test_write_archive_index_skips_invalid_names(tmp_path, capsys):
+    """Test stray files of the archive directory are skipped."""
+    version_dir = tmp_path / "version"
+    archive_dir = version_dir / "archive"
+    (version_dir / "1.0").mkdir(parents=True)
+    archive_dir.mkdir()
+    for name in ("0.1.tar.gz", "0.2.tar.gz", "backup.tar.gz", "notes.txt"):
+        (archive_dir / name).write_text("")
+
+    write_archive_index(VersionIndex(version_dir), archive_dir)
+
+    archive_index = (archive_dir / "index.html").read_text(encoding="utf-8")
+    assert archive_index.index("0.2.tar.gz") < archive_index.index("0.1.tar.gz")
+    assert "backup" not in archive_index
+    assert "backup.tar.gz" in capsys.readouterr().out
+
+
+# Test the announcement is placed in the public folders of the outdated versions
+PLACE_ANNOUNCEMENT_DATA = [
+    {
+        "ref_type": "tag",
+        "ref_name": "v0.10.0",
+        "independent_patch_release": "false",
+        "versions": ["0.1", "0.10", "0.11.0rc0"],
+        "create_versions_directories": True,
+    },
+]
+
+
+@pytest.mark.parametrize("test_environment_setup", PLACE_ANNOUNCEMENT_DATA, indirect=True)
+def test_place_announcement(test_environment_setup):
+    """Test the announcement is written once in each public folder of the outdated versions."""
+    version_path = Path("version")
+    for folder in ("0.1/api", "0.1/_static", "0.10/api"):
+        (version_path / folder).mkdir()
+
+    assert place_announcement("docs.pyansys.com", "0.10") == (3, 0)
+
+    announcements = sorted(
+        str(path.parent.relative_to(version_path))
+        for path in version_path.rglob("announcement.html")
+    )
+    assert announcements == ["0.1", "0.1/api", "0.11.0rc0"]
+    assert (
+        '<a href="https://docs.pyansys.com/version/stable/">0.10</a>'
+        in (version_path / "0.1" / "announcement.html").read_text()
+    )
+
+    # A repeated deployment does not modify any file
+    assert place_announcement("docs.pyansys.com", "0.10") == (0, 3)
+
+
+# Test the versions page lists the versions from the most recent one
+WRITE_VERSIONS_PAGE_DATA = [
+    {
+        "ref_type": "tag",
+        "ref_name": "v10.0.0",
+        "independent_patch_release": "false",
+        "versions": ["dev", "stable", "9.1", "10.0", "1.0", "10.1.0rc0"],
+        "create_versions_directories": True,
+    },
+]
+
+
+@pytest.mark.parametrize("test_environment_setup", WRITE_VERSIONS_PAGE_DATA, indirect=True)
+def test_write_versions_page(test_environment_setup):
+    """Test write_versions_page injects the versions table in the stable index page."""
+    version_path = Path("version")
+    (version_path / "stable" / "index.html").write_text(
+        '<html>\n<link href="_static/theme.css" />\n<footer>\n</footer>\n</html>\n'
+    )
+
+    write_versions_page("docs.pyansys.com", "main-content", page_size=2)
+
+    content = (version_path / "index.html").read_text()
+    assert '<link href="stable/_static/theme.css" />' in content
+    assert content.count("<script>") == 1
+    assert content.index("</script>") < content.index("</footer>")
+    assert 'document.getElementById("main-content")' in content
+    assert "const pageSize = 2;" in content
+    versions = json.loads(re.search(r"const versions = (.*);", content).group(1))
+    assert [name for name, _ in versions] == ["stable", "dev", "10.1.0rc0", "10.0", "9.1", "1.0"]
+    assert versions[3][1] == "https://docs.pyansys.com/version/10.0"
@@ -21,19 +21,86 @@
 # SOFTWARE.
 """Utilities for managing versioned documentation entries."""
 
+from concurrent.futures import ThreadPoolExecutor
+import html
 import json
 import os
 from pathlib import Path
 import re
 import shutil
+from string import Template
+import tarfile
+import tempfile
 from typing import Literal, cast
 
-from packaging.version import Version
+from github_outputs import GitHubFileWriter, write_github_variable
+from packaging.version import InvalidVersion, Version
+from reroot import reroot_html
 
 KEYS = ("name", "version", "url")
 # Values that github.ref_type can take, see https://docs.github.com/en/actions/reference/workflows-and-actions/contexts
 REF_TYPES = Literal["tag", "branch"]
 
+ANNOUNCEMENT_TEMPLATE = """\
+  <p>
+    You are not viewing the most recent version of this documentation.
+    The latest stable release is <a href="{stable_url}">{latest_stable_version}</a>
+  </p>
+"""
+
+# Content injected in the versions page. The table is rendered by the browser, one page of
+# versions at a time, so that the page stays light even with hundreds of versions.
+VERSIONS_PAGE_TEMPLATE = Template("""\
+<style>
+.bd-main .bd-content .bd-article-container {
+    display: flex;
+    flex-direction: column;
+    justify-content: start;
+}
+.table {
+    border-collapse: collapse;
+    width: 100%;
+}
+.table th, .table td {
+    border: 1px solid #dddddd;
+    text-align: center;
+    padding: 8px;
+}
+.table th {
+    background-color: var(--pst-color-table-hover);
+}
+</style>
+<script>
+(() => {
+  const versions = $versions;
+  const pageSize = $page_size;
+  const element = document.getElementById($content_element_id);
+  element.innerHTML = "<h1>Versions</h1>"
+    + "<p>This table lists all versions released for the project:</p>"
+    + "<table class='table'><thead><tr><th>Version</th><th>URL</th></tr></thead>"
+    + "<tbody></tbody></table>"
+    + "<button type='button' class='btn btn-secondary'>Show more versions</button>";
+  const body = element.querySelector("tbody");
+  const button = element.querySelector("button");
+  let shown = 0;
+  function showMore() {
+    for (const [name, url] of versions.slice(shown, shown + pageSize)) {
+      const row = body.insertRow();
+      row.insertCell().textContent = name;
+      const link = document.createElement("a");
+      link.href = url;
+      link.textContent = url;
+      row.insertCell().appendChild(link);
+    }
+    shown = Math.min(shown + pageSize, versions.length);
+    button.hidden = shown >= versions.length;
+  }
+  button.addEventListener("click", showMore);
+  showMore();
+})();
+</script>
+""")
+
 
 def make_entry(values: tuple[str, str, str]) -> dict:
     """Create a version entry dictionary with fixed keys."""
@@ -58,90 +125,521 @@ def get_version_and_ref_type() -> tuple[str, REF_TYPES]:
     return version, ref_type
 
 
-def get_versions_list(exclude_prereleases: bool = False) -> list[Version]:
+class VersionIndex:
+    """Index of the documentation versions found in the 'version' directory.
+
+    The directory is scanned once and the parsed versions are kept sorted, so
+    that every query is answered without touching the filesystem again. Folders
+    whose name is not a version are skipped.
+
+    Parameters
+    ----------
+    version_dir: Path
+        Directory containing one folder per documentation version.
+    """
+
+    EXCLUDED_VERSIONS = ("dev", "stable", "archive")
+
+    def __init__(self, version_dir: Path = Path("version")):
+        if not version_dir.is_dir():
+            raise FileNotFoundError(
+                "Could not find the 'version/' directory in the current branch. "
+                "This directory is expected to be present in the branch and is generated "
+                "by the 'doc-deploy-dev' action. Make sure the 'doc-deploy-dev' action has been "
+                "run at least once before running the 'doc-deploy-stable' action."
+            )
+        self.version_dir = version_dir
+        self.versions: list[Version] = []
+        with os.scandir(version_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir() or entry.name in self.EXCLUDED_VERSIONS:
+                    continue
+                try:
+                    self.versions.append(Version(entry.name))
+                except InvalidVersion:
+                    print(f"Skipping '{version_dir / entry.name}': not a version directory.")
+        self.versions.sort()
+
+    def all(self, exclude_prereleases: bool = False) -> list[Version]:
+        """Get the versions, sorted in ascending order.
+
+        Parameters
+        ----------
+        exclude_prereleases: bool
+            Prereleases are excluded from returned versions
+
+        Returns
+        -------
+        list[Version]
+            The versions in the 'version' directory.
+        """
+        if exclude_prereleases:
+            return [version for version in self.versions if not version.is_prerelease]
+        return list(self.versions)
+
+    def prereleases(self, release: tuple[int, ...] | None = None) -> list[Version]:
+        """Get the pre-release versions, sorted in ascending order.
+
+        Parameters
+        ----------
+        release: tuple[int, ...] | None
+            If provided, only pre-releases of this MAJOR.MINOR.PATCH release are returned.
+
+        Returns
+        -------
+        list[Version]
+            The pre-release versions.
+        """
+        return [
+            version
+            for version in self.versions
+            if version.is_prerelease and (release is None or version.release == release)
+        ]
+
+    def latest_stable(self) -> Version | None:
+        """Get the latest stable (non pre-release) version.
+
+        Returns
+        -------
+        Version | None
+            The latest stable version, or ``None`` if no stable version exists yet.
+        """
+        return next(
+            (version for version in reversed(self.versions) if not version.is_prerelease), None
+        )
+
+    def render_window(self, render_last: int) -> list[Version]:
+        """Get the versions to render in the version switcher.
+
+        Parameters
+        ----------
+        render_last: int
+            Number of versions to render.
+
+        Returns
+        -------
+        list[Version]
+            The ``render_last`` most recent versions, sorted in descending order.
+        """
+        return self.versions[::-1][:render_last]
+
+    def remove(self, version: Version) -> None:
+        """Remove a version from the index once its folder has been deleted.
+
+        Parameters
+        ----------
+        version: Version
+            The version to remove.
+        """
+        self.versions.remove(version)
+
+
+def _unlink_files(paths: list[Path]) -> None:
+    for path in paths:
+        path.unlink()
+
+
+def remove_version_trees(
+    paths: list[Path], max_workers: int | None = None, chunk_size: int = 256
+) -> None:
+    """Remove documentation trees, deleting their files in parallel.
+
+    The trees are first renamed into a trash directory next to their parent directory, so that
+    they disappear from the version directory at once. The files in the trash are then deleted by
+    a pool of worker threads, and the emptied directories are removed last. The trash directory is
+    removed even if an error occurs.
+
+    Parameters
+    ----------
+    paths: list[Path]
+        The documentation trees to remove.
+    max_workers: int | None
+        Maximum number of threads used to delete files. Defaults to the ``ThreadPoolExecutor``
+        default.
+    chunk_size: int
+        Number of files deleted by a thread in a single task.
+    """
+    if not paths:
+        return
+
+    # The trash lives outside the version directory so that it is never parsed as a version
+    trash_dir = Path(tempfile.mkdtemp(prefix=".trash-", dir=paths[0].parent.parent))
+    try:
+        for path in paths:
+            path.replace(trash_dir / path.name)
+
+        files: list[Path] = []
+        directories: list[Path] = []
+        for root, dirnames, filenames in os.walk(trash_dir, topdown=False):
+            files.extend(Path(root, name) for name in filenames)
+            # Symbolic links to directories are listed as directories but must be unlinked
+            for name in dirnames:
+                dirpath = Path(root, name)
+                (files if dirpath.is_symlink() else directories).append(dirpath)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            chunks = [files[i : i + chunk_size] for i in range(0, len(files), chunk_size)]
+            # Consume the results so that any error is raised
+            list(executor.map(_unlink_files, chunks))
+
+        # os.walk(topdown=False) lists subdirectories before their parents
+        for directory in directories:
+            directory.rmdir()
+    finally:
+        # Never leave the trash behind at the root of the site, where it could get committed
+        shutil.rmtree(trash_dir, ignore_errors=True)
+
+
+def get_versions_list(
+    exclude_prereleases: bool = False, index: VersionIndex | None = None
+) -> list[Version]:
     """Get a list of versions from the 'version' directory.
 
     Parameters
     ----------
     exclude_prereleases: bool
         Prereleases are excluded from returned versions
+    index: VersionIndex | None
+        Index to query. By default, the 'version' directory is scanned.
 
     Returns
     -------
     list[Version]
-        A list of Version objects representing the versions in the 'version' directory.
+        A list of Version objects representing the versions in the 'version' directory,
+        sorted in ascending order.
     """
-    version_dir = Path("version")
-    if not version_dir.exists() or not version_dir.is_dir():
-        raise FileNotFoundError(
-            "Could not find the 'version/' directory in the current branch. "
-            "This directory is expected to be present in the branch and is generated "
-            "by the 'doc-deploy-dev' action. Make sure the 'doc-deploy-dev' action has been run "
-            "at least once before running the 'doc-deploy-stable' action."
-        )
-    version_list = []
-    excluded_versions = ["dev", "stable"]
-    for version_folder in version_dir.glob("*/"):
-        if version_folder.is_file():
-            continue
-        version_name = version_folder.name
-        if version_name in excluded_versions:
-            continue
-        version = Version(version_name)
-        if version.is_prerelease and exclude_prereleases:
-            continue
-        version_list.append(version)
-    return version_list
+    index = index or VersionIndex()
+    return index.all(exclude_prereleases=exclude_prereleases)
+
+
+def select_retained_versions(versions: list[Version], keep_last: int) -> set[Version]:
+    """Select the stable versions whose documentation trees are kept.
+
+    The versions of the ``keep_last`` most recent minors are kept, as well as the latest version
+    of each major. With independent patch releases, every patch of a kept minor is kept.
+
+    Parameters
+    ----------
+    versions: list[Version]
+        Stable versions, sorted in ascending order.
+    keep_last: int
+        Number of most recent minors to keep.
+
+    Returns
+    -------
+    set[Version]
+        The versions to keep.
+    """
+    minors = sorted({(version.major, version.minor) for version in versions})
+    kept_minors = set(minors[-keep_last:]) if keep_last > 0 else set()
+    retained = {version for version in versions if (version.major, version.minor) in kept_minors}
+    latest_per_major = {version.major: version for version in versions}
+    return retained | set(latest_per_major.values())
+
+
+def write_archive_index(index: VersionIndex, archive_dir: Path) -> None:
+    """Write the index page listing the available and the archived documentation versions.
+
+    Parameters
+    ----------
+    index: VersionIndex
+        Index of the versions still present in the version directory.
+    archive_dir: Path
+        Directory containing the archived versions as ``<version>.tar.gz`` files.
+    """
+    archived = []
+    for path in archive_dir.glob("*.tar.gz"):
+        try:
+            archived.append(Version(path.name.removesuffix(".tar.gz")))
+        except InvalidVersion:
+            print(f"Skipping '{path}': not a version archive.")
+    archived.sort(reverse=True)
+    lines = [
+        "<!DOCTYPE html>",
+        "<html>",
+        "<head><meta charset='utf-8'><title>Documentation versions</title></head>",
+        "<body>",
+        "<h1>Available versions</h1>",
+        "<ul>",
+    ]
+    for version in reversed(index.all()):
+        name = html.escape(str(version))
+        lines.append(f'<li><a href="../{name}/">{name}</a></li>')
+    lines += ["</ul>", "<h1>Archived versions</h1>", "<ul>"]
+    for version in archived:
+        name = html.escape(str(version))
+        lines.append(f'<li><a href="{name}.tar.gz">{name}</a></li>')
+    lines += ["</ul>", "</body>", "</html>", ""]
+    (archive_dir / "index.html").write_text("\n".join(lines), encoding="utf-8")
+
+
+def archive_old_versions(index: VersionIndex, keep_last: int) -> list[Version]:
+    """Pack old stable documentation versions into compressed tarballs.
+
+    Versions that are not retained by ``select_retained_versions`` are written to
+    ``<version_dir>/archive/<version>.tar.gz`` and their trees are removed. Pre-releases are
+    left untouched. The archive index page is rewritten whenever the archive exists.
+
+    Parameters
+    ----------
+    index: VersionIndex
+        Index of the versions in the version directory. Archived versions are removed from it.
+    keep_last: int
+        Number of most recent minors to keep.
+
+    Returns
+    -------
+    list[Version]
+        The versions that were archived.
+    """
+    stable_versions = index.all(exclude_prereleases=True)
+    retained = select_retained_versions(stable_versions, keep_last)
+    to_archive = [version for version in stable_versions if version not in retained]
+
+    archive_dir = index.version_dir / "archive"
+    if to_archive:
+        archive_dir.mkdir(exist_ok=True)
+    for version in to_archive:
+        version_path = index.version_dir / str(version)
+        tarball = archive_dir / f"{version}.tar.gz"
+        partial_tarball = tarball.with_name(f"{tarball.name}.partial")
+        print(f"Archiving {version_path} into {tarball}.")
+        with tarfile.open(partial_tarball, "w:gz") as archive:
+            archive.add(version_path, arcname=str(version))
+        partial_tarball.replace(tarball)
+
+    remove_version_trees([index.version_dir / str(version) for version in to_archive])
+    for version in to_archive:
+        index.remove(version)
+
+    if archive_dir.is_dir():
+        write_archive_index(index, archive_dir)
+    return to_archive
+
+
+def _public_directories(root: Path) -> list[Path]:
+    """List a directory and all its subdirectories, skipping the ones starting with '_'."""
+    directories = [root]
+    pending = [root]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False) and not entry.name.startswith("_"):
+                    directories.append(Path(entry.path))
+                    pending.append(directories[-1])
+    return directories
+
+
+def _write_if_changed(path: Path, content: bytes) -> bool:
+    try:
+        if path.read_bytes() == content:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(content)
+    return True
+
+
+def place_announcement(
+    cname: str,
+    latest_stable_version: str,
+    index: VersionIndex | None = None,
+    max_workers: int | None = None,
+) -> tuple[int, int]:
+    """Place the outdated version announcement in every public folder of the outdated versions.
+
+    The announcement is rendered once and written by a pool of threads. Folders whose
+    announcement is already byte-identical are left untouched, so that a repeated deployment
+    does not modify any file.
+
+    Parameters
+    ----------
+    cname: str
+        The canonical name (CNAME) containing the documentation.
+    latest_stable_version: str
+        The latest stable version, which does not get the announcement.
+    index: VersionIndex | None
+        Index to query. By default, the 'version' directory is scanned.
+    max_workers: int | None
+        Maximum number of threads. Defaults to the ``ThreadPoolExecutor`` default.
+
+    Returns
+    -------
+    tuple[int, int]
+        Number of announcement files written and number of announcement files already up to
+        date.
+    """
+    index = index or VersionIndex()
+    announcement = ANNOUNCEMENT_TEMPLATE.format(
+        stable_url=f"https://{cname}/version/stable/", latest_stable_version=latest_stable_version
+    ).encode()
+    latest_stable = Version(latest_stable_version)
+    paths = [
+        directory / "announcement.html"
+        for version in index.all()
+        if version != latest_stable
+        for directory in _public_directories(index.version_dir / str(version))
+    ]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        written = sum(executor.map(_write_if_changed, paths, [announcement] * len(paths)))
+
+    print(f"Announcement written to {written} folders, {len(paths) - written} already up to date.")
+    return written, len(paths) - written
+
+
+def _script_json(value: object) -> str:
+    """Serialize a value to JSON which can be embedded in a script element."""
+    return json.dumps(value).replace("</", "<\\/")
+
+
+def write_versions_page(
+    cname: str, content_element_id: str, index: VersionIndex | None = None, page_size: int = 100
+) -> None:
+    """Write the 'version/index.html' page listing all the documentation versions.
+
+    The index page of the stable (or development) version is used as baseline: its links are
+    re-rooted and the versions table is injected before its footer. Versions are listed from
+    the most recent one, after the 'stable' and 'dev' folders and before the archive.
+
+    Parameters
+    ----------
+    cname: str
+        The canonical name (CNAME) containing the documentation.
+    content_element_id: str
+        Identifier of the HTML tag that comprises all the content of the article or post.
+    index: VersionIndex | None
+        Index to query. By default, the 'version' directory is scanned.
+    page_size: int
+        Number of versions shown at first and added by the "Show more versions" button.
+
+    Raises
+    ------
+    FileNotFoundError
+        If neither the stable nor the development version has an index page.
+    """
+    index = index or VersionIndex()
+    version_dir = index.version_dir
+    for baseline in ("stable", "dev"):
+        baseline_page = version_dir / baseline / "index.html"
+        if baseline_page.is_file():
+            break
+    else:
+        raise FileNotFoundError("The 'index.html' file does not exist.")
+
+    folders = [folder for folder in ("stable", "dev") if (version_dir / folder).is_dir()]
+    folders += [str(version) for version in reversed(get_versions_list(index=index))]
+    if (version_dir / "archive").is_dir():
+        folders.append("archive")
+    versions = [[folder, f"https://{cname}/version/{folder}"] for folder in folders]
+    injected_content = VERSIONS_PAGE_TEMPLATE.substitute(
+        versions=_script_json(versions),
+        page_size=page_size,
+        content_element_id=_script_json(content_element_id),
+    ).encode()
+
+    content = reroot_html(baseline_page.read_bytes(), baseline)
+    # Inject the content before the line closing the first footer, or the body
+    for marker in (b"</footer>", b"</body>"):
+        position = content.find(marker)
+        if position != -1:
+            line_start = content.rfind(b"\n", 0, position) + 1
+            content = content[:line_start] + injected_content + content[line_start:]
+            break
+    (version_dir / "index.html").write_bytes(content)
 
 
 def export_to_github_output(var_name: str, var_value: str) -> None:
     """Save environment variable to the GITHUB_OUTPUT file.
 
+    Use a ``GitHubFileWriter`` instead when exporting several variables.
+
     Parameters
     ----------
-    output_name: str
+    var_name: str
         The name of the environment variable.
-    output_value: str
+    var_value: str
         The value of the environment variable.
     """
-    # Get the GITHUB_OUTPUT variable
-    github_output = os.environ["GITHUB_OUTPUT"]
-
-    # Save environment variable with its value
-    with Path(github_output).open("a", encoding="utf-8") as file:
-        if "\n" in var_value or "\r" in var_value:
-            file.write(f"{var_name}<<EOF\n")
-            file.write(var_value)
-            file.write("\nEOF\n")
-        else:
-            file.write(f"{var_name}={var_value}\n")
+    write_github_variable("GITHUB_OUTPUT", var_name, var_value)
 
 
-def find_stable_release() -> str | None:
+def find_stable_release(index: VersionIndex | None = None) -> str | None:
     """Find the latest stable release version.
 
+    Parameters
+    ----------
+    index: VersionIndex | None
+        Index to query. By default, the 'version' directory is scanned.
+
     Returns
     -------
     str | None
         The latest stable release version as a string, or ``None`` if no
         stable (non-pre-release) version exists yet.
     """
-    versions_list = get_versions_list(exclude_prereleases=True)
-    if not versions_list:
-        return None
-    stable_release = max(versions_list)
-    return str(stable_release)
+    index = index or VersionIndex()
+    stable_release = index.latest_stable()
+    return str(stable_release) if stable_release is not None else None
+
+
+def update_versions_file(versions_file: Path, content: list[dict]) -> bool:
+    """Write the versions file only if its content changes.
+
+    Leaving an up-to-date file untouched keeps its modification time, so that
+    no new commit nor CDN invalidation is triggered for it.
+
+    Parameters
+    ----------
+    versions_file: Path
+        The versions.json file.
+    content: list[dict]
+        The version entries to write.
+
+    Returns
+    -------
+    bool
+        Whether the file was written.
+    """
+    new_text = json.dumps(content, indent=2)
+    old_text = versions_file.read_text(encoding="utf-8") if versions_file.is_file() else None
+    if old_text == new_text:
+        print(f"{versions_file} is up to date.")
+        return False
+
+    try:
+        old_content = json.loads(old_text) if old_text is not None else []
+    except json.JSONDecodeError:
+        old_content = []
+    for entry in old_content:
+        if entry not in content:
+            print(f"Removing {entry} from {versions_file}.")
+    for entry in content:
+        if entry not in old_content:
+            print(f"Adding {entry} to {versions_file}.")
+
+    versions_file.write_text(new_text, encoding="utf-8")
+    return True
 
 
 def write_versions_file() -> None:
     """
     Write the versions.json file with the latest stable and other versions.
 
-    Also exports the latest stable version to the GITHUB_OUTPUT file.
+    The file is only rewritten if its content changes. Also exports the latest stable
+    version and whether the file was updated to the GITHUB_OUTPUT file.
+
+    If ``VERSIONS_TO_KEEP`` is set to a positive number, older stable versions are archived
+    first (see ``archive_old_versions``) and the "Older version" entry points to the archive
+    index page.
     """
     cname = os.environ["CNAME"]
     render_last = int(os.environ["RENDER_LAST"])
-    stable_release = find_stable_release()
+    versions_to_keep = int(os.getenv("VERSIONS_TO_KEEP") or "0")
+    index = VersionIndex()
+    if versions_to_keep > 0:
+        archive_old_versions(index, versions_to_keep)
+    has_archive = (index.version_dir / "archive" / "index.html").is_file()
+    stable_release = find_stable_release(index)
     if stable_release is not None:
         url_stable = f"https://{cname}/version/stable/"
     content = []
@@ -151,22 +649,22 @@ def write_versions_file() -> None:
     content.append(make_entry(("dev", "dev", url_dev)))
 
     # Other versions (including stable)
-    full_list = sorted(get_versions_list(), reverse=True)
-    for version in full_list[:render_last]:
+    for version in index.render_window(render_last):
         if stable_release is not None and version == Version(stable_release):
             content.append(make_entry((f"{stable_release} (stable)", stable_release, url_stable)))
             continue
         url_version = f"https://{cname}/version/{version}/"
         content.append(make_entry((str(version), str(version), url_version)))
 
-    if len(content) > render_last:
-        url_older_version = f"https://{cname}/version/"
+    if len(content) > render_last or has_archive:
+        url_older_version = f"https://{cname}/version/{'archive/' if has_archive else ''}"
         content.append(make_entry(("Older version", "N/A", url_older_version)))
 
-    with Path("versions.json").open("w", encoding="utf-8") as file:
-        json.dump(content, file, indent=2)
+    updated = update_versions_file(Path("versions.json"), content)
 
-    export_to_github_output("LATEST_STABLE_VERSION", stable_release if stable_release else "")
+    with GitHubFileWriter("GITHUB_OUTPUT") as output:
+        output.set("LATEST_STABLE_VERSION", stable_release if stable_release else "")
+        output.set("VERSIONS_FILE_UPDATED", "true" if updated else "false")
 
 
 def set_version_variable() -> None:
@@ -209,16 +707,12 @@ def set_version_variable() -> None:
         match = branch_pattern.match(version)
     if match and match.group():
         assert version == match.group()  # Verify that version is the same as the match
-        versions_list = get_versions_list()
+        index = VersionIndex()
         current_version = Version(version)
-        existing_prereleases = [
-            version
-            for version in versions_list
-            if version.is_prerelease
-            and version.release == current_version.release  # MAJOR.MINOR.PATCH should match
-        ]
+        # MAJOR.MINOR.PATCH should match
+        existing_prereleases = index.prereleases(release=current_version.release)
         if current_version.is_prerelease:
-            latest_stable_str = find_stable_release()
+            latest_stable_str = find_stable_release(index)
             if latest_stable_str is not None:
                 latest_stable_version = Version(latest_stable_str)
                 if latest_stable_version > current_version:  # This is not allowable
@@ -231,13 +725,20 @@ def set_version_variable() -> None:
             # Ensure highest hierarchy of current pre-release
             valid_prerelease = all(current_version > prerel for prerel in existing_prereleases)
             if valid_prerelease:
-                # Keep a maximum of 3 pre-releases
-                pre_releases_to_remove = sorted(existing_prereleases, reverse=True)[2:]
-                for prerel in pre_releases_to_remove:
-                    prerel_path = Path(f"version/{prerel}")
-                    shutil.rmtree(prerel_path)
-                export_to_github_output("VERSION", str(current_version))
-                export_to_github_output("PRE_RELEASE", "true")
+                # Keep a maximum of PRE_RELEASES_TO_KEEP pre-releases, including the current one
+                pre_releases_to_keep = int(os.getenv("PRE_RELEASES_TO_KEEP", "3"))
+                if pre_releases_to_keep < 1:
+                    print("ERROR: PRE_RELEASES_TO_KEEP must be at least 1.")
+                    exit(1)
+                pre_releases_to_remove = sorted(existing_prereleases, reverse=True)[
+                    pre_releases_to_keep - 1 :
+                ]
+                remove_version_trees(
+                    [Path(f"version/{prerel}") for prerel in pre_releases_to_remove]
+                )
+                with GitHubFileWriter("GITHUB_OUTPUT") as output:
+                    output.set("VERSION", str(current_version))
+                    output.set("PRE_RELEASE", "true")
             else:
                 print(
                     "ERROR: An equal or higher pre-release version already exists:"
@@ -246,17 +747,13 @@ def set_version_variable() -> None:
                 exit(1)
         else:
             # All existing pre-releases must be removed before the normal release.
-            for prerel in existing_prereleases:
-                prerel_path = Path(f"version/{prerel}")
-                shutil.rmtree(prerel_path)
+            remove_version_trees([Path(f"version/{prerel}") for prerel in existing_prereleases])
 
-            if independent_patch_release:
-                export_to_github_output("VERSION", str(current_version))
-                export_to_github_output("PRE_RELEASE", "false")
-            else:
+            if not independent_patch_release:
                 current_version = str(current_version).rsplit(".", 1)[0]  # Remove the patch number
-                export_to_github_output("VERSION", str(current_version))
-                export_to_github_output("PRE_RELEASE", "false")
+            with GitHubFileWriter("GITHUB_OUTPUT") as output:
+                output.set("VERSION", str(current_version))
+                output.set("PRE_RELEASE", "false")
     else:
         if ref_type == "tag":
             print(